@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Heartland Parser Benchmark
+==========================
+Offline benchmark of the standings parsers against the checked-in pages in
+heartland_data/ - no network access.
+
+Cases (one per parser x backend that is installed):
+    archive/<backend>   v4 StandingsParser._parse_archive_html   debug_2024_fall_boys_prem.html
+    cgi/<backend>       v4 StandingsParser._parse_cgi_response   working_test_*.html, results_test_*.html
+    archive/v3          v3 HeartlandScraper._parse_html_tables   debug_2024_fall_boys_prem.html
+
+Before anything is timed, every case of a page set must return exactly the
+rows the reference backend (bs4) returns; any difference exits 1.
+
+Each case is timed over N passes (median pass reported) and then run once
+under tracemalloc for peak allocations. Speed is gated as a ratio to the
+reference backend measured in the same run, so the baseline holds on any
+machine: a speedup or peak memory worse than the stored baseline by more than
+the tolerance is a regression and the script exits 1.
+
+Usage:
+    python heartland_bench.py                        # Compare against bench_baseline.json
+    python heartland_bench.py --iterations 50        # More passes per case
+    python heartland_bench.py --cases archive/lxml   # Only some cases (prefix match)
+    python heartland_bench.py --save-baseline        # Record the current speedups / peaks
+    python heartland_bench.py --tolerance 0.10 --json bench.json
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+import logging
+
+from heartland_parsers import BACKENDS, get_backend
+from heartland_scraper_v4 import StandingsParser
+from heartland_table import STANDINGS_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+FIXTURE_DIR = SCRIPT_DIR / "heartland_data"
+BASELINE_FILE = SCRIPT_DIR / "bench_baseline.json"
+
+ARCHIVE_FIXTURES = ["debug_2024_fall_boys_prem.html"]
+CGI_FIXTURES = [f"working_test_{i}.html" for i in range(1, 6)] + [f"results_test_{i}.html" for i in range(1, 6)]
+
+REFERENCE_BACKEND = "bs4"  # Speed ratios and expected rows are relative to this backend
+DEFAULT_ITERATIONS = 20
+DEFAULT_TOLERANCE = 0.25  # Allowed relative slowdown / memory growth before failing
+
+# ============================================================================
+# CASES
+# ============================================================================
+
+def _load(names: List[str]) -> List[str]:
+    return [(FIXTURE_DIR / name).read_text(encoding='utf-8') for name in names]
+
+
+def build_cases() -> Dict[str, Dict]:
+    """name -> {'pages': [html, ...], 'parse': html -> rows}; unavailable backends are skipped."""
+    archive_pages = _load(ARCHIVE_FIXTURES)
+    cgi_pages = _load(CGI_FIXTURES)
+    cases = {}
+
+    for backend in BACKENDS:
+        try:
+            get_backend(backend)
+        except ValueError as e:
+            logger.info(f"Skipping {backend}: {e}")
+            continue
+        parser = StandingsParser(backend)
+        cases[f"archive/{backend}"] = {
+            'pages': archive_pages,
+            'parse': lambda html, p=parser: p._parse_archive_html(html, '2024_fall', 'boys_prem'),
+        }
+        cases[f"cgi/{backend}"] = {
+            'pages': cgi_pages,
+            'parse': lambda html, p=parser: p._parse_cgi_response(html, '2025_fall', 'Boys', 'Premier', 'U-11', '1'),
+        }
+
+    try:
+        from heartland_scraper import HeartlandScraper as V3Scraper
+    except ImportError as e:
+        logger.info(f"Skipping v3: {e}")
+    else:
+        v3 = V3Scraper(output_dir=tempfile.gettempdir())
+        cases["archive/v3"] = {
+            'pages': archive_pages,
+            'parse': lambda html: v3._parse_html_tables(html, '2024_fall', 'boys_prem'),
+        }
+    return cases
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def reference_case(name: str) -> str:
+    return f"{name.split('/')[0]}/{REFERENCE_BACKEND}"
+
+
+def _rows(case: Dict) -> List[List[tuple]]:
+    return [[tuple(getattr(team, field) for field in STANDINGS_FIELDS) for team in case['parse'](html)]
+            for html in case['pages']]
+
+
+def check_rows(cases: Dict[str, Dict]) -> List[str]:
+    """Cases whose rows differ from their reference case on any page."""
+    expected = {}
+    problems = []
+    for name, case in cases.items():
+        reference = reference_case(name)
+        if reference not in expected:
+            expected[reference] = _rows(cases[reference])
+        got = _rows(case)
+        for page, (want, rows) in enumerate(zip(expected[reference], got)):
+            if rows != want:
+                first = next((i for i, (a, b) in enumerate(zip(want, rows)) if a != b), min(len(want), len(rows)))
+                problems.append(f"{name}: page {page} differs from {reference} at row {first} "
+                                f"({len(rows)} rows vs {len(want)})")
+    return problems
+
+
+def run_case(pages: List[str], parse: Callable[[str], List], iterations: int) -> Dict:
+    """Time `iterations` passes over all pages, then one traced pass for peak memory."""
+    mb = sum(len(html.encode('utf-8')) for html in pages) / (1024 * 1024)
+    rows = sum(len(parse(html)) for html in pages)  # Warm-up pass (also the row count)
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for html in pages:
+            parse(html)
+        timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+
+    tracemalloc.start()
+    for html in pages:
+        parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pages': len(pages),
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'best_seconds': round(min(timings), 6),
+        'rows_per_sec': round(rows / seconds, 1),
+        'mb_per_sec': round(mb / seconds, 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def add_speedups(results: Dict[str, Dict]):
+    """
+    Each case's speed as a multiple of its reference case in the same run.
+
+    Both parse the same pages into the same rows, so this is the ratio of
+    their fastest passes (the pass least disturbed by the machine).
+    """
+    for name, result in results.items():
+        result['speedup'] = round(results[reference_case(name)]['best_seconds'] / result['best_seconds'], 3)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Regression messages for cases present in both result sets."""
+    problems = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['rows'] != base['rows']:
+            problems.append(f"{name}: rows {base['rows']} -> {result['rows']}")
+        if 'speedup' in base and result['speedup'] < base['speedup'] * (1 - tolerance):
+            problems.append(f"{name}: {result['speedup']:.2f}x {REFERENCE_BACKEND} "
+                            f"(baseline {base['speedup']:.2f}x)")
+        if result['peak_kb'] > base['peak_kb'] * (1 + tolerance):
+            problems.append(f"{name}: peak {base['peak_kb']:,.0f} KB -> {result['peak_kb']:,.0f} KB")
+    return problems
+
+
+def print_report(results: Dict[str, Dict], baseline: Dict[str, Dict]):
+    print(f"\n{'case':<16}{'rows':>7}{'rows/sec':>12}{'MB/sec':>9}{'peak KB':>10}"
+          f"{'vs ' + REFERENCE_BACKEND:>9}{'vs base':>10}")
+    print("-" * 73)
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{r['speedup'] / base['speedup'] - 1:+.0%}" if base and 'speedup' in base else "new"
+        print(f"{name:<16}{r['rows']:>7}{r['rows_per_sec']:>12,.0f}{r['mb_per_sec']:>9.2f}"
+              f"{r['peak_kb']:>10,.0f}{r['speedup']:>8.2f}x{delta:>10}")
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark Heartland parsers on local fixtures')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS,
+                        help=f'Timed passes per case (default: {DEFAULT_ITERATIONS})')
+    parser.add_argument('--cases', nargs='+',
+                        help='Only run cases starting with these names (e.g. archive cgi/lxml)')
+    parser.add_argument('--baseline', type=str, default=str(BASELINE_FILE),
+                        help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write these results as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed relative regression (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--json', type=str,
+                        help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    cases = build_cases()
+    if args.cases:
+        # Reference cases always run: the others are checked and timed against them
+        selected = [name for name in cases if any(name.startswith(prefix) for prefix in args.cases)]
+        keep = set(selected) | {reference_case(name) for name in selected}
+        cases = {name: case for name, case in cases.items() if name in keep}
+
+    mismatches = check_rows(cases)
+    if mismatches:
+        print("ROW MISMATCHES:")
+        for problem in mismatches:
+            print(f"  {problem}")
+        return 1
+
+    results = {name: run_case(case['pages'], case['parse'], max(1, args.iterations))
+               for name, case in cases.items()}
+    add_speedups(results)
+
+    baseline_path = Path(args.baseline)
+    baseline: Dict[str, Dict] = {}
+    if baseline_path.exists() and not args.save_baseline:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['cases']
+
+    print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'iterations': args.iterations, 'cases': results}, f, indent=2)
+
+    if args.save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({'iterations': args.iterations, 'cases': results}, f, indent=2)
+        print(f"\nBaseline saved: {baseline_path}")
+        return 0
+
+    problems = compare(results, baseline, args.tolerance)
+    if problems:
+        print("\nREGRESSIONS:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("\nNo regressions." if baseline else "\nNo baseline - run with --save-baseline to record one.")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
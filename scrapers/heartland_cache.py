@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Heartland HTTP Response Cache
+=============================
+Persistent, content-addressed on-disk cache for scraper responses.
+
+  - Entries are keyed by URL + sorted query params
+  - Bodies are stored gzip-compressed under their SHA-256, so identical pages
+    (e.g. every "could not match this combination" CGI error) share one blob
+  - Closed-season archive pages are stored with no TTL and never expire
+  - Live CGI pages get a short TTL; once stale they are revalidated with
+    If-None-Match / If-Modified-Since when the server sent validators
+  - 404s are stored as negative entries (no body) with a TTL, so a backfill
+    does not ask for the same missing pages on every run
+  - Total blob size is bounded; least-recently-used entries are evicted
+
+Layout:
+    {cache_dir}/index.json           # key -> entry metadata (LRU order)
+    {cache_dir}/objects/ab/abcd....gz
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+INDEX_FILE = "index.json"
+NEGATIVE_TTL = 7 * 24 * 3600  # Seconds a 404 is remembered (archives can appear after a season closes)
+
+# ============================================================================
+# DATA CLASSES
+# ============================================================================
+
+@dataclass
+class CacheEntry:
+    url: str
+    blob: Optional[str]            # SHA-256 of the body; None for a negative (404) entry
+    size: int                      # Compressed bytes on disk
+    stored_at: float
+    ttl: Optional[float] = None    # Seconds; None = never expires
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    status: int = 200
+
+    @property
+    def negative(self) -> bool:
+        return self.blob is None
+
+    def is_fresh(self, now: float = None) -> bool:
+        if self.ttl is None:
+            return True
+        return (now or time.time()) - self.stored_at < self.ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def cache_key(url: str, params: Dict = None) -> str:
+    if params:
+        url = f"{url}?{urlencode(sorted(params.items()))}"
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU response cache. Call `save()` to persist the index."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(cache_dir)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'not_found': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+        self._refs: Dict[str, int] = {}
+        self._blob_sizes: Dict[str, int] = {}
+        self._total_bytes = 0  # Sum of _blob_sizes, kept as blobs come and go
+        self._lock = threading.Lock()
+        self._load_index()
+
+    # -------------------------------------------------------------------------
+    # Index persistence
+    # -------------------------------------------------------------------------
+
+    def _load_index(self):
+        path = self.root / INDEX_FILE
+        if not path.exists():
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache index {path}: {e}")
+            return
+        for key, data in raw.items():
+            entry = CacheEntry(**data)
+            if entry.negative or self._blob_path(entry.blob).exists():
+                self._add(key, entry)
+
+    def save(self):
+        with self._lock:
+            data = {key: asdict(entry) for key, entry in self.entries.items()}
+        tmp = self.root / f"{INDEX_FILE}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.root / INDEX_FILE)
+
+    # -------------------------------------------------------------------------
+    # Blob bookkeeping
+    # -------------------------------------------------------------------------
+
+    def _blob_path(self, blob: str) -> Path:
+        return self.objects / blob[:2] / f"{blob}.gz"
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _add(self, key: str, entry: CacheEntry):
+        self.entries[key] = entry
+        if entry.negative:
+            return
+        refs = self._refs.get(entry.blob, 0)
+        self._refs[entry.blob] = refs + 1
+        if refs == 0:
+            self._blob_sizes[entry.blob] = entry.size
+            self._total_bytes += entry.size
+
+    def _release(self, blob: Optional[str]):
+        if blob is None:
+            return
+        self._refs[blob] -= 1
+        if self._refs[blob] == 0:
+            del self._refs[blob]
+            self._total_bytes -= self._blob_sizes.pop(blob)
+            try:
+                self._blob_path(blob).unlink()
+            except OSError:
+                pass
+
+    def _drop(self, key: str):
+        self._release(self.entries.pop(key).blob)
+
+    def _evict(self):
+        while self.entries and self.total_bytes > self.max_bytes:
+            key = next(iter(self.entries))
+            self._drop(key)
+            self.stats['evictions'] += 1
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def lookup(self, url: str, params: Dict = None) -> Optional[CacheEntry]:
+        """Return the entry (fresh or stale) and mark it recently used."""
+        key = cache_key(url, params)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def read(self, entry: CacheEntry) -> Optional[str]:
+        if entry.negative:
+            return None
+        try:
+            with gzip.open(self._blob_path(entry.blob), 'rt', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get(self, url: str, params: Dict = None) -> Optional[str]:
+        """Fresh cached body, counting a hit or miss."""
+        entry = self.lookup(url, params)
+        body = self.read(entry) if entry is not None and entry.is_fresh() else None
+        with self._lock:
+            self.stats['hits' if body is not None else 'misses'] += 1
+        return body
+
+    def missing(self, url: str, params: Dict = None) -> bool:
+        """True if the server answered 404 for this request within the negative entry's TTL."""
+        entry = self.lookup(url, params)
+        if entry is None or not entry.negative or not entry.is_fresh():
+            return False
+        with self._lock:
+            self.stats['not_found'] += 1
+        return True
+
+    def store_missing(self, url: str, params: Dict = None, ttl: Optional[float] = NEGATIVE_TTL,
+                      status: int = 404):
+        """Remember a 404 (no body is stored) for `ttl` seconds."""
+        key = cache_key(url, params)
+        with self._lock:
+            previous = self.entries.get(key)
+            self._add(key, CacheEntry(url=url, blob=None, size=0, stored_at=time.time(),
+                                      ttl=ttl, status=status))
+            self.entries.move_to_end(key)
+            if previous is not None:
+                self._release(previous.blob)
+            self.stats['stores'] += 1
+
+    def store(self, url: str, params: Dict, body: str, headers: Dict = None,
+              ttl: Optional[float] = None):
+        headers = headers or {}
+        data = body.encode('utf-8')
+        blob = hashlib.sha256(data).hexdigest()
+        compressed = gzip.compress(data)
+        path = self._blob_path(blob)
+        key = cache_key(url, params)
+        with self._lock:
+            # Under the lock, so an eviction cannot unlink the blob between write and reference
+            if not path.exists():
+                path.parent.mkdir(exist_ok=True)
+                tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+                tmp.write_bytes(compressed)
+                os.replace(tmp, path)
+            entry = CacheEntry(
+                url=url,
+                blob=blob,
+                size=path.stat().st_size,
+                stored_at=time.time(),
+                ttl=ttl,
+                etag=headers.get('ETag'),
+                last_modified=headers.get('Last-Modified'),
+            )
+            previous = self.entries.get(key)
+            self._add(key, entry)  # New reference first: an unchanged body keeps its blob
+            self.entries.move_to_end(key)
+            if previous is not None:
+                self._release(previous.blob)
+            self.stats['stores'] += 1
+            self._evict()
+
+    def revalidated(self, url: str, params: Dict = None, ttl: Optional[float] = None):
+        """Server answered 304 - restart the entry's TTL."""
+        key = cache_key(url, params)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.time()
+                entry.ttl = ttl
+                self.stats['revalidated'] += 1
+
+    def summary(self) -> str:
+        s = self.stats
+        lookups = s['hits'] + s['misses']
+        rate = (100.0 * s['hits'] / lookups) if lookups else 0.0
+        return (f"cache: {s['hits']} hits / {s['misses']} misses ({rate:.0f}%), "
+                f"{s['not_found']} known 404s, {s['revalidated']} revalidated, {s['evictions']} evicted, "
+                f"{len(self.entries)} entries, {self.total_bytes / 1024:.0f} KB")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Heartland Standings Changefeed
+==============================
+Row-level diff of a run's standings against the previous run's snapshot.
+
+Rows are keyed by (team_number, or team_name when there is no number, season,
+subdivision) and compared by a hash of the whole row. Only the difference is
+emitted, one JSON object per line:
+
+    {"op": "insert", "key": [...], "hash": "...", "row": {...}}
+    {"op": "update", "key": [...], "hash": "...", "row": {...}}
+    {"op": "delete", "key": [...], "hash": "...", "row": {...}}    # the row as last seen
+
+Removals are scoped to the seasons this run scraped, so `--season 2024_fall`
+does not delete every other season. A partial run (units still failing) emits
+no deletes at all - a missing page is not a removed team - and keeps the old
+rows in the snapshot. When a key repeats within one run, its first row wins.
+
+The snapshot (standings_snapshot.ndjson.gz) is rewritten when the changefeed
+is closed, so the next run diffs against this one.
+
+Usage:
+    tracker = ChangeTracker(output_dir / SNAPSHOT_FILE)
+    for row in rows:
+        change = tracker.observe(row)        # None when unchanged
+    deletes = tracker.finish(partial=False)  # then tracker.save()
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from heartland_table import STANDINGS_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SNAPSHOT_FILE = "standings_snapshot.ndjson.gz"
+SNAPSHOT_FORMAT = 1
+
+_F = {name: i for i, name in enumerate(STANDINGS_FIELDS)}
+
+Key = Tuple[str, str, str]
+
+# ============================================================================
+# KEYS AND HASHES
+# ============================================================================
+
+def row_key(row: Tuple) -> Key:
+    return (row[_F['team_number']] or row[_F['team_name']], row[_F['season']], row[_F['subdivision']])
+
+
+def row_hash(row: Tuple) -> str:
+    data = json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def change_record(op: str, key: Key, digest: str, row: Tuple) -> Dict:
+    return {'op': op, 'key': list(key), 'hash': digest, 'row': dict(zip(STANDINGS_FIELDS, row))}
+
+# ============================================================================
+# SNAPSHOT
+# ============================================================================
+
+def read_snapshot(path: Path) -> Dict[Key, Tuple]:
+    """key -> row from a snapshot file ({} if there is none yet)."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    rows = {}
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('snapshot') != SNAPSHOT_FORMAT or tuple(header.get('fields', ())) != STANDINGS_FIELDS:
+                logger.warning(f"Ignoring snapshot {path} with an unknown layout")
+                return {}
+            for line in f:
+                row = tuple(json.loads(line))
+                rows[row_key(row)] = row
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return {}
+    return rows
+
+
+def write_snapshot(path: Path, rows: Dict[Key, Tuple]):
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps({'snapshot': SNAPSHOT_FORMAT, 'fields': list(STANDINGS_FIELDS),
+                            'rows': len(rows), 'created_at': datetime.now().isoformat(timespec='seconds')}))
+        f.write('\n')
+        for row in rows.values():
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+    os.replace(tmp, path)
+
+# ============================================================================
+# TRACKER
+# ============================================================================
+
+class ChangeTracker:
+    def __init__(self, snapshot_path: Path):
+        self.snapshot_path = Path(snapshot_path)
+        self.previous = read_snapshot(self.snapshot_path)
+        self._previous_hashes = {key: row_hash(row) for key, row in self.previous.items()}
+        self.current: Dict[Key, Tuple] = {}
+        self.counts = {'insert': 0, 'update': 0, 'delete': 0, 'unchanged': 0, 'duplicate': 0}
+        self._result: Optional[Dict[Key, Tuple]] = None
+
+    def observe(self, row: Tuple) -> Optional[Dict]:
+        """
+        Change record for `row`, or None if it matches the snapshot.
+        
+        A key seen earlier in this run is a duplicate row (the same team
+        listed twice in a subdivision): the first copy wins and the later
+        one is counted and skipped, not emitted as an update.
+        """
+        key, digest = row_key(row), row_hash(row)
+        if key in self.current:
+            self.counts['duplicate'] += 1
+            logger.debug(f"Changefeed: duplicate key {key} in this run, keeping the first row")
+            return None
+        before = self._previous_hashes.get(key)
+        self.current[key] = row
+        if before == digest:
+            self.counts['unchanged'] += 1
+            return None
+        op = 'insert' if before is None else 'update'
+        self.counts[op] += 1
+        return change_record(op, key, digest, row)
+
+    def finish(self, partial: bool = False) -> List[Dict]:
+        """Delete records for snapshot rows of the scraped seasons that this run did not see."""
+        seasons = {key[1] for key in self.current}
+        deletes = []
+        merged = dict(self.previous)
+        if partial:
+            if seasons:
+                logger.warning("Changefeed: run had failures - deletes withheld, old rows kept in the snapshot")
+        else:
+            for key, row in self.previous.items():
+                if key[1] in seasons and key not in self.current:
+                    deletes.append(change_record('delete', key, self._previous_hashes[key], row))
+                    del merged[key]
+        merged.update(self.current)
+        self.counts['delete'] = len(deletes)
+        self._result = merged
+        return deletes
+
+    def save(self):
+        if self._result is None:
+            raise RuntimeError("finish() must be called before save()")
+        write_snapshot(self.snapshot_path, self._result)
+
+    def summary(self) -> str:
+        c = self.counts
+        duplicates = f", {c['duplicate']} duplicate keys skipped" if c['duplicate'] else ''
+        return (f"Changefeed: {c['insert']} inserted, {c['update']} updated, {c['delete']} deleted, "
+                f"{c['unchanged']} unchanged{duplicates}")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Heartland Match Dedup Index
+===========================
+Remembers which matches earlier runs already emitted, so an incremental run
+writes only new matches and matches whose record changed (a score came in,
+a kickoff moved).
+
+The index is one memory-mapped file (match_index.bin):
+
+    header      magic, slot count, entry count, Bloom filter size, hash count
+    bloom       Bloom filter bits over the key hashes
+    slots       open-addressing hash set of (key hash, record fingerprint), 16 bytes each
+
+Keys are hashed to 64 bits with BLAKE2b. The Bloom filter answers "never
+seen" without touching the slot table - the common case for a new day's
+games - and only possible hits probe the exact set, which makes the answer
+certain (up to a 64-bit hash collision, ~n^2 / 2^65).
+
+Changes are staged in memory and written by commit(). The scraper commits only
+after its output files are closed, so a crash never marks a match as emitted
+that was not written.
+
+Usage:
+    index = MatchIndex(output_dir / MATCH_INDEX_FILE)
+    if index.check(key, row):          # new or changed since the last commit
+        write(row)
+    index.commit()
+    index.close()
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MATCH_INDEX_FILE = "match_index.bin"
+
+MAGIC = b'HLMIDX01'
+HEADER = struct.Struct('<8sQQQQ')   # magic, slots, entries, bloom bits, bloom hashes
+HEADER_SIZE = 64
+SLOT = struct.Struct('<QQ')         # key hash (0 = empty), fingerprint
+
+DEFAULT_SLOTS = 1 << 15
+MAX_LOAD = 0.7                      # Grow (rebuild with double the slots) above this fill
+BLOOM_BITS_PER_KEY = 10             # ~1% false positives with 7 hashes
+BLOOM_HASHES = 7
+
+# ============================================================================
+# HASHING
+# ============================================================================
+
+def key_hash(key: str) -> int:
+    """64-bit key hash; never 0, which marks an empty slot."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+def fingerprint(row: Tuple) -> int:
+    """64-bit hash of a whole record, to tell a changed match from a repeat."""
+    data = json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+def _layout(slots: int) -> Tuple[int, int]:
+    """(bloom bits, file size) for a table of `slots` slots."""
+    bloom_bits = max(64, -(-int(slots * MAX_LOAD * BLOOM_BITS_PER_KEY) // 64) * 64)
+    return bloom_bits, HEADER_SIZE + bloom_bits // 8 + slots * SLOT.size
+
+
+class MatchIndex:
+    def __init__(self, path: Path, slots: int = DEFAULT_SLOTS):
+        self.path = Path(path)
+        self.pending: Dict[int, int] = {}
+        self.new = self.changed = self.unchanged = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._mm = None
+        if not self.path.exists():
+            self._create(self.path, slots)
+        self._open()
+
+    # -------------------------------------------------------------------------
+    # File
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _create(path: Path, slots: int):
+        bloom_bits, size = _layout(slots)
+        with open(path, 'wb') as f:
+            f.truncate(size)  # Zero-filled (sparse where the filesystem allows)
+            f.write(HEADER.pack(MAGIC, slots, 0, bloom_bits, BLOOM_HASHES))
+
+    def _open(self):
+        self._file = open(self.path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self.slots, self.entries, self.bloom_bits, self.hashes = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a match index")
+        self._slots_at = HEADER_SIZE + self.bloom_bits // 8
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+    # -------------------------------------------------------------------------
+    # Bloom filter and slot table (memory-mapped)
+    # -------------------------------------------------------------------------
+
+    def _bloom_positions(self, kh: int) -> Iterator[int]:
+        h1, h2 = kh & 0xFFFFFFFF, (kh >> 32) | 1  # Double hashing
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bloom_bits
+
+    def _bloom_maybe(self, kh: int) -> bool:
+        mm = self._mm
+        return all(mm[HEADER_SIZE + bit // 8] & (1 << (bit % 8)) for bit in self._bloom_positions(kh))
+
+    def _bloom_add(self, kh: int):
+        mm = self._mm
+        for bit in self._bloom_positions(kh):
+            offset = HEADER_SIZE + bit // 8
+            mm[offset] = mm[offset] | (1 << (bit % 8))
+
+    def _probe(self, kh: int) -> Tuple[int, int, int]:
+        """(offset, stored key hash, fingerprint) of `kh`'s slot, or of the empty slot ending its run."""
+        i = kh % self.slots
+        while True:
+            offset = self._slots_at + i * SLOT.size
+            stored, fp = SLOT.unpack_from(self._mm, offset)
+            if stored == 0 or stored == kh:
+                return offset, stored, fp
+            i = (i + 1) % self.slots
+
+    def _lookup(self, kh: int) -> Optional[int]:
+        _, stored, fp = self._probe(kh)
+        return fp if stored else None
+
+    def _store(self, kh: int, fp: int):
+        offset, stored, _ = self._probe(kh)
+        SLOT.pack_into(self._mm, offset, kh, fp)
+        if not stored:
+            self.entries += 1
+            self._bloom_add(kh)
+
+    def _items(self) -> Iterator[Tuple[int, int]]:
+        view = memoryview(self._mm)[self._slots_at:self._slots_at + self.slots * SLOT.size]
+        try:
+            for kh, fp in SLOT.iter_unpack(view):
+                if kh:
+                    yield kh, fp
+        finally:
+            view.release()
+
+    # -------------------------------------------------------------------------
+    # API
+    # -------------------------------------------------------------------------
+
+    def check(self, key: str, row: Tuple) -> bool:
+        """True if `row` is new or changed under `key` (and stage it); False for a repeat."""
+        kh, fp = key_hash(key), fingerprint(row)
+        with self._lock:
+            previous = self.pending.get(kh)
+            if previous is None and self._bloom_maybe(kh):
+                previous = self._lookup(kh)
+            if previous == fp:
+                self.unchanged += 1
+                return False
+            if previous is None:
+                self.new += 1
+            else:
+                self.changed += 1
+            self.pending[kh] = fp
+            return True
+
+    def commit(self):
+        """Write staged keys to disk, growing the table if it would pass MAX_LOAD."""
+        with self._lock:
+            if not self.pending:
+                return
+            needed = self.entries + len(self.pending)
+            if needed > self.slots * MAX_LOAD:
+                self._rebuild(needed)
+            for kh, fp in self.pending.items():
+                self._store(kh, fp)
+            HEADER.pack_into(self._mm, 0, MAGIC, self.slots, self.entries, self.bloom_bits, self.hashes)
+            self._mm.flush()
+            self.pending = {}
+
+    def _rebuild(self, entries: int):
+        slots = self.slots
+        while entries > slots * MAX_LOAD:
+            slots *= 2
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        self._create(tmp, slots)
+        old = list(self._items())
+        self.close()
+        self.path, path = tmp, self.path
+        self._open()
+        for kh, fp in old:
+            self._store(kh, fp)
+        HEADER.pack_into(self._mm, 0, MAGIC, self.slots, self.entries, self.bloom_bits, self.hashes)
+        self._mm.flush()
+        self.close()
+        os.replace(tmp, path)
+        self.path = path
+        self._open()
+        logger.info(f"Match index grown to {slots:,} slots ({self.entries:,} keys)")
+
+    def summary(self) -> str:
+        return (f"Match index: {self.new} new, {self.changed} changed, {self.unchanged} unchanged "
+                f"({self.entries:,} keys on disk)")
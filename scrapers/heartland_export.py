@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Heartland Streaming Exporter
+============================
+Writes scraped standings to every output format in a single pass.
+
+Rows are pushed one at a time (as the scraper aggregates them, or by iterating
+a finished StandingsTable) and fanned out to sinks that write immediately:
+
+    csv        heartland_standings_{date}.csv      stdlib csv.writer
+    json       heartland_standings_{date}.json     JSON array, one object per line
+    ndjson     heartland_standings_{date}.ndjson   one JSON object per line
+    supabase   supabase_standings_{date}.json      standings rows (streamed)
+               supabase_teams_{date}.json          unique team-seasons (written on close)
+    changes    heartland_changes_{date}.ndjson     inserted / updated / deleted rows since the
+                                                   last snapshot (see heartland_changefeed)
+
+With `matches=True`, match results (MATCH_FIELDS tuples, pushed with
+write_match_rows) go to heartland_matches_{date}.csv / .json / .ndjson for
+whichever of csv, json and ndjson are requested.
+
+Every file can be gzip-compressed (`compress=True` appends `.gz`). The
+standings, match and Supabase standings sinks write rows through. Two sinks
+keep state. The Supabase teams sink keeps one small tuple per unique
+team-season. The changes sink holds the previous snapshot and every row of
+this run until it closes, so its memory grows with the number of rows.
+"""
+
+import csv
+import gzip
+import json
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterable, List, Optional, Tuple
+import logging
+
+from heartland_table import STANDINGS_FIELDS, MATCH_FIELDS
+from heartland_changefeed import ChangeTracker, SNAPSHOT_FILE
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+FORMATS = ['csv', 'json', 'ndjson', 'supabase', 'changes']
+DEFAULT_FORMATS = ['csv', 'json', 'supabase']
+
+_F = {name: i for i, name in enumerate(STANDINGS_FIELDS)}
+TIMED_CHUNK = 1024  # Rows per sink pass when timing sinks or resolving team ids (bounds memory)
+
+# ============================================================================
+# SINKS
+# ============================================================================
+
+def _open_text(path: Path, compress: bool) -> IO[str]:
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+class Sink:
+    """Receives row tuples in STANDINGS_FIELDS order."""
+
+    def __init__(self, path: Path, compress: bool = False):
+        self.path = Path(f"{path}.gz") if compress else Path(path)
+        self.rows = 0
+        self._f = _open_text(self.path, compress)
+
+    def write(self, row: Tuple):
+        raise NotImplementedError
+
+    def close(self) -> str:
+        self._f.close()
+        return str(self.path)
+
+
+class CsvSink(Sink):
+    def __init__(self, path: Path, compress: bool = False, fields: Tuple[str, ...] = STANDINGS_FIELDS):
+        super().__init__(path, compress)
+        self._writer = csv.writer(self._f)
+        self._writer.writerow(fields)
+
+    def write(self, row: Tuple):
+        self._writer.writerow(row)
+        self.rows += 1
+
+
+class JsonArraySink(Sink):
+    """Valid JSON array written incrementally; `transform` maps a row to a dict."""
+
+    def __init__(self, path: Path, transform: Callable[[Tuple], Dict], compress: bool = False):
+        super().__init__(path, compress)
+        self.transform = transform
+        self._f.write('[')
+
+    def write(self, row: Tuple):
+        self._f.write(',\n' if self.rows else '\n')
+        self._f.write(json.dumps(self.transform(row), ensure_ascii=False))
+        self.rows += 1
+
+    def close(self) -> str:
+        self._f.write('\n]\n' if self.rows else ']\n')
+        return super().close()
+
+
+class NdjsonSink(Sink):
+    def __init__(self, path: Path, transform: Callable[[Tuple], Dict], compress: bool = False):
+        super().__init__(path, compress)
+        self.transform = transform
+
+    def write(self, row: Tuple):
+        self._f.write(json.dumps(self.transform(row), ensure_ascii=False))
+        self._f.write('\n')
+        self.rows += 1
+
+
+class SupabaseTeamsSink(Sink):
+    """
+    Unique teams PER SEASON, keyed by (team_name, gender, age_group, season_code).
+
+    With a team id function (a TeamIdentityIndex), teams are keyed by
+    (team id, season_code) instead and carry `heartland_team_id`, so renamed
+    rows of one team collapse into one record.
+
+    The row with the most matches played wins; output keeps first-seen order.
+    """
+
+    def __init__(self, path: Path, season_code: Callable[[str], str], compress: bool = False,
+                 team_id: Optional[Callable[[Tuple], str]] = None):
+        super().__init__(path, compress)
+        self.season_code = season_code
+        self.team_id = team_id
+        self.teams: Dict[Tuple, Tuple] = {}
+
+    def write(self, row: Tuple):
+        season_code = self.season_code(row[_F['season']])
+        team = (row[_F['team_name']], row[_F['gender']], row[_F['age_group']], season_code)
+        key = team if self.team_id is None else (self.team_id(row), season_code)
+        record = (row[_F['wins']], row[_F['losses']], row[_F['ties']])
+        current = self.teams.get(key)
+        if current is None or sum(record) > sum(current[1]):
+            self.teams[key] = (team, record)
+
+    def close(self) -> str:
+        self._f.write('[')
+        for key, ((team_name, gender, age_group, season_code), (wins, losses, ties)) in self.teams.items():
+            self._f.write(',\n' if self.rows else '\n')
+            record = {
+                'team_name': team_name,
+                'state': 'KS',
+                'gender': gender,
+                'age_group': age_group,
+                'season_code': season_code,
+                'source_name': 'heartland_soccer',
+                'elo_rating': 1500,
+                'wins': wins,
+                'losses': losses,
+                'draws': ties,
+                'matches_played': wins + losses + ties,
+            }
+            if self.team_id is not None:
+                record['heartland_team_id'] = key[0]
+            self._f.write(json.dumps(record, ensure_ascii=False))
+            self.rows += 1
+        self._f.write('\n]\n' if self.rows else ']\n')
+        return super().close()
+
+class ChangefeedSink(Sink):
+    """Inserts / updates as rows arrive; deletes and the new snapshot on close."""
+
+    def __init__(self, path: Path, snapshot_path: Path, compress: bool = False):
+        super().__init__(path, compress)
+        self.tracker = ChangeTracker(snapshot_path)
+        self.partial = False  # Set before close() when the run had failures
+
+    def write(self, row: Tuple):
+        change = self.tracker.observe(row)
+        if change is not None:
+            self._write_change(change)
+
+    def _write_change(self, change: Dict):
+        self._f.write(json.dumps(change, ensure_ascii=False))
+        self._f.write('\n')
+        self.rows += 1
+
+    def close(self) -> str:
+        for change in self.tracker.finish(self.partial):
+            self._write_change(change)
+        self.tracker.save()
+        logger.info(self.tracker.summary())
+        return super().close()
+
+# ============================================================================
+# EXPORTER
+# ============================================================================
+
+class StreamingExporter:
+    """
+    Fan rows out to every requested format in one pass.
+
+    `season_code` maps '2024_fall' -> '2024-25'; `source_url` maps
+    (season, division) -> the Supabase `source_url`. Both are memoized per
+    distinct value. With an `identity` index (heartland_identity), Supabase
+    teams and standings carry a stable `heartland_team_id`. With a MetricsRegistry, time spent in each sink is
+    recorded as heartland_export_seconds{sink}.
+    """
+
+    def __init__(self, output_dir: Path, date_str: str, season_code: Callable[[str], str],
+                 source_url: Callable[[str, str], str], formats: Iterable[str] = None,
+                 compress: bool = False, metrics=None, matches: bool = False, identity=None):
+        formats = list(formats or DEFAULT_FORMATS)
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+        self.output_dir = Path(output_dir)
+        self._season_codes: Dict[str, str] = {}
+        self._source_urls: Dict[Tuple[str, str], str] = {}
+        self._season_code_fn = season_code
+        self._source_url_fn = source_url
+        self.rows = 0
+        self.match_rows = 0
+        self.metrics = metrics
+        self.identity = identity
+        self._team_ids: Dict[Tuple, str] = {}  # Rows being written -> their team id (resolved once)
+        self.sinks: Dict[str, Sink] = {}
+        self.match_sinks: Dict[str, Sink] = {}
+
+        out = self.output_dir
+        if 'csv' in formats:
+            self.sinks['csv'] = CsvSink(out / f"heartland_standings_{date_str}.csv", compress)
+        if 'json' in formats:
+            self.sinks['json'] = JsonArraySink(out / f"heartland_standings_{date_str}.json",
+                                               self.standing_dict, compress)
+        if 'ndjson' in formats:
+            self.sinks['ndjson'] = NdjsonSink(out / f"heartland_standings_{date_str}.ndjson",
+                                              self.standing_dict, compress)
+        if 'supabase' in formats:
+            self.sinks['supabase_teams'] = SupabaseTeamsSink(
+                out / f"supabase_teams_{date_str}.json", self.season_code, compress,
+                team_id=self._team_ids.__getitem__ if identity is not None else None)
+            self.sinks['supabase_standings'] = JsonArraySink(
+                out / f"supabase_standings_{date_str}.json", self.supabase_standing, compress)
+        if 'changes' in formats:
+            self.sinks['changes'] = ChangefeedSink(out / f"heartland_changes_{date_str}.ndjson",
+                                                   out / SNAPSHOT_FILE, compress)
+        if matches:
+            if 'csv' in formats:
+                self.match_sinks['matches_csv'] = CsvSink(out / f"heartland_matches_{date_str}.csv",
+                                                          compress, MATCH_FIELDS)
+            if 'json' in formats:
+                self.match_sinks['matches_json'] = JsonArraySink(out / f"heartland_matches_{date_str}.json",
+                                                                 self.match_dict, compress)
+            if 'ndjson' in formats:
+                self.match_sinks['matches_ndjson'] = NdjsonSink(out / f"heartland_matches_{date_str}.ndjson",
+                                                                self.match_dict, compress)
+
+    # -------------------------------------------------------------------------
+    # Row shapes
+    # -------------------------------------------------------------------------
+
+    def season_code(self, season: str) -> str:
+        code = self._season_codes.get(season)
+        if code is None:
+            code = self._season_codes[season] = self._season_code_fn(season)
+        return code
+
+    def source_url(self, season: str, division: str) -> str:
+        key = (season, division)
+        url = self._source_urls.get(key)
+        if url is None:
+            url = self._source_urls[key] = self._source_url_fn(season, division)
+        return url
+
+    @staticmethod
+    def standing_dict(row: Tuple) -> Dict:
+        return dict(zip(STANDINGS_FIELDS, row))
+
+    @staticmethod
+    def match_dict(row: Tuple) -> Dict:
+        return dict(zip(MATCH_FIELDS, row))
+
+    def supabase_standing(self, row: Tuple) -> Dict:
+        season = row[_F['season']]
+        record = {
+            'team_name': row[_F['team_name']],
+            'season': season,
+            'season_code': self.season_code(season),
+            'division': row[_F['division']],
+            'subdivision': row[_F['subdivision']],
+            'age_group': row[_F['age_group']],
+            'gender': row[_F['gender']],
+            'wins': row[_F['wins']],
+            'losses': row[_F['losses']],
+            'ties': row[_F['ties']],
+            'goals_for': row[_F['goals_for']],
+            'goals_against': row[_F['goals_against']],
+            'points': row[_F['points']],
+            'source': 'heartland_soccer',
+            'source_url': self.source_url(season, row[_F['division']]),
+        }
+        if self.identity is not None:
+            record['heartland_team_id'] = self._team_ids[row]
+        return record
+
+    # -------------------------------------------------------------------------
+    # Streaming API
+    # -------------------------------------------------------------------------
+
+    def _resolve_ids(self, sinks: Dict[str, Sink], rows: List[Tuple]):
+        """Resolve each row's team id once, for both Supabase sinks to read."""
+        if self.identity is not None and sinks is self.sinks and 'supabase_teams' in sinks:
+            self._team_ids.clear()
+            for row in rows:
+                self._team_ids[row] = self.identity.resolve(row)
+
+    def write_row(self, row: Tuple):
+        self._resolve_ids(self.sinks, [row])
+        for sink in self.sinks.values():
+            sink.write(row)
+        self.rows += 1
+
+    def write_rows(self, rows: Iterable[Tuple]):
+        self.rows += self._fan_out(self.sinks, rows)
+
+    def write_match_row(self, row: Tuple):
+        for sink in self.match_sinks.values():
+            sink.write(row)
+        self.match_rows += 1
+
+    def write_match_rows(self, rows: Iterable[Tuple]):
+        self.match_rows += self._fan_out(self.match_sinks, rows)
+
+    def _fan_out(self, sinks: Dict[str, Sink], rows: Iterable[Tuple]) -> int:
+        """Write rows to every sink; returns the row count."""
+        count = 0
+        if self.metrics is None and self.identity is None:
+            for row in rows:
+                for sink in sinks.values():
+                    sink.write(row)
+                count += 1
+            return count
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, TIMED_CHUNK))
+            if not chunk:
+                return count
+            self._resolve_ids(sinks, chunk)
+            for name, sink in sinks.items():
+                with self.metrics.timer('heartland_export_seconds', sink=name) if self.metrics else nullcontext():
+                    for row in chunk:
+                        sink.write(row)
+            count += len(chunk)
+
+    def _close_sink(self, name: str, sink: Sink) -> str:
+        if self.metrics is None:
+            return sink.close()
+        with self.metrics.timer('heartland_export_seconds', sink=name):
+            return sink.close()
+
+    def close(self, discard_empty: bool = True, partial: bool = False) -> Dict[str, str]:
+        """
+        Finish every file; returns {sink name: path}. Empty exports are deleted.
+        
+        `partial` marks a run with failed units: the changefeed then emits no deletes.
+        """
+        for sink in self.sinks.values():
+            if isinstance(sink, ChangefeedSink):
+                sink.partial = partial
+        paths = {}
+        for sinks, rows in ((self.sinks, self.rows), (self.match_sinks, self.match_rows)):
+            closed = {name: self._close_sink(name, sink) for name, sink in sinks.items()}
+            if discard_empty and rows == 0:
+                for path in closed.values():
+                    Path(path).unlink(missing_ok=True)
+                continue
+            paths.update(closed)
+        for name, path in paths.items():
+            logger.info(f"Saved {name}: {path}")
+        return paths
+
+    def __enter__(self) -> "StreamingExporter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
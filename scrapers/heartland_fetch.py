@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Heartland Fetch Engine
+======================
+Concurrent, rate-limited HTTP fetching for the Heartland scrapers.
+
+Replaces the fixed `time.sleep(REQUEST_DELAY)` before every request with:
+  1. A token-bucket limiter shared by all workers (global request ceiling)
+  2. A per-host concurrency cap (never more than N in-flight per host)
+  3. A bounded thread pool so independent CGI combos are fetched at once
+
+With an AdaptiveLimiter each host also gets an AIMD rate: it climbs while
+responses stay fast, halves on 429/5xx or latency spikes, honours Retry-After,
+and is saved between runs so the next scrape starts where the last one left
+off. The global token bucket still applies on top, as a hard ceiling. A
+host's rate never goes above the starting rate unless a higher `max_rate` is
+opted into.
+
+Usage:
+    engine = FetchEngine(session, rate=4.0, max_workers=8, per_host=4)
+    engine = FetchEngine(session, rate=6, adaptive=AdaptiveLimiter(state_path, initial_rate=2, max_rate=6))
+    html = engine.get(url, params)
+    for result in engine.map(fetch_one, work_items):
+        ...
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_RATE = 4.0        # Requests per second across all workers
+DEFAULT_BURST = 4         # Tokens that may accumulate while idle
+DEFAULT_MAX_WORKERS = 8   # Thread pool size
+DEFAULT_PER_HOST = 4      # Max in-flight requests per host
+REQUEST_TIMEOUT = 30
+
+# Adaptive (AIMD) limiting
+ADAPTIVE_MIN_RATE = 0.2       # Never slower than one request per 5s
+ADAPTIVE_INCREASE = 0.5       # Requests/sec gained per second of healthy responses
+ADAPTIVE_BACKOFF = 0.5        # Rate multiplier on 429/5xx/latency spikes
+LATENCY_SPIKE_FACTOR = 3.0    # Spike = latency above this multiple of the running average...
+LATENCY_SPIKE_FLOOR = 0.5     # ...and above this many seconds
+LATENCY_ALPHA = 0.2           # EWMA weight of each new latency sample
+DECREASE_COOLDOWN = 1.0       # Seconds after a backoff before another one counts
+MAX_RETRY_AFTER = 300         # Cap on honoured Retry-After pauses (seconds)
+BACKOFF_STATUSES = frozenset([429, 500, 502, 503, 504])
+RATE_STATE_FILE = "rate_state.json"
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+class TokenBucket:
+    """Thread-safe token bucket. `acquire()` blocks until a token is available."""
+
+    def __init__(self, rate: float, burst: int = DEFAULT_BURST):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as needed. Returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self.rate = rate
+
+
+class HostRate:
+    """Learned AIMD state for one host."""
+    __slots__ = ('bucket', 'latency', 'paused_until', 'last_decrease')
+
+    def __init__(self, rate: float, latency: Optional[float] = None):
+        self.bucket = TokenBucket(rate, burst=1)
+        self.latency = latency
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+
+class AdaptiveLimiter:
+    """
+    Per-host AIMD rate limiter shared by every worker.
+
+    Each healthy response adds ADAPTIVE_INCREASE / rate (about +ADAPTIVE_INCREASE
+    requests/sec per second); a 429/5xx, a Retry-After header or a latency spike
+    multiplies the rate by ADAPTIVE_BACKOFF (at most once per DECREASE_COOLDOWN,
+    so one burst of failures counts once). Retry-After also pauses the host.
+
+    Rates stay at or below `max_rate`. It defaults to `initial_rate`, so by
+    default the limiter only slows down from the configured pace and recovers
+    back up to it. Faster rates are opt-in.
+
+    Learned rates and latencies are kept in `state_path` (JSON, shared by the
+    scrapers - hosts not touched by this run are preserved).
+    """
+
+    def __init__(self, state_path: Optional[Path] = None, initial_rate: float = DEFAULT_RATE,
+                 min_rate: float = ADAPTIVE_MIN_RATE, max_rate: Optional[float] = None):
+        self.state_path = Path(state_path) if state_path else None
+        self.min_rate = min_rate
+        self.max_rate = max(min_rate, initial_rate if max_rate is None else max_rate)
+        self.initial_rate = self._clamp(initial_rate)
+        self.hosts: Dict[str, HostRate] = {}
+        self.stats = {'increases': 0, 'backoffs': 0, 'retry_after': 0}
+        self._saved: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if self.state_path and self.state_path.exists():
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    self._saved = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable rate state {self.state_path}: {e}")
+
+    def _clamp(self, rate: float) -> float:
+        return min(self.max_rate, max(self.min_rate, rate))
+
+    def host(self, url: str) -> HostRate:
+        name = urlparse(url).netloc
+        with self._lock:
+            state = self.hosts.get(name)
+            if state is None:
+                saved = self._saved.get(name, {})
+                state = self.hosts[name] = HostRate(self._clamp(saved.get('rate', self.initial_rate)),
+                                                    saved.get('latency'))
+                if saved:
+                    logger.info(f"Rate for {name}: resuming at {state.rate:.2f} req/s")
+            return state
+
+    def acquire(self, url: str) -> float:
+        """Wait for this host's next slot (including any Retry-After pause)."""
+        state = self.host(url)
+        waited = 0.0
+        pause = state.paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        return waited + state.bucket.acquire()
+
+    def observe(self, url: str, latency: float, status: Optional[int],
+                retry_after: Optional[str] = None):
+        """Feed one response (status None = connection error) back into the host's rate."""
+        state = self.host(url)
+        now = time.monotonic()
+        with self._lock:
+            spike = (state.latency is not None and latency > LATENCY_SPIKE_FLOOR
+                     and latency > state.latency * LATENCY_SPIKE_FACTOR)
+            if not spike:
+                state.latency = latency if state.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * state.latency)
+
+            pause = _retry_after_seconds(retry_after)
+            if pause:
+                state.paused_until = max(state.paused_until, now + pause)
+                self.stats['retry_after'] += 1
+
+            if status is None or status in BACKOFF_STATUSES or spike or pause:
+                if now - state.last_decrease >= DECREASE_COOLDOWN:
+                    state.last_decrease = now
+                    state.bucket.set_rate(self._clamp(state.rate * ADAPTIVE_BACKOFF))
+                    self.stats['backoffs'] += 1
+                    logger.debug(f"Backing off {urlparse(url).netloc} to {state.rate:.2f} req/s "
+                                 f"(status={status}, latency={latency:.2f}s)")
+            elif status < 400 and state.rate < self.max_rate:
+                state.bucket.set_rate(self._clamp(state.rate + ADAPTIVE_INCREASE / state.rate))
+                self.stats['increases'] += 1
+
+    def send(self, url: str, request: Callable[[], requests.Response]) -> requests.Response:
+        """Wait for a slot, run `request()` and feed its outcome back. Errors propagate."""
+        self.acquire(url)
+        return self.timed(url, request)
+
+    def timed(self, url: str, request: Callable[[], requests.Response]) -> requests.Response:
+        """Run `request()` (slot already acquired) and feed its outcome back."""
+        start = time.monotonic()
+        try:
+            response = request()
+        except requests.RequestException:
+            self.observe(url, time.monotonic() - start, None)
+            raise
+        self.observe(url, time.monotonic() - start, response.status_code, response.headers.get('Retry-After'))
+        return response
+
+    def save(self):
+        """Merge this run's host rates into the state file."""
+        if not self.state_path or not self.hosts:
+            return
+        state = dict(self._saved)
+        for name, host in self.hosts.items():
+            state[name] = {
+                'rate': round(host.rate, 3),
+                'latency': round(host.latency, 4) if host.latency is not None else None,
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+            }
+        tmp = self.state_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def summary(self) -> str:
+        rates = ", ".join(f"{name} {host.rate:.2f}/s" for name, host in self.hosts.items())
+        return (f"Adaptive rate: {rates or 'no requests'} "
+                f"({self.stats['increases']} increases, {self.stats['backoffs']} backoffs, "
+                f"{self.stats['retry_after']} Retry-After)")
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    """Retry-After as seconds (delta-seconds form only; HTTP dates are ignored)."""
+    if not value:
+        return 0.0
+    try:
+        return min(MAX_RETRY_AFTER, max(0.0, float(value)))
+    except ValueError:
+        return 0.0
+
+# ============================================================================
+# FETCH ENGINE
+# ============================================================================
+
+class FetchEngine:
+    """
+    Bounded thread pool + token bucket + per-host concurrency cap.
+
+    `rate` is a hard ceiling across all workers, with or without an adaptive
+    limiter.
+    """
+
+    def __init__(self, session: requests.Session, rate: float = DEFAULT_RATE,
+                 burst: int = DEFAULT_BURST, max_workers: int = DEFAULT_MAX_WORKERS,
+                 per_host: int = DEFAULT_PER_HOST, adaptive: Optional[AdaptiveLimiter] = None,
+                 metrics=None, classify: Callable[[str], str] = None):
+        self.session = session
+        self.limiter = TokenBucket(rate, burst)
+        self.adaptive = adaptive
+        # Optional MetricsRegistry; `classify(url)` is the endpoint label (default: host)
+        self.metrics = metrics
+        self.classify = classify or (lambda url: urlparse(url).netloc)
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Size the connection pool to match the worker count
+        adapter = HTTPAdapter(pool_connections=self.per_host, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def get(self, url: str, params: Dict = None, headers: Dict = None) -> requests.Response:
+        """Rate-limited GET. Raises `requests.RequestException` on failure."""
+        start = time.perf_counter()
+        with self._slot(url):
+            if self.adaptive is not None:
+                self.adaptive.acquire(url)  # Host pace (and any Retry-After pause) first...
+            self.limiter.acquire()          # ...then the global ceiling
+            sent = time.perf_counter()
+            try:
+                if self.adaptive is None:
+                    response = self.session.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+                else:
+                    response = self.adaptive.timed(url, lambda: self.session.get(
+                        url, params=params, headers=headers, timeout=REQUEST_TIMEOUT))
+            except requests.RequestException:
+                self._record(url, start, sent, None)
+                raise
+        self._record(url, start, sent, response)
+        response.raise_for_status()
+        return response
+
+    def _record(self, url: str, start: float, sent: float, response: Optional[requests.Response]):
+        if self.metrics is None:
+            return
+        endpoint = self.classify(url)
+        self.metrics.observe('heartland_request_wait_seconds', sent - start, endpoint=endpoint)
+        self.metrics.observe('heartland_network_seconds', time.perf_counter() - sent, endpoint=endpoint)
+        if response is None:
+            self.metrics.inc('heartland_requests_total', endpoint=endpoint, status='error')
+            return
+        self.metrics.inc('heartland_requests_total', endpoint=endpoint, status=response.status_code)
+        self.metrics.observe('heartland_response_bytes', len(response.content), endpoint=endpoint)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='heartland-fetch'
+            )
+        return self._executor
+
+    def map(self, fn: Callable, items: Iterable) -> Iterator:
+        """Run `fn(item)` for every item on the pool, yielding results in input order.
+
+        `fn` must not call `map()` itself - nested submission can starve the pool.
+        """
+        items = list(items)
+        if self.max_workers == 1 or len(items) <= 1:
+            for item in items:
+                yield fn(item)
+            return
+        yield from self.executor.map(fn, items)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.adaptive is not None:
+            self.adaptive.save()
+            logger.info(self.adaptive.summary())
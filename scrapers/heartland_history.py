@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Heartland Standings History
+===========================
+Multi-season standings in one memory-mapped columnar file, with sorted
+secondary indexes, so a query reads only the rows it returns instead of
+json.load()-ing every dump.
+
+File layout (standings_history.bin; little-endian, sections 8-byte aligned):
+
+    header      magic, format, section count, row count
+    directory   (name, offset, length) per section
+    col:<f>     one int32 per row: the value (numeric fields) or a dictionary code
+    dict:<f>:*  a string field's distinct values, sorted: uint32 offsets + UTF-8 blob
+    idx:<name>  row ids (int32) sorted by the index key
+
+Dictionaries are sorted, so codes compare like the strings they stand for and
+a value is found by binary search without decoding the dictionary. Indexes:
+
+    season_gender_age   (season, gender, age_group)
+    team_number         team_number
+    subdivision         subdivision
+
+A query binary-searches the best index for its filters, checks any remaining
+filters against the mapped columns of the candidate rows only, and returns
+the matches as a StandingsTable. Nothing else is read from disk.
+
+Usage:
+    python heartland_history.py build standings_history.bin heartland_data/heartland_standings_*.json
+    python heartland_history.py build standings_history.bin --snapshots heartland_data/snapshots
+    python heartland_history.py query standings_history.bin --season 2023-24 --gender Girls --age U13 --level premier
+    python heartland_history.py query standings_history.bin --team 7912
+
+    with HistoryStore('standings_history.bin') as history:
+        table = history.query(season='2023-24', gender='Girls', age_group='U13', level='premier')
+        table = history.team_history('7912')
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import product
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+
+from heartland_table import StandingsTable, STANDINGS_FIELDS, NUMERIC_FIELDS, CATEGORICAL_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HISTORY_FILE = "standings_history.bin"
+
+MAGIC = b'HLHIST01'
+HISTORY_FORMAT = 1
+HEADER = struct.Struct('<8sIIQ')    # magic, format, sections, rows
+SECTION = struct.Struct('<24sQQ')   # name, offset, length
+ALIGN = 8
+
+# Index name -> key fields, in the order a query tries them
+INDEXES = {
+    'team_number': ('team_number',),
+    'subdivision': ('subdivision',),
+    'season_gender_age': ('season', 'gender', 'age_group'),
+}
+
+LEVELS = {'premier': '_prem', 'recreational': '_rec'}
+
+Filter = Union[str, Iterable[str]]
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def seasons_for_code(code: str) -> List[str]:
+    """'2023-24' -> ['2023_fall', '2024_spring'] (the inverse of the scraper's season codes)."""
+    year = int(code[:4])
+    return [f"{year}_fall", f"{year + 1}_spring"]
+
+
+def _season_order(season: str) -> Tuple[int, int]:
+    year, _, term = season.partition('_')
+    return (int(year) if year.isdigit() else 0, 1 if term == 'fall' else 0)
+
+
+def _require_little_endian():
+    if sys.byteorder != 'little':
+        raise RuntimeError("heartland_history files are little-endian; this machine is not")
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def build_history(path: Path, tables: Iterable[StandingsTable]) -> int:
+    """
+    Write a history file from `tables`, oldest first; returns the row count.
+
+    Each season's rows come from the newest table that has the season, so
+    re-scraped seasons replace older copies instead of doubling up.
+    """
+    _require_little_endian()
+    latest: Dict[str, Tuple[StandingsTable, List[int]]] = {}
+    for table in tables:
+        names, rows = table.categories('season'), {}
+        for i, code in enumerate(table.codes('season')):
+            rows.setdefault(names[code], []).append(i)
+        latest.update((season, (table, ids)) for season, ids in rows.items())
+
+    values: Dict[str, list] = {name: [] for name in STANDINGS_FIELDS}
+    for season in sorted(latest, key=_season_order, reverse=True):
+        table, ids = latest[season]
+        for name in STANDINGS_FIELDS:
+            column = table.codes(name)
+            if name in NUMERIC_FIELDS:
+                values[name].extend(column[i] for i in ids)
+            else:
+                categories = table.categories(name)
+                values[name].extend(categories[column[i]] for i in ids)
+    rows = len(values['season'])
+
+    sections: List[Tuple[str, bytes]] = []
+    columns: Dict[str, array] = {}
+    for name in STANDINGS_FIELDS:
+        if name in NUMERIC_FIELDS:
+            columns[name] = array('i', values[name])
+            continue
+        distinct = sorted(set(values[name]))
+        code = {value: i for i, value in enumerate(distinct)}
+        columns[name] = array('i', map(code.__getitem__, values[name]))
+        blobs = [value.encode('utf-8') for value in distinct]
+        offsets = array('I', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        sections += [(f"dict:{name}:off", offsets.tobytes()), (f"dict:{name}:blob", b''.join(blobs))]
+    sections += [(f"col:{name}", columns[name].tobytes()) for name in STANDINGS_FIELDS]
+    for index, fields in INDEXES.items():
+        keys = [columns[name] for name in fields]
+        order = sorted(range(rows), key=lambda r: tuple(key[r] for key in keys))
+        sections.append((f"idx:{index}", array('i', order).tobytes()))
+
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    offset = -(-(HEADER.size + SECTION.size * len(sections)) // ALIGN) * ALIGN
+    directory, layout = [], []
+    for name, data in sections:
+        directory.append(SECTION.pack(name.encode('ascii'), offset, len(data)))
+        layout.append((offset, data))
+        offset += -(-len(data) // ALIGN) * ALIGN
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, HISTORY_FORMAT, len(sections), rows))
+        f.write(b''.join(directory))
+        for start, data in layout:
+            f.write(b'\0' * (start - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+    logger.info(f"History: {rows} rows from {len(latest)} seasons written to {path}")
+    return rows
+
+# ============================================================================
+# READ
+# ============================================================================
+
+class MappedDictionary:
+    """Sorted string dictionary read in place: code -> value, value -> code by binary search."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+        self._values: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def value(self, code: int) -> str:
+        value = self._values.get(code)
+        if value is None:
+            value = self._values[code] = str(self._blob[self._offsets[code]:self._offsets[code + 1]], 'utf-8')
+        return value
+
+    def code(self, value: str) -> Optional[int]:
+        i = bisect_left(range(len(self)), value, key=self.value)
+        return i if i < len(self) and self.value(i) == value else None
+
+    def values(self) -> List[str]:
+        return [self.value(code) for code in range(len(self))]
+
+
+class HistoryStore:
+    def __init__(self, path: Path = HISTORY_FILE):
+        _require_little_endian()
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = []
+        magic, version, count, self.rows = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != HISTORY_FORMAT:
+            self.close()
+            raise ValueError(f"{self.path} is not a standings history file")
+        self._sections = {}
+        for i in range(count):
+            name, offset, length = SECTION.unpack_from(self._mm, HEADER.size + i * SECTION.size)
+            self._sections[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+        self.columns = {name: self._view(f"col:{name}", 'i') for name in STANDINGS_FIELDS}
+        self.dicts = {name: MappedDictionary(self._view(f"dict:{name}:off", 'I'), self._view(f"dict:{name}:blob"))
+                      for name in CATEGORICAL_FIELDS}
+        self.indexes = {name: self._view(f"idx:{name}", 'i') for name in INDEXES}
+
+    def _view(self, section: str, fmt: str = None) -> memoryview:
+        offset, length = self._sections[section]
+        view = memoryview(self._mm)[offset:offset + length]
+        if fmt:
+            view = view.cast(fmt)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        if self._mm is not None:
+            for view in self._views:
+                view.release()
+            self._views = []
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def _codes(self, name: str, wanted: Filter) -> List[int]:
+        """Sorted dictionary codes of the wanted values of `name` (absent values dropped)."""
+        wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+        if name == 'season':
+            wanted = [s for value in wanted for s in (seasons_for_code(value) if '-' in value else [value])]
+        codes = (self.dicts[name].code(value) for value in wanted)
+        return sorted({code for code in codes if code is not None})
+
+    def row_ids(self, level: Optional[str] = None, **filters: Filter) -> List[int]:
+        """
+        Row ids matching every filter, in file order.
+
+        Filters are string fields (season, gender, age_group, subdivision,
+        team_number, team_name, division), each one value or several. A season
+        may be given as its code ('2023-24'); `level` is 'premier' or
+        'recreational'.
+        """
+        unknown = set(filters) - set(CATEGORICAL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        if level is not None:
+            suffix = LEVELS[level.lower()]
+            divisions = [d for d in self.dicts['division'].values() if d.endswith(suffix)]
+            if 'division' in filters:
+                divisions = [d for d in self._values(filters['division']) if d in divisions]
+            filters['division'] = divisions
+        wanted = {name: self._codes(name, value) for name, value in filters.items()}
+        if any(not codes for codes in wanted.values()):
+            return []
+
+        ids: Optional[List[int]] = None
+        for index, fields in INDEXES.items():
+            prefix = 0
+            while prefix < len(fields) and fields[prefix] in wanted:
+                prefix += 1
+            if prefix:
+                ids = self._scan(index, fields[:prefix], wanted)
+                for name in fields[:prefix]:
+                    del wanted[name]
+                break
+        if ids is None:
+            ids = range(self.rows)
+        for name, codes in wanted.items():
+            column, allowed = self.columns[name], set(codes)
+            ids = [r for r in ids if column[r] in allowed]
+        return sorted(ids)
+
+    @staticmethod
+    def _values(value: Filter) -> List[str]:
+        return [value] if isinstance(value, str) else list(value)
+
+    def _scan(self, index: str, fields: Tuple[str, ...], wanted: Dict[str, List[int]]) -> List[int]:
+        """Row ids of the index ranges for every combination of the wanted key codes."""
+        order = self.indexes[index]
+        columns = [self.columns[name] for name in fields]
+
+        def key(r):
+            return tuple(column[r] for column in columns)
+
+        ids: List[int] = []
+        for target in product(*(wanted[name] for name in fields)):
+            lo = bisect_left(order, target, key=key)
+            hi = bisect_right(order, target, lo=lo, key=key)
+            ids.extend(order[lo:hi])
+        return ids
+
+    def take(self, ids: Sequence[int]) -> StandingsTable:
+        """Rows `ids` as a StandingsTable (only their dictionary values are decoded)."""
+        columns, categories = {}, {}
+        for name in STANDINGS_FIELDS:
+            column = self.columns[name]
+            if name in NUMERIC_FIELDS:
+                columns[name] = [column[r] for r in ids]
+                continue
+            local: Dict[int, int] = {}
+            columns[name] = [local.setdefault(column[r], len(local)) for r in ids]
+            categories[name] = [self.dicts[name].value(code) for code in local]
+        table = StandingsTable()
+        table.extend_columns(columns, categories=categories)
+        return table
+
+    def query(self, level: Optional[str] = None, **filters: Filter) -> StandingsTable:
+        """Matching rows as a StandingsTable; see row_ids() for the filters."""
+        return self.take(self.row_ids(level=level, **filters))
+
+    def team_history(self, team_number: str) -> StandingsTable:
+        """Every season of one team, oldest first."""
+        ids = self.row_ids(team_number=team_number)
+        season = self.columns['season']
+        names = self.dicts['season']
+        ids.sort(key=lambda r: _season_order(names.value(season[r])))
+        return self.take(ids)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _sources(files: List[str], snapshots: Optional[str]) -> Iterable[StandingsTable]:
+    """Standings tables, oldest first: snapshot days and output files by the date in their name."""
+    from heartland_snapshots import SnapshotStore, read_standings_file, date_key
+    loaders = [(date_key(Path(name).name), read_standings_file, Path(name)) for name in files]
+    if snapshots:
+        store = SnapshotStore(Path(snapshots))
+        loaders += [(date_key(day), store.load, day) for day in store.dates()]
+    for _, load, source in sorted(loaders, key=lambda loader: loader[0]):
+        yield load(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory-mapped Heartland standings history')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build', help='Build a history file from standings output files and/or snapshots')
+    p.add_argument('history')
+    p.add_argument('files', nargs='*', help='heartland_standings_YYYY_MM_DD.json / .ndjson files')
+    p.add_argument('--snapshots', help='Snapshot store directory (heartland_snapshots.py)')
+    p = sub.add_parser('query', help='Print matching rows as CSV')
+    p.add_argument('history')
+    p.add_argument('--season', nargs='+', help="Season(s), e.g. 2023_fall or 2023-24")
+    p.add_argument('--gender', choices=['Boys', 'Girls'])
+    p.add_argument('--age', nargs='+', help='Age group(s), e.g. U13')
+    p.add_argument('--level', choices=sorted(LEVELS))
+    p.add_argument('--division', nargs='+')
+    p.add_argument('--subdivision')
+    p.add_argument('--team', help='Team number: the team across all seasons')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'build':
+        if not args.files and not args.snapshots:
+            parser.error("build needs standings files or --snapshots")
+        build_history(Path(args.history), _sources(args.files, args.snapshots))
+        return 0
+
+    import csv
+    with HistoryStore(Path(args.history)) as history:
+        if args.team:
+            table = history.team_history(args.team)
+        else:
+            filters = {name: value for name, value in (
+                ('season', args.season), ('gender', args.gender), ('age_group', args.age),
+                ('division', args.division), ('subdivision', args.subdivision)) if value}
+            table = history.query(level=args.level, **filters)
+        writer = csv.writer(sys.stdout)
+        writer.writerow(STANDINGS_FIELDS)
+        writer.writerows(table.iter_tuples())
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
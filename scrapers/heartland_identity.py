@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Heartland Team Identity Index
+=============================
+Gives every team a stable id across seasons, so downstream no longer has to
+fuzzy-match "Sporting City 2012G" (2023-24) to "Sporting City 12G" (2024-25).
+
+Each row is resolved with two hash lookups, never by comparing against other
+teams, so resolving a full history is linear in its rows:
+
+  1. (season, team_number) - Heartland hands team numbers out per season and
+     reuses them for other teams later, so a number only links rows within
+     one season (a re-scrape after a name edit keeps its id).
+  2. (gender, birth year, name signature) - the name is lower-cased, split
+     into tokens, stripped of birth-year, gender, age and filler tokens
+     ("2012G", "girls", "U13", "FC") and sorted. The birth year comes from
+     the name when it has one, else from the age group and season (U13 in
+     2025-26 = 2013). A team keeps its birth year as it ages, so this key
+     carries it from season to season.
+
+A name key is not reused for a second team in the same season (two squads
+with the same name and year get separate ids). The index is kept in
+team_identity.json.gz; ids, once given out, never change.
+
+Usage:
+    identity = TeamIdentityIndex(output_dir / TEAM_IDENTITY_FILE)
+    team_id = identity.resolve(row)        # row tuple in STANDINGS_FIELDS order
+    identity.save()
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from heartland_table import STANDINGS_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TEAM_IDENTITY_FILE = "team_identity.json.gz"
+IDENTITY_FORMAT = 1
+
+_F = {name: i for i, name in enumerate(STANDINGS_FIELDS)}
+
+TOKEN_SPLIT = re.compile(r'[^0-9a-z]+')
+YEAR_TOKEN = re.compile(r'^(?:(20\d\d)[bg]?|(\d\d)[bg])$')   # 2012, 2012g, 12g
+AGE_TOKEN = re.compile(r'^u\d+$')
+GENDER_TOKENS = frozenset(['b', 'g', 'boy', 'boys', 'girl', 'girls'])
+FILLER_TOKENS = frozenset(['fc', 'sc', 'soccer', 'club', 'the'])
+
+# ============================================================================
+# NAME NORMALIZATION
+# ============================================================================
+
+def name_tokens(name: str) -> Tuple[List[str], Optional[int]]:
+    """(identifying tokens in name order, birth year from the name or None)."""
+    tokens, year = [], None
+    for token in TOKEN_SPLIT.split(name.lower()):
+        if not token:
+            continue
+        match = YEAR_TOKEN.match(token)
+        if match:
+            year = int(match.group(1) or 2000 + int(match.group(2)))
+        elif token not in GENDER_TOKENS and token not in FILLER_TOKENS and not AGE_TOKEN.match(token):
+            tokens.append(token)
+    return tokens, year
+
+
+def name_signature(name: str) -> str:
+    """Order-free form of a team name: 'WUFC 12G Blaze Academy' -> 'academy blaze wufc'."""
+    tokens, _ = name_tokens(name)
+    return ' '.join(sorted(set(tokens))) or ' '.join(name.lower().split())
+
+
+def season_start_year(season: str) -> int:
+    """First calendar year of the academic year: 2025_fall and 2026_spring -> 2025."""
+    year, _, term = season.partition('_')
+    return int(year) if term == 'fall' else int(year) - 1
+
+
+def season_order(season: str) -> Tuple[int, int]:
+    """Chronological sort key: 2025_fall < 2026_spring < 2026_fall."""
+    return (season_start_year(season), 1 if season.endswith('_spring') else 0)
+
+
+def birth_year(row: Tuple) -> Optional[int]:
+    """Birth year named by the team, else implied by its age group in that season."""
+    _, year = name_tokens(row[_F['team_name']])
+    if year is not None:
+        return year
+    digits = ''.join(ch for ch in row[_F['age_group']] if ch.isdigit())
+    if not digits:
+        return None
+    return season_start_year(row[_F['season']]) + 1 - int(digits)
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class TeamIdentityIndex:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.by_number: Dict[Tuple[str, str], str] = {}
+        self.by_name: Dict[Tuple[str, Optional[int], str], str] = {}
+        self.teams: Dict[str, Dict] = {}
+        self.counts = {'number': 0, 'name': 0, 'new': 0}
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Unreadable team identity index {self.path}: {e}") from None
+        if data.get('identity') != IDENTITY_FORMAT:
+            raise ValueError(f"{self.path} has an unknown team identity layout")
+        self.teams = data['teams']
+        for season, number, team_id in data['numbers']:
+            self.by_number[(season, number)] = team_id
+        for gender, year, signature, team_id in data['names']:
+            self.by_name[(gender, year, signature)] = team_id
+
+    def save(self):
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump({
+                'identity': IDENTITY_FORMAT,
+                'teams': self.teams,
+                'numbers': [[season, number, team_id] for (season, number), team_id in self.by_number.items()],
+                'names': [[*key, team_id] for key, team_id in self.by_name.items()],
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    # -------------------------------------------------------------------------
+    # Resolution
+    # -------------------------------------------------------------------------
+
+    def _new_id(self, key: Tuple) -> str:
+        seed = '\x1f'.join(map(str, key))
+        while True:
+            team_id = 'hl-' + hashlib.blake2b(seed.encode('utf-8'), digest_size=6).hexdigest()
+            if team_id not in self.teams:
+                return team_id
+            seed += '+'
+
+    def resolve(self, row: Tuple) -> str:
+        """Stable team id for a standings row, creating one for a team not seen before."""
+        season, number, name = row[_F['season']], row[_F['team_number']], row[_F['team_name']]
+        year = birth_year(row)
+        name_key = (row[_F['gender']], year, name_signature(name))
+        number_key = (season, number)
+        claim = number or name  # What this row's team is called within its season
+
+        team_id, via = self.by_number.get(number_key) if number else None, 'number'
+        if team_id is None:
+            team_id, via = self.by_name.get(name_key), 'name'
+            if team_id is not None and self.teams[team_id]['seasons'].get(season, claim) != claim:
+                team_id = None  # Same name and year, but another team already has it this season
+        if team_id is None:
+            team_id, via = self._new_id(name_key + (season, claim)), 'new'
+            self.teams[team_id] = {'name': name, 'gender': row[_F['gender']], 'birth_year': year, 'seasons': {}}
+        self.counts[via] += 1
+
+        team = self.teams[team_id]
+        team['seasons'].setdefault(season, claim)
+        if season_order(season) >= max(map(season_order, team['seasons'])):
+            team['name'] = name  # Latest name wins for display
+        if number:
+            self.by_number.setdefault(number_key, team_id)
+        self.by_name.setdefault(name_key, team_id)
+        return team_id
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def summary(self) -> str:
+        c = self.counts
+        return (f"Team identity: {c['number']} rows by team number, {c['name']} by name, "
+                f"{c['new']} new teams ({len(self.teams):,} known)")
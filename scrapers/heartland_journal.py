@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Heartland Scrape Journal
+========================
+Append-only checkpoint log so interrupted scrapes can resume.
+
+Every completed work unit is appended as one NDJSON line holding the unit key
+and its parsed row tuples:
+
+    {"journal": 1, "started_at": "2026-01-15T02:00:00"}
+    {"unit": ["archive", "2024_fall", "boys_prem"], "rows": [[...], ...]}
+    {"unit": ["cgi", "2025_fall", "Boys", "Premier", "U-11", "3"], "rows": [...]}
+    {"completed_at": "2026-01-15T02:40:00"}
+
+A run that finishes cleanly ends the journal with a completion marker. With
+`resume=True` an unfinished journal is loaded and its units are replayed
+instead of re-fetched; a completed journal (or `resume=False`) is truncated,
+so a later resume never replays a finished run's stale rows. A torn final
+line (from a killed process) is ignored.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = "scrape_journal.ndjson"
+
+
+class ScrapeJournal:
+    """Unit key (tuple) -> completed rows, persisted append-only."""
+
+    def __init__(self, path: Path, resume: bool = False, fsync: bool = False):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.units: Dict[Tuple, Dict] = {}
+        self.replayed = 0
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists() and self._load():
+            self._f = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._f = open(self.path, 'w', encoding='utf-8')
+            self._append({'journal': 1, 'started_at': datetime.now().isoformat(timespec='seconds')})
+
+    def _load(self) -> bool:
+        """Load an unfinished journal; False (nothing loaded) if its run completed."""
+        started_at = completed_at = None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring torn journal line in {self.path}")
+                    continue
+                if 'unit' in entry:
+                    self.units[tuple(entry.pop('unit'))] = entry
+                elif 'started_at' in entry:
+                    started_at = entry['started_at']
+                elif 'completed_at' in entry:
+                    completed_at = entry['completed_at']
+        if completed_at is not None:
+            logger.info(f"Journal {self.path} is from a run that finished at {completed_at} - starting a new one")
+            self.units = {}
+            return False
+        logger.info(f"Resuming journal from {started_at}: {len(self.units)} completed units")
+        return True
+
+    def _append(self, entry: Dict):
+        self._f.write(json.dumps(entry, ensure_ascii=False))
+        self._f.write('\n')
+        self._f.flush()
+        if self.fsync:
+            os.fsync(self._f.fileno())
+
+    def completed(self, unit: Tuple) -> Optional[Dict]:
+        """The journal entry ({'rows': [...], ...}) for a finished unit, else None."""
+        entry = self.units.get(unit)
+        if entry is not None:
+            self.replayed += 1
+        return entry
+
+    def rows(self, entry: Dict) -> List[Tuple]:
+        return [tuple(row) for row in entry['rows']]
+
+    def record(self, unit: Tuple, rows: List[Tuple], **extra):
+        entry = {'unit': list(unit), 'rows': [list(row) for row in rows]}
+        entry.update(extra)
+        with self._lock:
+            self._append(entry)
+            self.units[tuple(unit)] = entry
+
+    def complete(self):
+        """Mark the run finished; a later resume starts a new journal instead of replaying this one."""
+        with self._lock:
+            self._append({'completed_at': datetime.now().isoformat(timespec='seconds')})
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+        if self.replayed:
+            logger.info(f"Journal: replayed {self.replayed} units from {self.path}")
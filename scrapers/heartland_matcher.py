@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Heartland Team Matcher
+======================
+Matches scraped Heartland team names to an exported production teams list
+(teams_v2 as CSV or NDJSON) without comparing every pair.
+
+  1. Blocking: teams are only compared within their (gender, birth year)
+     block. teams_v2 stores birth_year and derives age_group from it, and a
+     Heartland row's birth year comes from its name or its age group in
+     that season (heartland_identity.birth_year), so a block is the same
+     age group in every season. A list with only age_group is blocked the
+     same way, using the age group's birth year in the current season.
+  2. Candidates: an inverted index per block maps name tokens and character
+     trigrams to teams. Tokens are normalized as for team ids (year, gender,
+     age and filler tokens dropped). Tokens and trigrams that occur in too
+     many teams of a block are skipped; the rest vote, and only the TOP_K
+     teams with the most votes are scored.
+  3. Scoring: trigram Jaccard, token Jaccard and an edit distance bounded to
+     a few edits (anything further scores 0), blended into a 0-1 confidence.
+     The edit distance is bit-parallel, and it is skipped where the trigram
+     overlap already proves it is over the bound or cannot reach the top
+     matches.
+
+Known aliases are indexed next to the team's own name. Results for a
+(block, name) pair are memoized, since the same team appears once per season.
+
+Usage:
+    matcher = TeamMatcher.from_file('teams_v2.csv')
+    matcher.match('Sporting City 12G', 'Girls', 2012)     # [Match(team_id, name, confidence), ...]
+    for row, matches in matcher.match_teams(scraper.all_teams): ...
+
+    python heartland_matcher.py teams_v2.csv heartland_data/heartland_standings_2026_01_15.json --out matches.csv
+"""
+
+import argparse
+import csv
+import gzip
+import heapq
+import json
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date
+from itertools import chain
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from heartland_table import StandingsTable, STANDINGS_FIELDS
+from heartland_identity import name_tokens, birth_year, season_start_year
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TOP_K = 8                  # Candidates scored per query
+MAX_POSTING = 64           # Skip tokens / trigrams shared by more teams than this (per block)
+TOKEN_VOTES = 3            # A shared token counts as much as this many shared trigrams
+MAX_EDITS = 4              # Edit distance bound; further apart scores 0 on that component
+WEIGHTS = (0.5, 0.25, 0.25)  # trigram Jaccard, token Jaccard, edit similarity
+MIN_CONFIDENCE = 0.5
+MEMO_DEPTH = 3             # Matches ranked (and memoized) per distinct name
+
+GENDERS = {'m': 'M', 'male': 'M', 'boys': 'M', 'boy': 'M', 'b': 'M',
+           'f': 'F', 'female': 'F', 'girls': 'F', 'girl': 'F', 'g': 'F'}
+
+_F = {name: i for i, name in enumerate(STANDINGS_FIELDS)}
+
+Block = Tuple[str, Optional[int]]
+
+# ============================================================================
+# SIMILARITY
+# ============================================================================
+
+def normalize(name: str) -> Tuple[str, frozenset, frozenset]:
+    """(normalized name, token set, trigram set) of a team name."""
+    tokens, _ = name_tokens(name)
+    text = ' '.join(tokens) or ' '.join(name.lower().split())
+    padded = f"  {text} "
+    return text, frozenset(tokens), frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def bounded_levenshtein(a: str, b: str, bound: int) -> int:
+    """
+    Edit distance of a and b, or bound + 1 when it exceeds `bound`.
+
+    Bit-parallel (Myers / Hyyro): one column of the DP matrix is a pair of
+    integer bit vectors, so a character of `a` costs a dozen integer ops
+    however long `b` is.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    if not b:
+        return len(a)
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(b):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << len(b)) - 1
+    high = 1 << (len(b) - 1)
+    pv, mv, score = mask, 0, len(b)
+    for ch in a:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score if score <= bound else bound + 1
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def _overlap(query: Tuple[str, frozenset, frozenset], entry: Tuple[str, frozenset, frozenset]) -> Tuple[float, int]:
+    """
+    (trigram + token part of the confidence, lower bound on the edit distance).
+
+    One edit changes at most three trigrams, so names whose trigram sets
+    differ by more than 3 * MAX_EDITS need no edit distance at all.
+    """
+    grams, other_grams = query[2], entry[2]
+    shared = len(grams & other_grams)
+    union = len(grams) + len(other_grams) - shared
+    tri, tok, _ = WEIGHTS
+    partial = tri * (shared / union if union else 1.0) + tok * _jaccard(query[1], entry[1])
+    min_edits = max(-(-(max(len(grams), len(other_grams)) - shared) // 3), abs(len(query[0]) - len(entry[0])))
+    return partial, min_edits
+
+
+def _edit_similarity(text: str, other: str, edits: int) -> float:
+    return 1 - edits / max(len(text), len(other)) if edits <= MAX_EDITS else 0.0
+
+
+def confidence(query: Tuple[str, frozenset, frozenset], entry: Tuple[str, frozenset, frozenset]) -> float:
+    text, other = query[0], entry[0]
+    if text == other:
+        return 1.0
+    partial, min_edits = _overlap(query, entry)
+    edits = bounded_levenshtein(text, other, MAX_EDITS) if min_edits <= MAX_EDITS else MAX_EDITS + 1
+    return round(partial + WEIGHTS[2] * _edit_similarity(text, other, edits), 4)
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+@dataclass(frozen=True)
+class Match:
+    team_id: str
+    name: str
+    confidence: float
+
+
+class _BlockIndex:
+    __slots__ = ('entries', 'postings')
+
+    def __init__(self):
+        self.entries: List[Tuple[str, str, Tuple[str, frozenset, frozenset]]] = []  # (team id, name, normalized)
+        self.postings: Dict[str, List[int]] = defaultdict(list)  # token or '#' + trigram -> entry positions
+
+    def add(self, team_id: str, name: str):
+        normalized = normalize(name)
+        position = len(self.entries)
+        self.entries.append((team_id, name, normalized))
+        postings = self.postings
+        for token in normalized[1]:
+            postings[token].append(position)
+        for gram in normalized[2]:
+            postings['#' + gram].append(position)
+
+    def candidates(self, normalized: Tuple[str, frozenset, frozenset]) -> List[int]:
+        """Entry positions with the most shared (not too common) tokens and trigrams."""
+        postings = self.postings
+        lists = []
+        for token in normalized[1]:
+            posting = postings.get(token)
+            if posting is not None and len(posting) <= MAX_POSTING:
+                lists += [posting] * TOKEN_VOTES
+        for gram in normalized[2]:
+            posting = postings.get('#' + gram)
+            if posting is not None and len(posting) <= MAX_POSTING:
+                lists.append(posting)
+        votes = Counter(chain.from_iterable(lists))
+        if not votes and len(self.entries) <= MAX_POSTING:
+            return list(range(len(self.entries)))  # Tiny block with only common keys: score it all
+        best = heapq.nlargest(TOP_K, votes.items(), key=lambda item: (item[1], -item[0]))  # Ties: first added
+        return [position for position, _ in best]
+
+
+class TeamMatcher:
+    def __init__(self, teams: Iterable[Tuple[str, str, str, Optional[int]]] = ()):
+        """`teams`: (team id, name, gender, birth year) - aliases are extra entries with the same id."""
+        self.blocks: Dict[Block, _BlockIndex] = {}
+        self._memo: Dict[Tuple[Block, str], List[Match]] = {}
+        self._found: Dict[Tuple[Block, str], int] = {}
+        self.size = 0
+        for team_id, name, gender, year in teams:
+            self.add(team_id, name, gender, year)
+
+    def add(self, team_id: str, name: str, gender: str, year: Optional[int]):
+        key = (GENDERS.get(str(gender).strip().lower(), str(gender)), year)
+        self.blocks.setdefault(key, _BlockIndex()).add(team_id, name)
+        self._memo.clear()
+        self._found.clear()
+        self.size += 1
+
+    @classmethod
+    def from_file(cls, path: Path, season: str = None) -> "TeamMatcher":
+        """
+        Index an exported teams list (.csv or .ndjson, optionally .gz).
+
+        Uses id, display_name (else canonical_name / team_name), gender,
+        birth_year (else age_group, in `season`'s terms - default the current
+        one) and known_aliases when present.
+        """
+        start = season_start_year(season) if season else _current_start_year()
+        matcher = cls()
+        count = 0
+        for record in _read_records(Path(path)):
+            name = record.get('display_name') or record.get('canonical_name') or record.get('team_name')
+            if not name:
+                continue
+            year = record.get('birth_year')
+            if year in (None, '') and record.get('age_group'):
+                digits = ''.join(ch for ch in str(record['age_group']) if ch.isdigit())
+                year = start + 1 - int(digits) if digits else None
+            year = int(year) if year not in (None, '') else None
+            team_id = str(record.get('id') or name)
+            matcher.add(team_id, name, record.get('gender', ''), year)
+            for alias in _aliases(record.get('known_aliases')):
+                matcher.add(team_id, alias, record.get('gender', ''), year)
+            count += 1
+        logger.info(f"Matcher: {count} teams ({matcher.size} names) in {len(matcher.blocks)} blocks")
+        return matcher
+
+    # -------------------------------------------------------------------------
+    # Matching
+    # -------------------------------------------------------------------------
+
+    def match(self, name: str, gender: str, year: Optional[int], limit: int = 3) -> List[Match]:
+        """Best `limit` teams of the (gender, birth year) block, most confident first."""
+        block_key = (GENDERS.get(str(gender).strip().lower(), str(gender)), year)
+        block = self.blocks.get(block_key)
+        if block is None:
+            return []
+        normalized = normalize(name)
+        memo_key = (block_key, normalized[0])
+        matches = self._memo.get(memo_key)
+        if matches is None or len(matches) < min(limit, self._found.get(memo_key, limit)):
+            matches = self._memo[memo_key] = self._rank(block, normalized, max(limit, MEMO_DEPTH))
+            self._found[memo_key] = len(matches)
+        return matches[:limit]
+
+    @staticmethod
+    def _rank(block: _BlockIndex, normalized: Tuple[str, frozenset, frozenset], depth: int) -> List[Match]:
+        """
+        The `depth` best candidates, scored exactly.
+
+        Candidates are visited by the best score their trigram overlap allows;
+        once that ceiling is below the current top `depth`, the rest are left
+        out without computing their edit distance.
+        """
+        text = normalized[0]
+        scored = []
+        for position in block.candidates(normalized):
+            team_id, team_name, entry = block.entries[position]
+            partial, min_edits = _overlap(normalized, entry)
+            ceiling = 1.0 if entry[0] == text else partial + WEIGHTS[2] * _edit_similarity(text, entry[0], min_edits)
+            scored.append((ceiling, partial, min_edits, team_id, team_name, entry))
+        scored.sort(key=lambda item: -item[0])
+        best: Dict[str, Match] = {}
+        floor = -1.0  # depth-th best score so far
+        for ceiling, partial, min_edits, team_id, team_name, entry in scored:
+            if ceiling < floor:
+                break
+            if entry[0] == text:
+                score = 1.0
+            else:
+                edits = (bounded_levenshtein(text, entry[0], MAX_EDITS) if min_edits <= MAX_EDITS
+                         else MAX_EDITS + 1)
+                score = round(partial + WEIGHTS[2] * _edit_similarity(text, entry[0], edits), 4)
+            if team_id not in best or score > best[team_id].confidence:
+                best[team_id] = Match(team_id, team_name, score)
+                if len(best) >= depth:
+                    floor = sorted(m.confidence for m in best.values())[-depth]
+        return sorted(best.values(), key=lambda m: -m.confidence)[:depth]
+
+    def match_row(self, row: Tuple, limit: int = 3) -> List[Match]:
+        """Matches for a standings row tuple (STANDINGS_FIELDS order)."""
+        return self.match(row[_F['team_name']], row[_F['gender']], birth_year(row), limit)
+
+    def match_teams(self, teams, limit: int = 3) -> Iterator[Tuple[Tuple, List[Match]]]:
+        """(row tuple, matches) for a StandingsTable or a list of TeamStanding objects / row views."""
+        rows = teams.iter_tuples() if isinstance(teams, StandingsTable) else (
+            team if isinstance(team, tuple) else tuple(getattr(team, name) for name in STANDINGS_FIELDS)
+            for team in teams)
+        for row in rows:
+            yield row, self.match_row(row, limit)
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def _current_start_year() -> int:
+    today = date.today()
+    return today.year if today.month >= 8 else today.year - 1
+
+
+def _open(path: Path) -> IO[str]:
+    if path.name.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def _read_records(path: Path) -> Iterator[Dict]:
+    with _open(path) as f:
+        if '.csv' in path.name:
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _aliases(value) -> List[str]:
+    """known_aliases as a list (JSON array, Postgres array literal or a list)."""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(alias) for alias in value if alias]
+    text = str(value).strip()
+    if text.startswith('['):
+        return [str(alias) for alias in json.loads(text) if alias]
+    if text.startswith('{') and text.endswith('}'):
+        return next(csv.reader([text[1:-1]], skipinitialspace=True), [])
+    return [text]
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Match Heartland standings team names to a teams_v2 export')
+    parser.add_argument('teams', help='teams_v2 export (.csv or .ndjson, optionally .gz)')
+    parser.add_argument('standings', help='heartland_standings_*.json / .ndjson output file')
+    parser.add_argument('--out', help='CSV output (default: stdout)')
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE,
+                        help=f'Leave rows below this confidence unmatched (default: {MIN_CONFIDENCE})')
+    parser.add_argument('--season', help="Season that age_group-only teams lists refer to (default: current)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from heartland_snapshots import read_standings_file
+    matcher = TeamMatcher.from_file(Path(args.teams), season=args.season)
+    table = read_standings_file(Path(args.standings))
+    out = open(args.out, 'w', encoding='utf-8', newline='') if args.out else sys.stdout
+    matched = 0
+    try:
+        writer = csv.writer(out)
+        writer.writerow(['team_number', 'team_name', 'season', 'gender', 'age_group',
+                         'team_id', 'matched_name', 'confidence', 'runner_up_confidence'])
+        for row, matches in matcher.match_teams(table, limit=2):
+            best = matches[0] if matches and matches[0].confidence >= args.min_confidence else None
+            matched += best is not None
+            writer.writerow([row[_F['team_number']], row[_F['team_name']], row[_F['season']],
+                             row[_F['gender']], row[_F['age_group']],
+                             best.team_id if best else '', best.name if best else '',
+                             best.confidence if best else '',
+                             matches[1].confidence if best and len(matches) > 1 else ''])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    logger.info(f"Matched {matched} of {len(table)} rows (confidence >= {args.min_confidence})")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Heartland Run Metrics
+=====================
+Thread-safe counters, gauges and histograms for one scraper run, dumped as
+JSON and Prometheus text at the end.
+
+Metrics recorded by heartland_scraper_v4 (endpoint = archive | cgi; the parse
+and rows-per-page metrics label match results pages as results):
+
+    heartland_request_wait_seconds{endpoint}    limiter + per-host slot wait
+    heartland_network_seconds{endpoint}         time inside the HTTP request
+    heartland_response_bytes{endpoint}          body size
+    heartland_requests_total{endpoint,status}   responses by status ("error" = no response)
+    heartland_parse_seconds{endpoint}           parse time per page
+    heartland_rows_per_page{endpoint}           rows parsed per page
+    heartland_export_seconds{sink}              time writing each batch, per output sink
+    heartland_run_seconds, heartland_rows_total (gauges)
+
+Usage:
+    metrics = MetricsRegistry()
+    metrics.observe('heartland_parse_seconds', 0.012, endpoint='cgi')
+    with metrics.timer('heartland_export_seconds', sink='csv'):
+        ...
+    metrics.dump(output_dir / 'metrics.json', output_dir / 'metrics.prom')
+"""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ROWS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Bucket layout per histogram name; anything else uses SECONDS_BUCKETS
+HISTOGRAM_BUCKETS = {
+    'heartland_response_bytes': BYTES_BUCKETS,
+    'heartland_rows_per_page': ROWS_BUCKETS,
+}
+
+HELP = {
+    'heartland_request_wait_seconds': 'Time waiting for the rate limiter and per-host slot',
+    'heartland_network_seconds': 'Time spent in the HTTP request',
+    'heartland_response_bytes': 'Response body size',
+    'heartland_requests_total': 'HTTP responses by status',
+    'heartland_parse_seconds': 'Parse time per page',
+    'heartland_rows_per_page': 'Rows parsed per page',
+    'heartland_export_seconds': 'Time writing a batch of rows to an output sink',
+    'heartland_run_seconds': 'Wall time of the run',
+    'heartland_rows_total': 'Rows scraped this run',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# ============================================================================
+# HISTOGRAM
+# ============================================================================
+
+class Histogram:
+    """Fixed buckets (upper bounds) plus count and sum, as in Prometheus."""
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None = above every bucket)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': {str(b): n for b, n in zip(self.buckets, self.counts)},
+            'inf': self.counts[-1],
+        }
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(HISTOGRAM_BUCKETS.get(name, SECONDS_BUCKETS))
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    # -------------------------------------------------------------------------
+    # Output
+    # -------------------------------------------------------------------------
+
+    def to_json(self) -> Dict:
+        def series(metrics, render):
+            return {name: [dict(labels, **render(value)) for labels, value in sorted(by_labels.items())]
+                    for name, by_labels in sorted(metrics.items())}
+        with self._lock:
+            return {
+                'histograms': series(self.histograms, lambda h: h.to_dict()),
+                'counters': series(self.counters, lambda v: {'value': v}),
+                'gauges': series(self.gauges, lambda v: {'value': v}),
+            }
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def header(name, kind):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, by_labels in sorted(self.histograms.items()):
+                header(name, 'histogram')
+                for labels, h in sorted(by_labels.items()):
+                    cumulative = 0
+                    for bound, n in zip(h.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+            for kind, metrics in (('counter', self.counters), ('gauge', self.gauges)):
+                for name, by_labels in sorted(metrics.items()):
+                    header(name, kind)
+                    for labels, value in sorted(by_labels.items()):
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, json_path: Optional[Path] = None, prom_path: Optional[Path] = None):
+        self.set('heartland_run_seconds', round(time.monotonic() - self.started, 3))
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_json(), f, indent=2)
+        if prom_path:
+            with open(prom_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+
+    def summary(self) -> str:
+        """One line per endpoint: where the time went."""
+        lines = []
+        with self._lock:
+            endpoints = sorted({dict(labels).get('endpoint') for by_labels in self.histograms.values()
+                                for labels in by_labels} - {None})
+            for endpoint in endpoints:
+                key = (('endpoint', endpoint),)
+                parts = []
+                for name, label in (('heartland_request_wait_seconds', 'wait'),
+                                    ('heartland_network_seconds', 'network'),
+                                    ('heartland_parse_seconds', 'parse')):
+                    h = self.histograms.get(name, {}).get(key)
+                    if h is not None:
+                        parts.append(f"{label} {h.sum:.1f}s")
+                rows = self.histograms.get('heartland_rows_per_page', {}).get(key)
+                if rows is not None:
+                    parts.append(f"{rows.count} pages, {rows.sum:.0f} rows")
+                lines.append(f"{endpoint}: " + ", ".join(parts))
+        return "Metrics: " + "; ".join(lines) if lines else "Metrics: no requests"
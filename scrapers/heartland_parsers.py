@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Heartland HTML Parser Backends
+==============================
+Table/header extraction for Heartland standings pages behind one interface.
+
+Every backend turns a page into the same three views:
+  - tables(html):          each <table> as rows of stripped cell texts
+  - archive_events(html):  ('header', text) / ('table', rows) in document order
+  - row_events(html):      ('header', text) / ('row', cells) in document order,
+                           streamed as rows close (stdlib and lxml)
+
+Semantics match the original BeautifulSoup code exactly: `find_all` is
+recursive (nested rows/cells count toward every enclosing table/row) and
+cell/header text is `get_text(strip=True)` - every text node stripped and
+concatenated without separators.
+
+Backends:
+    stdlib  - event-driven html.parser.HTMLParser extractor (no dependencies)
+    lxml    - lxml.html tree + itertext for tables; lxml.etree.HTMLPullParser
+              for streamed row events (only when lxml is installed)
+    bs4     - BeautifulSoup reference implementation (fallback; row events
+              are flattened from the whole tree)
+    auto    - lxml when installed, otherwise stdlib
+
+stdlib and lxml produce output identical to bs4 on every page in heartland_data/.
+lxml repairs malformed markup more aggressively than html.parser, so if a new
+page layout ever diverges, pin `--parser stdlib` (exact tree semantics).
+"""
+
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HEADER_TAGS = ('h2', 'h3', 'h4', 'p', 'b', 'strong')
+ARCHIVE_TAGS = HEADER_TAGS + ('table',)
+CELL_TAGS = ('td', 'th')
+SKIP_TEXT_TAGS = ('script', 'style', 'template')
+TEXT_TAGS = frozenset(HEADER_TAGS + CELL_TAGS)
+
+# Elements BeautifulSoup never pushes onto its open-tag stack
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer',
+])
+
+STREAM_CHUNK_SIZE = 16 * 1024  # Characters fed to the streaming parser per step
+
+Rows = List[List[str]]
+ArchiveEvent = Tuple[str, object]  # ('header', str), ('table', Rows) or ('row', List[str])
+
+# ============================================================================
+# STDLIB BACKEND (event-driven)
+# ============================================================================
+
+class _Node:
+    """An open element; tables collect rows, rows collect cells, text tags collect text."""
+    __slots__ = ('tag', 'collect', 'chunks', 'rows', 'cells', 'done')
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.collect = tag in TEXT_TAGS
+        self.chunks: List[str] = []
+        self.rows: List["_Node"] = []
+        self.cells: List["_Node"] = []
+        self.done = False
+
+    def text(self) -> str:
+        return ''.join(self.chunks)
+
+
+class TableEventParser(HTMLParser):
+    """
+    Single-pass extractor for tables and header candidates.
+
+    Events are queued in start-tag order (the order `find_all` visits them) and
+    released by `drain()` once they and everything before them have closed, so
+    the parser can be fed incrementally.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[_Node] = []
+        self.pending: List[_Node] = []
+        self._head = 0
+        self._data: List[str] = []
+        self._skip = 0
+
+    # -------------------------------------------------------------------------
+    # Text handling - a text node is everything between two tag events
+    # -------------------------------------------------------------------------
+
+    def _flush(self):
+        if not self._data:
+            return
+        text = ''.join(self._data).strip()
+        self._data = []
+        if not text or self._skip:
+            return
+        for node in self.stack:
+            if node.collect:
+                node.chunks.append(text)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    # -------------------------------------------------------------------------
+    # Tag handling
+    # -------------------------------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in VOID_TAGS:
+            return
+        node = _Node(tag)
+        if tag == 'table' or tag in HEADER_TAGS:
+            self.pending.append(node)
+        elif tag == 'tr':
+            for open_node in self.stack:
+                if open_node.tag == 'table':
+                    open_node.rows.append(node)
+        elif tag in CELL_TAGS:
+            for open_node in self.stack:
+                if open_node.tag == 'tr':
+                    open_node.cells.append(node)
+        elif tag in SKIP_TEXT_TAGS:
+            self._skip += 1
+        self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == tag:
+                break
+        else:
+            return
+        while len(self.stack) > i:
+            node = self.stack.pop()
+            node.done = True
+            if node.tag in SKIP_TEXT_TAGS:
+                self._skip -= 1
+
+    def close(self):
+        super().close()
+        self._flush()
+        while self.stack:
+            self.stack.pop().done = True
+
+    # -------------------------------------------------------------------------
+    # Event release
+    # -------------------------------------------------------------------------
+
+    def drain(self) -> Iterator[ArchiveEvent]:
+        """Yield every completed event whose predecessors are also complete."""
+        while self._head < len(self.pending) and self.pending[self._head].done:
+            node = self.pending[self._head]
+            self.pending[self._head] = None
+            self._head += 1
+            if node.tag == 'table':
+                yield ('table', [[cell.text() for cell in row.cells] for row in node.rows])
+            else:
+                yield ('header', node.text())
+        if self._head > 1024:
+            del self.pending[:self._head]
+            self._head = 0
+
+
+class RowEventParser(TableEventParser):
+    """
+    Streaming variant of TableEventParser that releases table rows one at a time.
+
+    While a table is at the head of the queue its finished rows are yielded and
+    dropped immediately, so parser memory stays bounded by the largest open
+    row rather than the page. Headers nested inside a table are still released
+    after the table's rows, matching `find_all` visiting order.
+    """
+
+    def drain(self) -> Iterator[ArchiveEvent]:
+        while self._head < len(self.pending):
+            node = self.pending[self._head]
+            if node.tag == 'table':
+                finished = 0
+                for row in node.rows:
+                    if not row.done:
+                        break
+                    finished += 1
+                for row in node.rows[:finished]:
+                    yield ('row', [cell.text() for cell in row.cells])
+                del node.rows[:finished]
+                if not node.done:
+                    break
+            elif not node.done:
+                break
+            else:
+                yield ('header', node.text())
+            self.pending[self._head] = None
+            self._head += 1
+        if self._head > 1024:
+            del self.pending[:self._head]
+            self._head = 0
+
+
+def stream_row_events(chunks: Iterable[str]) -> Iterator[ArchiveEvent]:
+    """Incrementally parse HTML chunks (e.g. `response.iter_content(decode_unicode=True)`)."""
+    parser = RowEventParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.drain()
+    parser.close()
+    yield from parser.drain()
+
+
+def _stdlib_archive_events(html: str) -> Iterator[ArchiveEvent]:
+    parser = TableEventParser()
+    parser.feed(html)
+    parser.close()
+    yield from parser.drain()
+
+
+def _stdlib_row_events(html: str) -> Iterator[ArchiveEvent]:
+    chunks = (html[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(html), STREAM_CHUNK_SIZE))
+    yield from stream_row_events(chunks)
+
+# ============================================================================
+# LXML BACKEND (optional)
+# ============================================================================
+
+def _lxml_archive_events(html: str) -> Iterator[ArchiveEvent]:
+    import lxml.etree
+    import lxml.html
+
+    def text(el) -> str:
+        return ''.join(s.strip() for s in el.itertext() if s.strip())
+
+    if not html.strip():
+        return
+    root = lxml.html.document_fromstring(html)
+    # itertext() would include script/style bodies and comments; the other backends skip them
+    lxml.etree.strip_elements(root, lxml.etree.Comment, lxml.etree.ProcessingInstruction,
+                              *SKIP_TEXT_TAGS, with_tail=False)
+    for el in root.iter(*ARCHIVE_TAGS):
+        if el.tag == 'table':
+            rows = [[text(cell) for cell in row.iter(*CELL_TAGS)] for row in el.iter('tr')]
+            yield ('table', rows)
+        else:
+            yield ('header', text(el))
+
+class _LxmlRowNode:
+    """A table or header awaiting release from the lxml row stream."""
+    __slots__ = ('tag', 'rows', 'text', 'done')
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.rows: List[List] = []   # [cells or None while the row is open] per row, tables only
+        self.text = ''
+        self.done = False
+
+
+def _lxml_row_events(html: str) -> Iterator[ArchiveEvent]:
+    """
+    Streaming lxml row events: HTMLPullParser fed in chunks, with the same
+    release order as RowEventParser (a table's rows as they close, headers
+    and nested tables once everything before them is out).
+
+    Finished top-level tables, headers and rows are cleared from the tree as
+    soon as no open row or header still needs their text, so memory stays
+    bounded by the largest open row rather than the page.
+    """
+    import lxml.etree
+
+    if not html.strip():
+        return
+    parser = lxml.etree.HTMLPullParser(events=('start', 'end'), remove_comments=True, remove_pis=True)
+    pending: List[_LxmlRowNode] = []
+    open_tables: List[_LxmlRowNode] = []
+    open_rows: List[List[List]] = []    # Per open <tr>: the row slots it fills in every enclosing table
+    open_headers: List[_LxmlRowNode] = []
+    head = 0
+
+    def text(el) -> str:
+        return ''.join(s.strip() for s in el.itertext() if s.strip())
+
+    def release(el):
+        # Nothing still open reads this element's text: drop it and what came before it
+        if open_rows or open_headers:
+            return
+        el.clear(keep_tail=True)
+        parent = el.getparent()
+        while parent is not None and el.getprevious() is not None:
+            del parent[0]
+
+    def handle(event: str, el) -> None:
+        tag = el.tag
+        if not isinstance(tag, str):
+            return
+        if event == 'start':
+            if tag == 'table' or tag in HEADER_TAGS:
+                node = _LxmlRowNode(tag)
+                pending.append(node)
+                (open_tables if tag == 'table' else open_headers).append(node)
+            elif tag == 'tr':
+                slots = []
+                for table in open_tables:
+                    slot = [None]
+                    table.rows.append(slot)
+                    slots.append(slot)
+                open_rows.append(slots)
+            return
+        if tag in SKIP_TEXT_TAGS:
+            el.clear(keep_tail=True)  # Script/style bodies never count as text
+        elif tag == 'tr' and open_rows:
+            cells = [text(cell) for cell in el.iter(*CELL_TAGS)]
+            for slot in open_rows.pop():
+                slot[0] = cells
+            release(el)
+        elif tag == 'table' and open_tables:
+            open_tables.pop().done = True
+            release(el)
+        elif tag in HEADER_TAGS and open_headers:
+            node = open_headers.pop()
+            node.text, node.done = text(el), True
+            release(el)
+
+    def drain() -> Iterator[ArchiveEvent]:
+        nonlocal head
+        while head < len(pending):
+            node = pending[head]
+            if node.tag == 'table':
+                finished = 0
+                for slot in node.rows:
+                    if slot[0] is None:
+                        break
+                    finished += 1
+                for slot in node.rows[:finished]:
+                    yield ('row', slot[0])
+                del node.rows[:finished]
+                if not node.done:
+                    break
+            elif not node.done:
+                break
+            else:
+                yield ('header', node.text)
+            pending[head] = None
+            head += 1
+        if head > 1024:
+            del pending[:head]
+            head = 0
+
+    for i in range(0, len(html), STREAM_CHUNK_SIZE):
+        parser.feed(html[i:i + STREAM_CHUNK_SIZE])
+        for event, el in parser.read_events():
+            handle(event, el)
+        yield from drain()
+    parser.close()
+    for event, el in parser.read_events():
+        handle(event, el)
+    for node in open_tables + open_headers:
+        node.done = True
+    yield from drain()
+
+# ============================================================================
+# BEAUTIFULSOUP BACKEND (reference / fallback)
+# ============================================================================
+
+def _bs4_archive_events(html: str) -> Iterator[ArchiveEvent]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup.find_all(list(ARCHIVE_TAGS)):
+        if element.name == 'table':
+            rows = [[cell.get_text(strip=True) for cell in row.find_all(list(CELL_TAGS))]
+                    for row in element.find_all('tr')]
+            yield ('table', rows)
+        else:
+            yield ('header', element.get_text(strip=True))
+
+# ============================================================================
+# BACKEND REGISTRY
+# ============================================================================
+
+EventFn = Callable[[str], Iterator[ArchiveEvent]]
+
+
+class ParserBackend:
+    """Named backend; row events fall back to flattening whole-table events."""
+
+    def __init__(self, name: str, archive_events: EventFn, row_events: Optional[EventFn] = None):
+        self.name = name
+        self.archive_events = archive_events
+        self._row_events = row_events
+
+    def tables(self, html: str) -> Iterator[Rows]:
+        for kind, payload in self.archive_events(html):
+            if kind == 'table':
+                yield payload
+
+    def row_events(self, html: str) -> Iterator[ArchiveEvent]:
+        if self._row_events is not None:
+            yield from self._row_events(html)
+            return
+        for kind, payload in self.archive_events(html):
+            if kind == 'table':
+                for cells in payload:
+                    yield ('row', cells)
+            else:
+                yield (kind, payload)
+
+
+def _lxml_available() -> bool:
+    try:
+        import lxml.html  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+BACKENDS: Dict[str, Tuple[EventFn, Optional[EventFn]]] = {
+    'stdlib': (_stdlib_archive_events, _stdlib_row_events),
+    'lxml': (_lxml_archive_events, _lxml_row_events),
+    'bs4': (_bs4_archive_events, None),
+}
+BACKEND_CHOICES = ['auto'] + list(BACKENDS)
+
+
+def get_backend(name: str = 'auto') -> ParserBackend:
+    """Resolve a backend name; raises ValueError for unknown or unavailable ones."""
+    if name == 'auto':
+        name = 'lxml' if _lxml_available() else 'stdlib'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}' (choose from {', '.join(BACKEND_CHOICES)})")
+    if name == 'lxml' and not _lxml_available():
+        raise ValueError("Parser backend 'lxml' requires: pip install lxml")
+    return ParserBackend(name, *BACKENDS[name])
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Heartland Fetch/Parse Pipeline
+==============================
+Staged pipeline that keeps network I/O and CPU-bound parsing apart:
+
+    fetch threads --(bounded raw-HTML queue)--> parse processes --> aggregator
+
+  1. Fetch stage: FetchEngine worker threads download pages and put raw HTML
+     on a bounded queue. Jobs are handed to them only while they are at most
+     `queue_size + parse_workers * PARSE_INFLIGHT_FACTOR` ahead of the next
+     job to emit (backpressure), so one slow page cannot make the stages
+     behind it buffer the rest of the run.
+  2. Parse stage: a ProcessPoolExecutor turns each page into a compact batch
+     (list of plain tuples - cheap to pickle back). At most
+     `parse_workers * PARSE_INFLIGHT_FACTOR` pages are in flight.
+  3. Aggregator: the calling thread receives batches and hands them to a
+     callback strictly in job order, so output is identical to a serial run.
+
+With `parse_workers=0` pages are parsed in the calling thread instead (useful
+on single-core hosts). If the fetcher also has a single worker, the whole run
+is serial in the calling thread - fetch, parse, emit - which is what
+profiling needs.
+
+A page whose parse raises is a failed job in every mode (pool, inline or
+serial): it is logged, reported to `on_failed` and emitted with a None batch,
+like a failed fetch. If the run itself breaks (a broken parse pool, a failing
+callback), it stops fetching, cancels queued parses and re-raises, so close()
+still returns.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from heartland_fetch import FetchEngine
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_QUEUE_SIZE = 32       # Raw pages buffered between fetch and parse stages
+PARSE_INFLIGHT_FACTOR = 2     # Pages queued per parse process
+
+
+def default_parse_workers() -> int:
+    """Every core on multi-core hosts; inline parsing on a single core."""
+    cpus = os.cpu_count() or 1
+    return cpus if cpus > 1 else 0
+
+
+def _timed_parse(parse: Callable, job: Any, html: str) -> Tuple[List, float]:
+    """Run `parse` and return (batch, seconds) - timed inside the worker process."""
+    start = time.perf_counter()
+    batch = parse(job, html)
+    return batch, time.perf_counter() - start
+
+
+def _parse_failed(job: Any, error: Exception, on_failed: Optional[Callable]) -> None:
+    """Log and report a parse that raised; returns the None batch of a failed job."""
+    logger.warning(f"Parse failed for {job}: {type(error).__name__}: {error}")
+    if on_failed is not None:
+        on_failed(job, error)
+    return None
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+class FetchParsePipeline:
+    """
+    Run (fetch, parse) over a job list with bounded buffering between stages.
+
+    `fetch(job) -> Optional[str]` runs on fetch threads.
+    `parse(job, html) -> batch` must be a picklable top-level function when
+    parse_workers > 0; it runs in a worker process.
+    `on_batch(job, batch)` runs on the calling thread, in job order; `batch`
+    is None when `fetch` or `parse` raised (the job did not complete and may
+    be retried).
+    `on_parsed(job, seconds)`, if given, reports each page's parse time
+    as it completes (calling thread, completion order).
+    `on_failed(job, error)`, if given, reports each page whose parse raised
+    (calling thread, completion order).
+    """
+
+    def __init__(self, fetcher: FetchEngine, parse_workers: Optional[int] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.fetcher = fetcher
+        self.parse_workers = default_parse_workers() if parse_workers is None else max(0, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self._pool
+
+    def run(self, jobs: Sequence, fetch: Callable[[Any], Optional[str]],
+            parse: Callable[[Any, str], List], on_batch: Callable[[Any, List], None],
+            on_parsed: Callable[[Any, float], None] = None,
+            on_failed: Callable[[Any, Exception], None] = None):
+        jobs = list(jobs)
+        if not jobs:
+            return
+        if self.parse_workers == 0 and self.fetcher.max_workers == 1:
+            self._run_serial(jobs, fetch, parse, on_batch, on_parsed, on_failed)
+            return
+        max_inflight = max(1, self.parse_workers * PARSE_INFLIGHT_FACTOR)
+        # Fetching runs at most `lookahead` jobs past the next one to emit, which bounds
+        # the raw queue, the parses in flight and the reorder buffer together. The queue
+        # holds a full window, so fetch threads never block on it.
+        lookahead = self.queue_size + max_inflight
+        raw: "queue.Queue" = queue.Queue(maxsize=lookahead)
+        stopped = threading.Event()
+
+        def fetch_one(index: int):
+            if stopped.is_set():
+                return
+            html, failed = None, True
+            try:
+                html = fetch(jobs[index])
+                failed = False
+            except Exception as e:
+                logger.warning(f"Fetch failed for {jobs[index]}: {e}")
+            finally:
+                if not stopped.is_set():
+                    raw.put((index, html, failed))
+
+        fetching: List[Future] = []
+        ready: Dict[int, Optional[List]] = {}
+        inflight: Dict[Future, int] = {}
+        next_index = 0
+        submitted = 0
+        received = 0
+
+        def collect(done_futures):
+            for future in done_futures:
+                index = inflight.pop(future)
+                try:
+                    ready[index], seconds = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    ready[index] = _parse_failed(jobs[index], e, on_failed)
+                    continue
+                if on_parsed is not None:
+                    on_parsed(jobs[index], seconds)
+
+        try:
+            while next_index < len(jobs):
+                # Emit everything that is complete, in job order
+                while next_index in ready:
+                    on_batch(jobs[next_index], ready.pop(next_index))
+                    next_index += 1
+                if next_index >= len(jobs):
+                    break
+
+                while submitted < min(len(jobs), next_index + lookahead):
+                    fetching.append(self.fetcher.executor.submit(fetch_one, submitted))
+                    submitted += 1
+                fetching = [f for f in fetching if not f.done()]
+
+                if received < submitted and len(inflight) < max_inflight:
+                    index, html, failed = raw.get()
+                    received += 1
+                    if failed:
+                        ready[index] = None
+                    elif not html:
+                        ready[index] = []
+                    elif self.parse_workers == 0:
+                        try:
+                            ready[index], seconds = _timed_parse(parse, jobs[index], html)
+                        except Exception as e:
+                            ready[index] = _parse_failed(jobs[index], e, on_failed)
+                        else:
+                            if on_parsed is not None:
+                                on_parsed(jobs[index], seconds)
+                    else:
+                        inflight[self.pool.submit(_timed_parse, parse, jobs[index], html)] = index
+                    # Pick up any parses that already finished without blocking
+                    collect([f for f in list(inflight) if f.done()])
+                else:
+                    done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+                    collect(done)
+        finally:
+            # On an error (a broken parse pool, a failing callback) stop fetching,
+            # drop what was fetched and cancel queued parses, so close() cannot hang
+            stopped.set()
+            for future in fetching + list(inflight):
+                future.cancel()
+            while True:
+                try:
+                    raw.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _run_serial(self, jobs: List, fetch: Callable, parse: Callable,
+                    on_batch: Callable, on_parsed: Optional[Callable], on_failed: Optional[Callable]):
+        for job in jobs:
+            try:
+                html = fetch(job)
+            except Exception as e:
+                logger.warning(f"Fetch failed for {job}: {e}")
+                on_batch(job, None)
+                continue
+            batch = []
+            if html:
+                try:
+                    batch, seconds = _timed_parse(parse, job, html)
+                except Exception as e:
+                    batch = _parse_failed(job, e, on_failed)
+                else:
+                    if on_parsed is not None:
+                        on_parsed(job, seconds)
+            on_batch(job, batch)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
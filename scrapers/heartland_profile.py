@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Heartland Stage Profiler
+========================
+cProfile + tracemalloc per pipeline stage, for `heartland_scraper_v4.py --profile`.
+
+Stages are the steps every page goes through - fetch (rate-limiter waits and
+network), parse, collect (table + journal) and export. Each stage has its own
+cProfile.Profile that is switched on only while that stage runs, so the
+pstats files attribute time to the right step even though pages interleave.
+Profiling runs the scrape serially in the main thread (one fetch worker,
+inline parsing) so every stage is visible to the profiler.
+
+Written to the profile directory:
+
+    <stage>.pstats          load with `python -m pstats fetch.pstats`
+    <stage>.txt             top functions by cumulative time
+    alloc_<phase>.txt       top allocation sites (tracemalloc) for scrape / export
+    samples.folded          stack samples, flamegraph.pl / speedscope format (--profile-sample)
+    summary.json            wall time, calls and peak memory per stage
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds
+
+# ============================================================================
+# SAMPLING PROFILER
+# ============================================================================
+
+class SamplingProfiler:
+    """Samples one thread's stack every `interval` seconds into folded-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='heartland-sampler')
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+# ============================================================================
+# STAGE PROFILER
+# ============================================================================
+
+class StageProfiler:
+    def __init__(self, out_dir: Path, sample_interval: Optional[float] = None):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.sampler = SamplingProfiler(threading.get_ident(), sample_interval) if sample_interval else None
+        self._active: Optional[str] = None
+        self._snapshot = None
+
+    def start(self):
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._snapshot = tracemalloc.take_snapshot()
+        if self.sampler is not None:
+            self.sampler.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profile the block as `name`. Nested stages count toward the outer one."""
+        if self._active is not None:
+            yield
+            return
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = cProfile.Profile()
+            self.stats[name] = {'calls': 0, 'seconds': 0.0, 'peak_kb': 0.0}
+        self._active = name
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stats = self.stats[name]
+            stats['calls'] += 1
+            stats['seconds'] += time.perf_counter() - start
+            stats['peak_kb'] = max(stats['peak_kb'], tracemalloc.get_traced_memory()[1] / 1024)
+            self._active = None
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        @wraps(fn)
+        def profiled(*args, **kwargs):
+            with self.stage(name):
+                return fn(*args, **kwargs)
+        return profiled
+
+    def phase(self, name: str):
+        """Write the top allocation sites since the previous phase boundary to alloc_<name>.txt."""
+        snapshot = tracemalloc.take_snapshot()
+        top = snapshot.compare_to(self._snapshot, 'traceback')[:TOP_ALLOCATIONS]
+        with open(self.out_dir / f"alloc_{name}.txt", 'w', encoding='utf-8') as f:
+            for stat in top:
+                f.write(f"{stat.size_diff / 1024:+.1f} KB in {stat.count_diff:+d} blocks\n")
+                for line in stat.traceback.format(most_recent_first=True)[:6]:
+                    f.write(f"    {line}\n")
+        self._snapshot = snapshot
+
+    def finish(self) -> Path:
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler.write(self.out_dir / "samples.folded")
+        tracemalloc.stop()
+
+        for name, profile in self.profiles.items():
+            profile.dump_stats(str(self.out_dir / f"{name}.pstats"))
+            text = io.StringIO()
+            pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+            (self.out_dir / f"{name}.txt").write_text(text.getvalue(), encoding='utf-8')
+
+        summary = {name: {'calls': s['calls'], 'seconds': round(s['seconds'], 3), 'peak_kb': round(s['peak_kb'], 1)}
+                   for name, s in self.stats.items()}
+        if self.sampler is not None:
+            summary['samples'] = self.sampler.samples
+        with open(self.out_dir / "summary.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        for name, s in summary.items():
+            if isinstance(s, dict):
+                logger.info(f"Profile {name}: {s['seconds']:.2f}s over {s['calls']} calls, peak {s['peak_kb']:,.0f} KB")
+        logger.info(f"Profiles written to {self.out_dir}")
+        return self.out_dir
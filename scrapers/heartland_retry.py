@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Heartland Retry Layer
+=====================
+Retries, circuit breaking and a persisted ledger of what still failed.
+
+  1. RetryPolicy: jittered exponential backoff ("full jitter") for transient
+     failures - connection errors, timeouts, 429 and 5xx. Retry-After is
+     honoured as a lower bound on the delay.
+  2. CircuitBreaker: per endpoint (host + CGI script or archive directory).
+     After `threshold` consecutive failures the endpoint is open and requests
+     fail fast with CircuitOpenError; after `cooldown` seconds one trial
+     request is let through (half-open) and its outcome closes or re-opens it.
+  3. FailureLedger: work units that failed after all retries, saved as JSON so
+     `--retry-failed` can re-run just those units.
+
+Usage:
+    policy, breaker = RetryPolicy(), CircuitBreaker()
+    response = call_with_retry(lambda: engine.get(url), url, policy, breaker)
+
+    ledger = FailureLedger(output_dir / FAILED_REQUESTS_FILE)
+    ledger.add(job, error); ledger.resolve(job); ledger.save()
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_ATTEMPTS = 4            # Total tries per request (1 + 3 retries)
+BACKOFF_BASE = 0.5              # Seconds before the first retry (upper bound, jittered)
+BACKOFF_CAP = 30.0              # Longest single backoff
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+BREAKER_THRESHOLD = 5           # Consecutive failures that open an endpoint
+BREAKER_COOLDOWN = 60.0         # Seconds an open endpoint fails fast
+
+FAILED_REQUESTS_FILE = "failed_requests.json"
+
+# ============================================================================
+# ERRORS
+# ============================================================================
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to an endpoint that is failing."""
+
+
+def status_of(error: Exception) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def is_transient(error: Exception) -> bool:
+    """Worth retrying, and counts against the endpoint's circuit breaker."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return status_of(error) in RETRYABLE_STATUSES
+
+
+def endpoint_key(url: str) -> str:
+    """Host + script path for CGI; host + directory for static pages (one archive season)."""
+    parts = urlparse(url)
+    path = parts.path
+    if path.endswith(('.html', '.htm')):
+        path = path.rsplit('/', 1)[0]
+    return f"{parts.netloc}{path}"
+
+# ============================================================================
+# RETRY POLICY
+# ============================================================================
+
+class RetryPolicy:
+    """Full-jitter exponential backoff: delay = uniform(0, min(cap, base * 2**(n-1)))."""
+
+    def __init__(self, attempts: int = DEFAULT_ATTEMPTS, base: float = BACKOFF_BASE,
+                 cap: float = BACKOFF_CAP, seed: Optional[int] = None):
+        self.attempts = max(1, attempts)
+        self.base = base
+        self.cap = cap
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        with self._lock:
+            delay = self._random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(self.cap, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open after `cooldown`."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self.trips = 0
+
+    def check(self, endpoint: str):
+        """Raise CircuitOpenError if `endpoint` is open (one trial passes once the cooldown ends)."""
+        with self._lock:
+            opened = self._opened_at.get(endpoint)
+            if opened is None:
+                return
+            if time.monotonic() - opened >= self.cooldown and not self._trial.get(endpoint):
+                self._trial[endpoint] = True  # Half-open: let exactly one request probe
+                return
+        raise CircuitOpenError(f"Circuit open for {endpoint}")
+
+    def success(self, endpoint: str):
+        with self._lock:
+            self._failures.pop(endpoint, None)
+            if self._opened_at.pop(endpoint, None) is not None:
+                logger.info(f"Circuit closed for {endpoint}")
+            self._trial.pop(endpoint, None)
+
+    def failure(self, endpoint: str):
+        with self._lock:
+            count = self._failures[endpoint] = self._failures.get(endpoint, 0) + 1
+            if self._trial.pop(endpoint, None) or (count >= self.threshold and endpoint not in self._opened_at):
+                if endpoint not in self._opened_at:
+                    self.trips += 1
+                    logger.warning(f"Circuit open for {endpoint} after {count} consecutive failures")
+                self._opened_at[endpoint] = time.monotonic()
+
+
+def call_with_retry(send: Callable[[], requests.Response], url: str, policy: RetryPolicy,
+                    breaker: Optional[CircuitBreaker] = None) -> requests.Response:
+    """
+    Run `send()` (which raises on HTTP errors) until it succeeds or retries run out.
+
+    Non-transient errors (404, other 4xx) are raised at once without touching
+    the breaker; an open circuit raises CircuitOpenError without sending.
+    """
+    endpoint = endpoint_key(url)
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.check(endpoint)
+        attempt += 1
+        try:
+            response = send()
+        except requests.RequestException as e:
+            if not is_transient(e):
+                if breaker is not None:
+                    breaker.success(endpoint)  # The server answered
+                raise
+            if breaker is not None:
+                breaker.failure(endpoint)
+            if attempt >= policy.attempts:
+                raise
+            delay = policy.delay(attempt, e)
+            logger.debug(f"Retry {attempt}/{policy.attempts - 1} for {url} in {delay:.2f}s: {e}")
+            time.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.success(endpoint)
+        return response
+
+# ============================================================================
+# FAILURE LEDGER
+# ============================================================================
+
+class FailureLedger:
+    """Failed work units (tuples), persisted as JSON between runs."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.failures: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for entry in json.load(f).get('failures', []):
+                        self.failures[tuple(entry['job'])] = entry
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable failure ledger {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.failures)
+
+    def jobs(self) -> List[Tuple]:
+        return list(self.failures)
+
+    def add(self, job: Tuple, error: Exception):
+        with self._lock:
+            previous = self.failures.get(tuple(job), {})
+            self.failures[tuple(job)] = {
+                'job': list(job),
+                'error': f"{type(error).__name__}: {error}",
+                'status': status_of(error),
+                'failed_at': datetime.now().isoformat(timespec='seconds'),
+                'runs': previous.get('runs', 0) + 1,
+            }
+
+    def resolve(self, job: Tuple):
+        with self._lock:
+            self.failures.pop(tuple(job), None)
+
+    def save(self):
+        with self._lock:
+            entries = list(self.failures.values())
+        if not entries:
+            self.path.unlink(missing_ok=True)
+            return
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'failures': entries}, f, indent=2)
+        os.replace(tmp, self.path)
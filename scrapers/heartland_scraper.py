@@ -15,14 +15,16 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import json
-import time
 import argparse
+import atexit
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Tuple
 from dataclasses import dataclass, asdict
 import logging
 
+from heartland_fetch import AdaptiveLimiter, RATE_STATE_FILE
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -95,7 +97,7 @@ def get_season_code(season: str) -> str:
         return f"{year - 1}-{str(year)[-2:]}"  # 2025_spring -> "2024-25"
 
 DIVISIONS = ["boys_prem", "girls_prem", "boys_rec", "girls_rec"]
-REQUEST_DELAY = 1.0
+REQUEST_DELAY = 1.0  # Fastest pace; the adaptive limiter backs off from here on errors and recovers
 
 # ============================================================================
 # DATA CLASSES
@@ -138,11 +140,11 @@ class HeartlandScraper:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.all_teams: List[TeamStanding] = []
         self.debug = debug
+        self.limiter = AdaptiveLimiter(self.output_dir / RATE_STATE_FILE, initial_rate=1.0 / REQUEST_DELAY)
         
     def _make_request(self, url: str) -> Optional[str]:
         try:
-            time.sleep(REQUEST_DELAY)
-            response = self.session.get(url, timeout=30)
+            response = self.limiter.send(url, lambda: self.session.get(url, timeout=30))
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
@@ -387,6 +389,7 @@ def main():
     
     args = parser.parse_args()
     scraper = HeartlandScraper(output_dir=args.output_dir, debug=args.debug)
+    atexit.register(scraper.limiter.save)
     
     if args.all:
         # Use ALL seasons
@@ -5,28 +5,69 @@ Heartland Soccer Association Data Scraper (v4 - Archive + Live CGI)
 Scrapes team standings from heartlandsoccer.net using:
   1. Static archive pages (past seasons)
   2. Live CGI endpoints (current season)
+  3. Live CGI match results, fetched next to each subdivision's standings
 
 Usage:
     python heartland_scraper_v4.py                    # 3 years of data (default)
     python heartland_scraper_v4.py --years 3         # Explicit 3 years
+    python heartland_scraper_v4.py --all-history     # Every season back to 2002 (prioritized, concurrent)
     python heartland_scraper_v4.py --live            # Current season via CGI only
     python heartland_scraper_v4.py --season 2025_fall --live  # Force CGI for specific season
     python heartland_scraper_v4.py --debug           # Save raw HTML for inspection
+    python heartland_scraper_v4.py --live --no-results           # Standings only (skip match results)
+    python heartland_scraper_v4.py --live --new-matches          # Only matches that are new or changed since last run
+    python heartland_scraper_v4.py --live --workers 8 --rate 4  # Tune concurrency / request ceiling
+    python heartland_scraper_v4.py --live --max-rate 6           # Opt in to adaptive rates above --rate (--fixed-rate disables)
+    python heartland_scraper_v4.py --live --refresh-manifest     # Re-discover live subdivisions
+    python heartland_scraper_v4.py --no-cache                    # Bypass the on-disk response cache
+    python heartland_scraper_v4.py --parser bs4                  # Choose HTML parser backend
+    python heartland_scraper_v4.py --parse-workers 4 --queue-size 32  # Parse stage processes / backpressure
+    python heartland_scraper_v4.py --formats csv ndjson --gzip   # Streamed, compressed outputs
+    python heartland_scraper_v4.py --formats changes             # Only rows changed since the last run
+    python heartland_scraper_v4.py --snapshot                    # Keep today's standings in the snapshot store
+    python heartland_scraper_v4.py --validate --snapshot         # Quality report + quarantine; snapshot only clean rows
+    python heartland_scraper_v4.py --team-ids                    # Stable cross-season team ids in Supabase outputs
+    python heartland_scraper_v4.py --resume                      # Continue an interrupted run
+    python heartland_scraper_v4.py --retry-failed                # Re-fetch only what failed last run
+    python heartland_scraper_v4.py --live --profile --profile-sample --transport replay:cassettes/live
+    python heartland_scraper_v4.py --live --transport record:cassettes/live  # Record responses for replay
+    python heartland_scraper_v4.py --all-history --shard 2/4     # This runner's slice of the work
+    python heartland_scraper_v4.py --merge-shards heartland_shard_*of4_*.ndjson  # Merge parts into the outputs
 """
 
 import requests
-from bs4 import BeautifulSoup
 import re
 import json
-import time
 import argparse
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
-from dataclasses import dataclass, asdict
+from typing import List, Optional, Set, Tuple, Dict, Iterator
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from operator import attrgetter
 from urllib.parse import urlencode
 import logging
 
+from heartland_fetch import FetchEngine, AdaptiveLimiter, DEFAULT_MAX_WORKERS, DEFAULT_PER_HOST, RATE_STATE_FILE
+from heartland_cache import ResponseCache, DEFAULT_MAX_BYTES, NEGATIVE_TTL
+from heartland_parsers import get_backend, BACKEND_CHOICES
+from heartland_pipeline import FetchParsePipeline, DEFAULT_QUEUE_SIZE
+from heartland_table import StandingsTable, TableSlice, STANDINGS_FIELDS, MATCH_FIELDS
+from heartland_export import StreamingExporter, Sink, CsvSink, JsonArraySink, FORMATS, DEFAULT_FORMATS
+from heartland_journal import ScrapeJournal, JOURNAL_FILE
+from heartland_transport import install as install_transport, install_from_env
+from heartland_metrics import MetricsRegistry
+from heartland_profile import StageProfiler, DEFAULT_SAMPLE_INTERVAL
+from heartland_retry import (RetryPolicy, CircuitBreaker, FailureLedger, call_with_retry,
+                             DEFAULT_ATTEMPTS, FAILED_REQUESTS_FILE)
+from heartland_shard import ShardSpec, write_part, read_header, merge_parts
+from heartland_dedup import MatchIndex, MATCH_INDEX_FILE
+from heartland_snapshots import SnapshotStore, RetentionPolicy, SNAPSHOT_DIR
+from heartland_identity import TeamIdentityIndex, TEAM_IDENTITY_FILE
+from heartland_validate import ValidationReport, validate_table, numpy_available
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,6 +82,7 @@ logger = logging.getLogger(__name__)
 BASE_URL = "https://www.heartlandsoccer.net"
 ARCHIVES_PATH = "/reports/seasoninfo/archives/standings"
 CGI_STANDINGS_PATH = "/reports/cgi-jrb/subdiv_standings.cgi"
+CGI_RESULTS_PATH = "/reports/cgi-jrb/subdiv_results.cgi"
 
 # Current season (January 2026 = 2025-26 academic year)
 CURRENT_SEASON = "2025_fall"
@@ -59,6 +101,17 @@ REC_AGE_GROUPS = [
 ]
 REC_SUBDIVISIONS = ["CANADA", "MEXICO", "USA", "1", "2", "3"]
 
+# Gender/level blocks fetched together by scrape_live_season
+LIVE_BLOCKS = [("Boys", "Premier"), ("Girls", "Premier"), ("Boys", "Recreational"), ("Girls", "Recreational")]
+
+# Subdivision discovery - valid combos are probed once and cached per season
+MANIFEST_TTL_HOURS = 72
+DISCOVERY_MISS_LIMIT = 2  # Premier subdivisions are numbered 1..N; stop after N consecutive misses
+
+# Response cache - closed-season archives never expire, live pages are revalidated
+LIVE_CACHE_TTL = 30 * 60  # seconds
+CACHE_DIR_NAME = ".http_cache"
+
 ALL_SEASONS = [
     "2025_fall", "2024_fall", "2023_fall", "2022_fall", "2021_fall", "2020_fall",
     "2019_fall", "2018_fall", "2017_fall", "2016_fall", "2015_fall",
@@ -74,6 +127,7 @@ ALL_SEASONS = [
 
 DIVISIONS = ["boys_prem", "girls_prem", "boys_rec", "girls_rec"]
 REQUEST_DELAY = 0.5  # Slightly faster for CGI (many requests needed)
+MAX_REQUESTS_PER_SECOND = 1.0 / REQUEST_DELAY  # Global ceiling shared by all fetch workers
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -81,15 +135,10 @@ REQUEST_DELAY = 0.5  # Slightly faster for CGI (many requests needed)
 
 def get_seasons_for_years(years: int) -> List[str]:
     """Get seasons for the last N years (fall + spring per year)."""
-    season_map = {
-        1: ["2025_fall", "2026_spring"],
-        2: ["2024_fall", "2025_spring"],
-        3: ["2023_fall", "2024_spring"],
-        4: ["2022_fall", "2023_spring"],
-    }
+    current_fall = int(CURRENT_SEASON.split('_')[0])
     seasons = []
-    for y in range(1, min(years + 1, 5)):
-        seasons.extend(season_map.get(y, []))
+    for y in range(years):
+        seasons.extend([f"{current_fall - y}_fall", f"{current_fall - y + 1}_spring"])
     return [s for s in seasons if s in ALL_SEASONS]
 
 def get_season_code(season: str) -> str:
@@ -108,6 +157,75 @@ def is_current_season(season: str) -> bool:
     """Check if this is the current (not yet archived) season."""
     return season in ["2025_fall", "2026_spring"]
 
+def scrapes_results(season: str) -> bool:
+    """
+    Whether a live pass over `season` fetches match results.
+    
+    subdiv_results.cgi takes no season parameter and serves CURRENT_SEASON's
+    games, so only that season gets results jobs; another live label would
+    fetch the same games again under the wrong season.
+    """
+    return season == CURRENT_SEASON
+
+def season_priority(season: str) -> Tuple[int, float]:
+    """Sort key for scheduling: current seasons first, then newest archives first."""
+    year, _, term = season.partition('_')
+    started = int(year) + (0.6 if term == 'fall' else 0.2)  # Fall 2025 starts before spring 2026
+    return (0 if is_current_season(season) else 1, -started)
+
+AGE_PATTERN = re.compile(r'U-?(\d+)', re.IGNORECASE)
+TEAM_NUMBER_PATTERN = re.compile(r'^([0-9A-Za-z]{4})\s+(.+)$')
+NON_NUMERIC_PATTERN = re.compile(r'[^\d-]')
+MATCH_DATE_PATTERN = re.compile(r'([A-Za-z]{3})[a-z]*\.?\s+(\d{1,2})')
+FALL_FIRST_MONTH = 7  # Fall seasons run Jul-Jun, spring seasons Jan-Jun
+MONTHS = {name: i for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+
+def endpoint_label(url: str) -> str:
+    """Metrics label: 'cgi' for the live CGI scripts, 'archive' for static pages."""
+    return 'cgi' if '.cgi' in url else 'archive'
+
+def match_date(text: str, season: str) -> Optional[str]:
+    """
+    ISO date for a results-page date cell like 'Aug 16 (Sat)'.
+    
+    The page has no year: fall seasons run into the next calendar year
+    (Jan-Jun belong to year + 1), spring seasons are within their year and
+    end by June. A date outside the season's window belongs to another
+    season and gives None, so it is never exported under this one.
+    """
+    match = MATCH_DATE_PATTERN.search(text)
+    if not match:
+        return None
+    month = MONTHS.get(match.group(1).lower())
+    if month is None:
+        return None
+    year, _, term = season.partition('_')
+    if term == 'spring' and month >= FALL_FIRST_MONTH:
+        return None
+    year = int(year) + (1 if term == 'fall' and month < FALL_FIRST_MONTH else 0)
+    try:
+        return datetime(year, month, int(match.group(2))).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+def parse_score(text: str) -> Optional[int]:
+    """Goals, or None for a game that has not been played."""
+    text = text.strip()
+    return int(text) if text.isdigit() else None
+
+def parse_int(val, dash: Optional[int] = None) -> int:
+    """
+    Standings cell -> int; blank cells are 0.
+    
+    A bare '-' raises ValueError (the archive row is skipped) unless `dash`
+    gives its value; CGI pages use '-' for zero.
+    """
+    val = NON_NUMERIC_PATTERN.sub('', str(val))
+    if val == '-' and dash is not None:
+        return dash
+    return int(val) if val else 0
+
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
@@ -133,38 +251,70 @@ class TeamStanding:
     def matches_played(self) -> int:
         return self.wins + self.losses + self.ties
 
+# Compact tuple form used between pipeline stages and by StandingsTable
+team_row = attrgetter(*STANDINGS_FIELDS)
+
+
+class SeasonManifest:
+    """
+    Valid live CGI combos for one season, persisted as manifest_{season}.json.
+    
+    Each gender/level block stores its discovered (age, subdivision) pairs and
+    a discovery timestamp; blocks older than the TTL are re-discovered.
+    """
+    
+    def __init__(self, path: Path, season: str, ttl_hours: float = MANIFEST_TTL_HOURS):
+        self.path = path
+        self.season = season
+        self.ttl = timedelta(hours=ttl_hours)
+        self.blocks: Dict[str, Dict] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('season') == season:
+                    self.blocks = data.get('blocks', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+    
+    @staticmethod
+    def _key(gender: str, level: str) -> str:
+        return f"{gender}/{level}"
+    
+    def combos(self, gender: str, level: str) -> Optional[List[Tuple[str, str]]]:
+        """Fresh (age, subdivision) pairs for a block, or None if missing/expired."""
+        block = self.blocks.get(self._key(gender, level))
+        if not block:
+            return None
+        discovered_at = datetime.fromisoformat(block['discovered_at'])
+        if datetime.now() - discovered_at > self.ttl:
+            return None
+        return [tuple(combo) for combo in block['combos']]
+    
+    def update(self, gender: str, level: str, combos: List[Tuple[str, str]]):
+        self.blocks[self._key(gender, level)] = {
+            'discovered_at': datetime.now().isoformat(timespec='seconds'),
+            'combos': [list(combo) for combo in combos],
+        }
+    
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'season': self.season, 'blocks': self.blocks}, f, indent=2)
+
 # ============================================================================
-# SCRAPER CLASS
+# PARSING
 # ============================================================================
 
-class HeartlandScraper:
-    def __init__(self, output_dir: str = "./heartland_data", debug: bool = False):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Referer': 'https://www.heartlandsoccer.net/league/score-standings/',
-        })
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.all_teams: List[TeamStanding] = []
-        self.debug = debug
-        self.failed_requests: List[str] = []
-        
-    def _make_request(self, url: str, params: Dict = None) -> Optional[str]:
-        """Make a rate-limited HTTP request."""
-        try:
-            time.sleep(REQUEST_DELAY)
-            if params:
-                response = self.session.get(url, params=params, timeout=30)
-            else:
-                response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            logger.debug(f"Request failed for {url}: {e}")
-            return None
+class StandingsParser:
+    """
+    Page -> TeamStanding parsing, independent of any network state.
+    
+    HeartlandScraper inherits these methods; pipeline worker processes build a
+    bare StandingsParser so they never open sessions or caches.
+    """
+    
+    def __init__(self, parser: str = 'auto'):
+        self.parser = get_backend(parser)
     
     def _parse_gender(self, division: str) -> str:
         if division.startswith("boys") or "Boys" in division:
@@ -190,154 +340,105 @@ class HeartlandScraper:
     
     def _parse_archive_html(self, html: str, season: str, division: str) -> List[TeamStanding]:
         """Parse static archive HTML pages."""
-        teams = []
+        return list(self.iter_archive_standings(html, season, division))
+    
+    def iter_archive_standings(self, html: str, season: str, division: str) -> Iterator[TeamStanding]:
+        """
+        Single pass over an archive page, yielding rows as the parser releases them.
+        
+        Header and row events arrive in document order; the current age group and
+        subdivision are carried as state, so no table is ever materialized.
+        """
         gender = self._parse_gender(division)
-        soup = BeautifulSoup(html, 'html.parser')
         
         current_age_group = "Unknown"
         current_subdivision = "Unknown"
         
-        for element in soup.find_all(['h2', 'h3', 'h4', 'table', 'p', 'b', 'strong']):
-            tag_name = element.name
-            text = element.get_text(strip=True)
+        for kind, payload in self.parser.row_events(html):
+            if kind == 'row':
+                team = self._parse_standings_row(
+                    payload, season, division, gender,
+                    current_age_group, current_subdivision
+                )
+                if team is not None:
+                    yield team
+                continue
             
-            # Check for subdivision header
-            if tag_name in ['h2', 'h3', 'h4', 'p', 'b', 'strong']:
-                age_match = re.search(r'U-?(\d+)', text, re.IGNORECASE)
-                if age_match and ('Subdivision' in text or 'Division' in text or 'Premier' in text or 'Recreational' in text):
+            # Check for subdivision header (cheap keyword test before the regex)
+            text = payload
+            if 'Subdivision' in text or 'Division' in text or 'Premier' in text or 'Recreational' in text:
+                age_match = AGE_PATTERN.search(text)
+                if age_match:
                     current_age_group = f"U{age_match.group(1)}"
                     current_subdivision = text
-                    continue
-            
-            # Parse table
-            if tag_name == 'table':
-                teams.extend(self._parse_standings_table(
-                    element, season, division, gender, 
-                    current_age_group, current_subdivision
-                ))
-        
-        return teams
     
-    def _parse_standings_table(self, table_elem, season: str, division: str, 
-                                gender: str, age_group: str, subdivision: str) -> List[TeamStanding]:
-        """Parse a standings table element."""
-        teams = []
-        rows = table_elem.find_all('tr')
+    def _parse_standings_row(self, cell_texts: List[str], season: str, division: str,
+                             gender: str, age_group: str, subdivision: str) -> Optional[TeamStanding]:
+        """Parse one archive standings row; None for headers and malformed rows."""
+        if len(cell_texts) < 8:
+            return None
         
-        for row in rows:
-            cells = row.find_all(['td', 'th'])
-            if len(cells) < 8:
-                continue
-            
-            cell_texts = [cell.get_text(strip=True) for cell in cells]
-            first_cell = cell_texts[0].lower()
+        first_cell = cell_texts[0].lower()
+        
+        # Skip headers
+        if first_cell in ['#', 'team', 'number', ''] or 'subdivision' in first_cell:
+            return None
+        if 'win' in first_cell or 'lose' in first_cell:
+            return None
+        
+        try:
+            team_info = cell_texts[0]
+            team_num_match = TEAM_NUMBER_PATTERN.match(team_info)
+            if team_num_match:
+                team_number = team_num_match.group(1)
+                team_name = self._normalize_team_name(team_num_match.group(2))
+            else:
+                team_number = ""
+                team_name = self._normalize_team_name(team_info)
             
-            # Skip headers
-            if first_cell in ['#', 'team', 'number', ''] or 'subdivision' in first_cell:
-                continue
-            if 'win' in first_cell or 'lose' in first_cell:
-                continue
+            if not team_name or team_name == '-':
+                return None
             
-            try:
-                team_info = cell_texts[0]
-                team_num_match = re.match(r'^([0-9A-Za-z]{4})\s+(.+)$', team_info)
-                if team_num_match:
-                    team_number = team_num_match.group(1)
-                    team_name = self._normalize_team_name(team_num_match.group(2))
-                else:
-                    team_number = ""
-                    team_name = self._normalize_team_name(team_info)
-                
-                if not team_name or team_name == '-':
-                    continue
-                
-                def parse_int(val):
-                    val = re.sub(r'[^\d-]', '', str(val))
-                    return int(val) if val else 0
-                
-                teams.append(TeamStanding(
-                    team_number=team_number,
-                    team_name=team_name,
-                    wins=parse_int(cell_texts[1]),
-                    losses=parse_int(cell_texts[2]),
-                    ties=parse_int(cell_texts[3]),
-                    goals_for=parse_int(cell_texts[4]),
-                    goals_against=parse_int(cell_texts[5]),
-                    red_cards=parse_int(cell_texts[6]) if len(cell_texts) > 6 else 0,
-                    points=parse_int(cell_texts[7]) if len(cell_texts) > 7 else 0,
-                    season=season,
-                    division=division,
-                    age_group=age_group,
-                    subdivision=subdivision,
-                    gender=gender
-                ))
-            except (ValueError, IndexError):
-                continue
-        
-        return teams
+            return TeamStanding(
+                team_number=team_number,
+                team_name=team_name,
+                wins=parse_int(cell_texts[1]),
+                losses=parse_int(cell_texts[2]),
+                ties=parse_int(cell_texts[3]),
+                goals_for=parse_int(cell_texts[4]),
+                goals_against=parse_int(cell_texts[5]),
+                red_cards=parse_int(cell_texts[6]),
+                points=parse_int(cell_texts[7]),
+                season=season,
+                division=division,
+                age_group=age_group,
+                subdivision=subdivision,
+                gender=gender
+            )
+        except (ValueError, IndexError):
+            return None
 
-    # =========================================================================
-    # CGI PARSER (Live data for current season)
-    # =========================================================================
-    
-    def _scrape_cgi_standings(self, gender: str, level: str, age: str, 
-                              subdivision: str, season: str) -> List[TeamStanding]:
-        """Scrape standings from CGI endpoint for a specific subdivision."""
-        
-        # Correct CGI parameters (discovered via testing)
-        params = {
-            'level': level,          # Premier or Recreational  
-            'sex': gender,           # Boys or Girls
-            'age': age,              # U-9, U-10, etc.
-            'subdivision': subdivision
-        }
-        
-        url = f"{BASE_URL}{CGI_STANDINGS_PATH}"
-        
-        html = self._make_request(url, params)
-        if not html:
-            return []
-        
-        # Check for error page
-        if 'could not match this combination' in html.lower() or 'error' in html.lower()[:500]:
-            return []
-        
-        # Save debug HTML if requested
-        if self.debug:
-            debug_file = self.output_dir / f"debug_cgi_{gender}_{level}_{age}_{subdivision}.html"
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html)
-        
-        # Parse the response
-        return self._parse_cgi_response(html, season, gender, level, age, subdivision)
+    def _cgi_labels(self, gender: str, level: str, age: str, subdivision: str) -> Tuple[str, str, str]:
+        """(division, age_group, subdivision name) for a CGI page, as stored on each row."""
+        if level == "Premier":
+            division = f"{'boys' if gender == 'Boys' else 'girls'}_prem"
+        else:
+            division = f"{'boys' if gender == 'Boys' else 'girls'}_rec"
+        return division, self._extract_age_group(age), f"{age} {gender} {level} Subdivision {subdivision}"
     
     def _parse_cgi_response(self, html: str, season: str, gender: str, 
                             level: str, age: str, subdivision: str) -> List[TeamStanding]:
         """Parse CGI standings response HTML."""
         teams = []
-        soup = BeautifulSoup(html, 'html.parser')
         
-        # Determine division string
-        if level == "Premier":
-            division = f"{'boys' if gender == 'Boys' else 'girls'}_prem"
-        else:
-            division = f"{'boys' if gender == 'Boys' else 'girls'}_rec"
-        
-        age_group = self._extract_age_group(age)
-        subdivision_name = f"{age} {gender} {level} Subdivision {subdivision}"
+        division, age_group, subdivision_name = self._cgi_labels(gender, level, age, subdivision)
         
         # Find standings table(s)
-        tables = soup.find_all('table')
-        
-        for table in tables:
-            rows = table.find_all('tr')
-            
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) < 6:  # Need at least team + W/L/T/GF/GA
+        for rows in self.parser.tables(html):
+            for cell_texts in rows:
+                if len(cell_texts) < 6:  # Need at least team + W/L/T/GF/GA
                     continue
                 
-                cell_texts = [cell.get_text(strip=True) for cell in cells]
                 first_cell = cell_texts[0].lower()
                 
                 # Skip header rows
@@ -350,7 +451,7 @@ class HeartlandScraper:
                     team_info = cell_texts[0]
                     
                     # Extract team number (4 chars) and name
-                    team_num_match = re.match(r'^([0-9A-Za-z]{4})\s+(.+)$', team_info)
+                    team_num_match = TEAM_NUMBER_PATTERN.match(team_info)
                     if team_num_match:
                         team_number = team_num_match.group(1)
                         team_name = self._normalize_team_name(team_num_match.group(2))
@@ -361,19 +462,15 @@ class HeartlandScraper:
                     if not team_name or len(team_name) < 3:
                         continue
                     
-                    def parse_int(val):
-                        val = re.sub(r'[^\d-]', '', str(val))
-                        return int(val) if val and val != '-' else 0
-                    
                     # Column order may vary - try to be flexible
                     # Standard: Team | W | L | T | GF | GA | RC | Pts
-                    wins = parse_int(cell_texts[1]) if len(cell_texts) > 1 else 0
-                    losses = parse_int(cell_texts[2]) if len(cell_texts) > 2 else 0
-                    ties = parse_int(cell_texts[3]) if len(cell_texts) > 3 else 0
-                    goals_for = parse_int(cell_texts[4]) if len(cell_texts) > 4 else 0
-                    goals_against = parse_int(cell_texts[5]) if len(cell_texts) > 5 else 0
-                    red_cards = parse_int(cell_texts[6]) if len(cell_texts) > 6 else 0
-                    points = parse_int(cell_texts[7]) if len(cell_texts) > 7 else 0
+                    wins = parse_int(cell_texts[1], dash=0) if len(cell_texts) > 1 else 0
+                    losses = parse_int(cell_texts[2], dash=0) if len(cell_texts) > 2 else 0
+                    ties = parse_int(cell_texts[3], dash=0) if len(cell_texts) > 3 else 0
+                    goals_for = parse_int(cell_texts[4], dash=0) if len(cell_texts) > 4 else 0
+                    goals_against = parse_int(cell_texts[5], dash=0) if len(cell_texts) > 5 else 0
+                    red_cards = parse_int(cell_texts[6], dash=0) if len(cell_texts) > 6 else 0
+                    points = parse_int(cell_texts[7], dash=0) if len(cell_texts) > 7 else 0
                     
                     teams.append(TeamStanding(
                         team_number=team_number,
@@ -396,64 +493,615 @@ class HeartlandScraper:
                     continue
         
         return teams
+    
+    def _parse_results_response(self, html: str, season: str, gender: str,
+                                level: str, age: str, subdivision: str) -> List[Tuple]:
+        """
+        Parse a CGI results page into MATCH_FIELDS tuples.
+        
+        Results rows are Date | Gm | Time | Home | score | Visitor | score; the
+        date cell is blank for later games on the same day, so the last date
+        seen is carried forward. The team roster table above it has two cells
+        per row and is skipped.
+        """
+        division, age_group, subdivision_name = self._cgi_labels(gender, level, age, subdivision)
+        matches = []
+        current_date = None
+        for rows in self.parser.tables(html):
+            for cells in rows:
+                if len(cells) < 7:
+                    continue
+                if cells[0].strip():
+                    current_date = match_date(cells[0], season)  # None for the header row
+                if current_date is None:
+                    continue
+                home = TEAM_NUMBER_PATTERN.match(cells[3].strip())
+                away = TEAM_NUMBER_PATTERN.match(cells[5].strip())
+                if not home or not away:
+                    continue
+                matches.append((current_date, cells[1].strip(), cells[2].strip(),
+                                home.group(1), parse_score(cells[4]),
+                                away.group(1), parse_score(cells[6]),
+                                season, division, age_group, subdivision_name, gender))
+        return matches
 
-    def scrape_live_division(self, gender: str, level: str, season: str) -> List[TeamStanding]:
-        """Scrape all subdivisions for a gender/level combination via CGI."""
-        teams = []
+
+def parse_page(parser_name: str, job: Tuple, html: str) -> List[Tuple]:
+    """
+    Pipeline parse stage (runs in a worker process).
+    
+    Jobs are ('archive', season, division),
+    ('cgi', season, gender, level, age, subdivision) or ('results', ...) with
+    the same fields. Returns compact row tuples in TeamStanding field order,
+    or MATCH_FIELDS order for results.
+    """
+    parser = _worker_parsers.get(parser_name)
+    if parser is None:
+        parser = _worker_parsers[parser_name] = StandingsParser(parser_name)
+    if job[0] == 'archive':
+        _, season, division = job
+        teams = parser.iter_archive_standings(html, season, division)
+    elif job[0] == 'results':
+        return parser._parse_results_response(html, *job[1:])
+    else:
+        _, season, gender, level, age, subdivision = job
+        teams = parser._parse_cgi_response(html, season, gender, level, age, subdivision)
+    return [team_row(team) for team in teams]
+
+_worker_parsers: Dict[str, StandingsParser] = {}
+
+
+class PageParseError(Exception):
+    """A fetched page could not be parsed; its job did not complete."""
+
+# ============================================================================
+# SHARDING
+# ============================================================================
+
+_ROW = {name: i for i, name in enumerate(STANDINGS_FIELDS)}
+_DIGITS = re.compile(r'(\d+)')
+
+def _natural(text: str) -> Tuple:
+    """'U-9' < 'U-10', '2' < '10'."""
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(_DIGITS.split(text)))
+
+def shard_key(job: Tuple) -> Tuple:
+    """
+    Unit that decides which shard runs a job.
+    
+    Live CGI work is split by age group, so a shard discovers and fetches the
+    same subdivisions whether or not the manifest is fresh. An archived season
+    stays on one shard, which can then tell that its archive is empty and
+    fall back to CGI itself.
+    """
+    if job[0] in ('cgi', 'results') and is_current_season(job[1]):
+        return ('cgi',) + job[1:5]
+    return ('archive', job[1])
+
+def row_sort_key(row: Tuple) -> Tuple:
+    """Canonical order of merged shard output: newest season first, then division, age, subdivision."""
+    season = row[_ROW['season']]
+    return (season_priority(season), season, row[_ROW['gender']], row[_ROW['division']],
+            _natural(row[_ROW['age_group']]), _natural(row[_ROW['subdivision']]))
+
+_MATCH = {name: i for i, name in enumerate(MATCH_FIELDS)}
+
+def match_sort_key(row: Tuple) -> Tuple:
+    """Canonical order of merged match output: as row_sort_key, then date and game number."""
+    season = row[_MATCH['season']]
+    return (season_priority(season), season, row[_MATCH['gender']], row[_MATCH['division']],
+            _natural(row[_MATCH['age_group']]), _natural(row[_MATCH['subdivision']]),
+            row[_MATCH['match_date']], _natural(row[_MATCH['game_number']]))
+
+def match_key(row: Tuple) -> str:
+    """Downstream match key: heartland-{premier|recreational}-{homeId}-{awayId}-{date}."""
+    level = 'premier' if row[_MATCH['division']].endswith('_prem') else 'recreational'
+    return (f"heartland-{level}-{row[_MATCH['home_number']]}-{row[_MATCH['away_number']]}"
+            f"-{row[_MATCH['match_date']]}")
+
+# ============================================================================
+# SCRAPER CLASS
+# ============================================================================
+
+class HeartlandScraper(StandingsParser):
+    def __init__(self, output_dir: str = "./heartland_data", debug: bool = False,
+                 max_workers: int = DEFAULT_MAX_WORKERS, rate: float = MAX_REQUESTS_PER_SECOND,
+                 per_host: int = DEFAULT_PER_HOST, manifest_ttl: float = MANIFEST_TTL_HOURS,
+                 refresh_manifest: bool = False, use_cache: bool = True,
+                 cache_dir: str = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                 parser: str = 'auto', parse_workers: Optional[int] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, journal: bool = True,
+                 journal_path: str = None, resume: bool = False, transport: str = None,
+                 adaptive: bool = True, max_rate: Optional[float] = None,
+                 retries: int = DEFAULT_ATTEMPTS - 1, profiler: Optional[StageProfiler] = None,
+                 shard: Optional[ShardSpec] = None, results: bool = True,
+                 new_matches: bool = False, match_index_path: str = None,
+                 team_ids: bool = False, identity_path: str = None):
+        super().__init__(parser)
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Referer': 'https://www.heartlandsoccer.net/league/score-standings/',
+        })
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.all_teams = StandingsTable()
+        # Match results (MATCH_FIELDS tuples), fetched next to every live standings page
+        self.results = results
+        self.all_matches: List[Tuple] = []
+        # With new_matches, exports carry only matches not emitted (unchanged) by an earlier run
+        self.match_index: Optional[MatchIndex] = None
+        if new_matches:
+            self.match_index = MatchIndex(Path(match_index_path) if match_index_path
+                                          else self.output_dir / MATCH_INDEX_FILE)
+        # With team_ids, Supabase exports carry a stable cross-season heartland_team_id
+        self.identity: Optional[TeamIdentityIndex] = None
+        if team_ids:
+            self.identity = TeamIdentityIndex(Path(identity_path) if identity_path
+                                              else self.output_dir / TEAM_IDENTITY_FILE)
+        self.exporter: Optional[StreamingExporter] = None
+        self.debug = debug
+        self.failed_requests: List[str] = []
+        self._failed_lock = threading.Lock()
+        # Transient failures are retried with backoff; dead endpoints trip a breaker;
+        # units that still fail are kept in the ledger for --retry-failed
+        self.retry_policy = RetryPolicy(attempts=retries + 1)
+        self.breaker = CircuitBreaker()
+        self.ledger = FailureLedger(self.output_dir / FAILED_REQUESTS_FILE)
+        self._run_units: Set[Tuple] = set()  # Units scheduled this run (the ledger may hold older ones)
+        # Adaptive per-host rate, learned across runs. It starts at `rate` and stays at or
+        # below it; a higher `max_rate` opts into faster rates and raises the global ceiling too
+        ceiling = max(rate, max_rate) if adaptive and max_rate else rate
+        limiter = AdaptiveLimiter(self.output_dir / RATE_STATE_FILE, initial_rate=rate,
+                                  max_rate=ceiling) if adaptive else None
+        self.metrics = MetricsRegistry()
+        self.profiler = profiler
+        self.shard = shard  # Only jobs whose shard_key hashes to this shard are run
+        self.fetcher = FetchEngine(self.session, rate=ceiling, max_workers=max_workers,
+                                   per_host=per_host, adaptive=limiter,
+                                   metrics=self.metrics, classify=endpoint_label)
+        # Optional record/replay transport (--transport or $HEARTLAND_TRANSPORT)
+        pool = {'pool_connections': self.fetcher.per_host, 'pool_maxsize': self.fetcher.max_workers}
+        self.cassette = (install_transport(self.session, transport, **pool) if transport
+                         else install_from_env(self.session, **pool))
+        self.manifest_ttl = manifest_ttl
+        self.refresh_manifest = refresh_manifest
+        self.pipeline = FetchParsePipeline(self.fetcher, parse_workers=parse_workers, queue_size=queue_size)
+        self.cache: Optional[ResponseCache] = None
+        if use_cache:
+            cache_path = Path(cache_dir) if cache_dir else self.output_dir / CACHE_DIR_NAME
+            self.cache = ResponseCache(cache_path, max_bytes=cache_max_bytes)
+        # Completed work units, so an interrupted run can be resumed
+        self.journal: Optional[ScrapeJournal] = None
+        if journal or resume:
+            path = Path(journal_path) if journal_path else self.output_dir / JOURNAL_FILE
+            self.journal = ScrapeJournal(path, resume=resume)
+        
+    def _make_request(self, url: str, params: Dict = None,
+                      ttl: Optional[float] = LIVE_CACHE_TTL, strict: bool = False) -> Optional[str]:
+        """
+        Make a rate-limited HTTP request (safe to call from fetch workers).
+        
+        Responses are cached on disk for `ttl` seconds (None = forever); stale
+        entries are revalidated with the server's ETag/Last-Modified. A 404 is
+        cached as a negative entry for at most NEGATIVE_TTL seconds.
+        
+        Transient failures (connection errors, 429, 5xx) are retried with
+        jittered backoff. Requests that still fail are added to
+        `failed_requests` and return None, or re-raise when `strict` is set so
+        callers can tell "no page" (404, also None) from "not fetched".
+        """
+        stale = None
+        if self.cache is not None:
+            if self.cache.missing(url, params):
+                logger.debug(f"Not found (cached): {url}")
+                return None
+            body = self.cache.get(url, params)
+            if body is not None:
+                return body
+            stale = self.cache.lookup(url, params)
+            if stale is not None and stale.negative:
+                stale = None
+        
+        try:
+            headers = stale.validators() if stale else None
+            response = self._get(url, params, headers)
+            if response.status_code == 304 and stale:
+                body = self.cache.read(stale)
+                if body is not None:
+                    self.cache.revalidated(url, params, ttl)
+                    return body
+                response = self._get(url, params)
+        except requests.RequestException as e:
+            if getattr(e.response, 'status_code', None) == 404:
+                logger.debug(f"Not found: {url}")
+                if self.cache is not None:
+                    self.cache.store_missing(url, params, NEGATIVE_TTL if ttl is None else min(ttl, NEGATIVE_TTL))
+                return None
+            logger.warning(f"Request failed for {url}{'?' + urlencode(params) if params else ''}: {e}")
+            with self._failed_lock:
+                self.failed_requests.append(f"{url}?{urlencode(params)}" if params else url)
+            if strict:
+                raise
+            return None
+        
+        if self.cache is not None:
+            self.cache.store(url, params, response.text, response.headers, ttl)
+        return response.text
+
+    def _owns(self, job: Tuple) -> bool:
+        return self.shard is None or self.shard.owns(shard_key(job))
+
+    def _stage(self, name: str):
+        """Profile the block as stage `name` when running with --profile."""
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def _get(self, url: str, params: Dict = None, headers: Dict = None) -> requests.Response:
+        return call_with_retry(lambda: self.fetcher.get(url, params=params, headers=headers),
+                               url, self.retry_policy, self.breaker)
+
+    def close(self, complete: bool = False):
+        """
+        Stop fetch/parse workers and persist the response cache, journal and failure ledger.
+        
+        `complete` says the scrape ran to the end. If nothing failed this run
+        and none of its units is still in the ledger, the journal is then
+        marked finished, so a later --resume starts over instead of replaying
+        this run. Ledger entries from other runs' scopes do not hold it open.
+        """
+        self.pipeline.close()
+        self.fetcher.close()
+        self.ledger.save()
+        if self.ledger:
+            logger.warning(f"{len(self.ledger)} units still failing - saved to {self.ledger.path} "
+                           f"(re-run them with --retry-failed)")
+        if self.journal is not None:
+            failing = [job for job in self.ledger.jobs() if job in self._run_units]
+            if complete and not failing and not self.failed_requests:
+                self.journal.complete()
+            self.journal.close()
+        if self.cassette is not None:
+            self.cassette.close()
+        if self.cache is not None:
+            self.cache.save()
+            logger.info(self.cache.summary())
+    
+    # =========================================================================
+    # CGI PARSER (Live data for current season)
+    # =========================================================================
+    
+    def _scrape_cgi_standings(self, gender: str, level: str, age: str, 
+                              subdivision: str, season: str) -> List[TeamStanding]:
+        """Scrape standings from CGI endpoint for a specific subdivision."""
+        html = self._fetch_cgi_html(gender, level, age, subdivision)
+        if not html:
+            return []
+        return self._parse_cgi_response(html, season, gender, level, age, subdivision)
+    
+    def _fetch_cgi_html(self, gender: str, level: str, age: str, subdivision: str,
+                        strict: bool = False, report: str = 'standings') -> Optional[str]:
+        """Fetch one CGI standings (or results) page; None for failures and "no match" pages."""
+        
+        # Correct CGI parameters (discovered via testing)
+        params = {
+            'level': level,          # Premier or Recreational  
+            'sex': gender,           # Boys or Girls
+            'age': age,              # U-9, U-10, etc.
+            'subdivision': subdivision
+        }
+        
+        url = f"{BASE_URL}{CGI_RESULTS_PATH if report == 'results' else CGI_STANDINGS_PATH}"
+        
+        html = self._make_request(url, params, strict=strict)
+        if not html:
+            return None
+        
+        # Check for error page
+        if 'could not match this combination' in html.lower() or 'error' in html.lower()[:500]:
+            return None
+        
+        # Save debug HTML if requested
+        if self.debug:
+            prefix = 'results' if report == 'results' else 'cgi'
+            debug_file = self.output_dir / f"debug_{prefix}_{gender}_{level}_{age}_{subdivision}.html"
+            with open(debug_file, 'w', encoding='utf-8') as f:
+                f.write(html)
+        
+        return html
+
+    # =========================================================================
+    # PIPELINE (fetch threads -> parse processes -> ordered aggregation)
+    # =========================================================================
+    
+    def _fetch_job(self, job: Tuple) -> Optional[str]:
+        """
+        Fetch one pipeline job; network failures raise so the job is not journaled.
+        
+        Failed jobs go into the failure ledger and leave it once they succeed.
+        """
+        try:
+            with self._stage('fetch'):
+                if job[0] == 'archive':
+                    _, season, division = job
+                    html = self._fetch_archive_html(season, division, strict=True)
+                else:
+                    kind, season, gender, level, age, subdivision = job
+                    html = self._fetch_cgi_html(gender, level, age, subdivision, strict=True,
+                                                report='results' if kind == 'results' else 'standings')
+        except requests.RequestException as e:
+            self.ledger.add(job, e)
+            raise
+        self.ledger.resolve(job)
+        return html
+    
+    def _parse_failed(self, job: Tuple, error: Exception):
+        """
+        Record a page that fetched but did not parse.
+        
+        The unit goes into the failure ledger for --retry-failed and the run
+        counts as partial, as for a failed fetch; it is never journaled.
+        """
+        self.ledger.add(job, error)
+        with self._failed_lock:
+            self.failed_requests.append(f"{'/'.join(job)} (parse failed)")
+    
+    def _collect(self, table: StandingsTable, rows: List[Tuple]):
+        """Append row tuples to `table`; rows landing in all_teams are also streamed to the exporter."""
+        with self._stage('collect'):
+            table.extend_rows(rows)
+        if table is self.all_teams and self.exporter is not None:
+            with self._stage('export'):
+                self.exporter.write_rows(rows)
+    
+    def _collect_matches(self, matches: List[Tuple]):
+        """Keep match tuples in all_matches and stream them to the exporter."""
+        with self._stage('collect'):
+            self.all_matches.extend(matches)
+        if self.exporter is not None:
+            with self._stage('export'):
+                self.exporter.write_match_rows(self._unseen_matches(matches, self.exporter))
+    
+    def _indexes_matches(self, exporter: StreamingExporter) -> bool:
+        """
+        Whether `exporter` writes matches through the match index.
+        
+        Formats without a match sink (supabase, changes) write no matches, so
+        the index must not mark them as seen.
+        """
+        return self.match_index is not None and bool(exporter.match_sinks)
+    
+    def _unseen_matches(self, matches: List[Tuple], exporter: StreamingExporter) -> List[Tuple]:
+        """Matches the index has not seen with the same record (all of them without an index)."""
+        if not self._indexes_matches(exporter):
+            return matches
+        return [row for row in matches if self.match_index.check(match_key(row), row)]
+    
+    def _commit_matches(self, exporter: StreamingExporter):
+        """Mark exported matches as seen - only once the files holding them are closed."""
+        if self._indexes_matches(exporter):
+            self.match_index.commit()
+            logger.info(self.match_index.summary())
+    
+    def _save_identity(self):
+        """Persist team ids handed out by this export (after its files are closed)."""
+        if self.identity is not None:
+            self.identity.save()
+            logger.info(self.identity.summary())
+    
+    def _cgi_jobs(self, season: str, combos: List[Tuple[str, str, str, str]]) -> List[Tuple]:
+        """A standings job per combo, each followed by its results job when the season scrapes results."""
+        kinds = ('cgi', 'results') if self.results and scrapes_results(season) else ('cgi',)
+        return [(kind, season) + tuple(combo) for combo in combos for kind in kinds]
+    
+    def _run_pipeline(self, jobs: List[Tuple], table: StandingsTable):
+        """
+        Fetch and parse jobs through the staged pipeline, appending rows to `table` in job order.
+        
+        Jobs already in the journal are replayed from it instead of fetched;
+        newly completed jobs are journaled. Jobs owned by other shards are skipped.
+        """
+        if self.shard is not None:
+            jobs = [job for job in jobs if self._owns(job)]
+        self._run_units.update(jobs)
+        replay = {}
+        if self.journal is not None:
+            for job in jobs:
+                entry = self.journal.completed(job)
+                if entry is not None:
+                    replay[job] = self.journal.rows(entry)
+            if replay:
+                logger.info(f"  Resuming: {len(replay)}/{len(jobs)} pages from journal")
+        
+        def fetch(job):
+            return None if job in replay else self._fetch_job(job)
+        
+        def on_batch(job, rows):
+            if job in replay:
+                rows = replay[job]
+            elif rows is None:
+                rows = []  # Fetch or parse failed - left out of the journal so a resume retries it
+            else:
+                self.metrics.observe('heartland_rows_per_page', len(rows), endpoint=job[0])
+                if self.journal is not None:
+                    with self._stage('collect'):
+                        self.journal.record(job, rows)
+            if job[0] == 'archive':
+                logger.info(f"Found {len(rows)} teams in {job[1]}/{job[2]}")
+            elif job[0] == 'results':
+                self._collect_matches(rows)
+                return
+            elif rows:
+                logger.debug(f"  {job[2]} {job[3]} {job[4]} Subdiv {job[5]}: {len(rows)} teams")
+            self._collect(table, rows)
+        
+        def on_parsed(job, seconds):
+            self.metrics.observe('heartland_parse_seconds', seconds, endpoint=job[0])
+        
+        parse = partial(parse_page, self.parser.name)
+        if self.profiler is not None:
+            parse = self.profiler.wrap('parse', parse)  # Serial under --profile, so never pickled
+        self.pipeline.run(jobs, fetch, parse, on_batch, on_parsed, self._parse_failed)
+    
+    def _load_manifest(self, season: str) -> SeasonManifest:
+        manifest = SeasonManifest(self.output_dir / f"manifest_{season}.json", season, self.manifest_ttl)
+        if self.refresh_manifest:
+            manifest.blocks = {}
+        return manifest
+
+    def _scrape_job(self, job: Tuple) -> List[Tuple]:
+        """
+        Fetch and parse one job in the calling thread, replayed from / recorded in the journal.
+        
+        Raises requests.RequestException when the fetch fails and PageParseError
+        when the parse does; neither is journaled.
+        """
+        self._run_units.add(job)
+        if self.journal is not None:
+            entry = self.journal.completed(job)
+            if entry is not None:
+                return self.journal.rows(entry)
+        html = self._fetch_job(job)
+        rows = []
+        if html:
+            try:
+                with self.metrics.timer('heartland_parse_seconds', endpoint=job[0]), self._stage('parse'):
+                    rows = parse_page(self.parser.name, job, html)
+            except Exception as e:
+                logger.warning(f"Parse failed for {job}: {type(e).__name__}: {e}")
+                self._parse_failed(job, e)
+                raise PageParseError(f"{job}: {e}") from e
+        self.metrics.observe('heartland_rows_per_page', len(rows), endpoint=job[0])
+        if self.journal is not None:
+            with self._stage('collect'):
+                self.journal.record(job, rows)
+        return rows
+
+    def _discover_age(self, unit: Tuple[str, str, str], season: str
+                      ) -> Tuple[List[str], List[Tuple], List[Tuple], bool]:
+        """
+        Probe subdivisions for one (gender, level, age); returns (subdivisions, rows, matches, complete).
         
+        Premier subdivisions are numbered contiguously, so probing stops after
+        DISCOVERY_MISS_LIMIT consecutive misses. Rec subdivisions are named and
+        always probed in full (there are only six). The final flag is False if
+        any probe failed to fetch or parse; failed probes are not counted as
+        misses, so the probes after them still run (the failure is in the ledger).
+        Results are fetched only for subdivisions that have standings, and a
+        failed results fetch does not make discovery incomplete.
+        """
+        gender, level, age = unit
         if level == "Premier":
-            age_groups = PREMIER_AGE_GROUPS
-            subdivisions = PREMIER_SUBDIVISIONS
+            subdivisions, stop_early = PREMIER_SUBDIVISIONS, True
         else:
-            age_groups = REC_AGE_GROUPS
-            subdivisions = REC_SUBDIVISIONS
-        
-        total_combos = len(age_groups) * len(subdivisions)
-        logger.info(f"Scraping {gender} {level}: {len(age_groups)} ages × {len(subdivisions)} subdivisions = {total_combos} requests")
-        
-        found_count = 0
-        for age in age_groups:
-            for subdiv in subdivisions:
-                subdiv_teams = self._scrape_cgi_standings(
-                    gender=gender,
-                    level=level,
-                    age=age,
-                    subdivision=str(subdiv),
-                    season=season
-                )
-                if subdiv_teams:
-                    teams.extend(subdiv_teams)
-                    found_count += len(subdiv_teams)
-                    logger.debug(f"  {age} Subdiv {subdiv}: {len(subdiv_teams)} teams")
+            subdivisions, stop_early = REC_SUBDIVISIONS, False
         
-        logger.info(f"  Found {found_count} teams in {gender} {level}")
-        return teams
+        found, rows, matches, misses, complete = [], [], [], 0, True
+        for subdiv in subdivisions:
+            try:
+                subdiv_rows = self._scrape_job(('cgi', season, gender, level, age, str(subdiv)))
+            except (requests.RequestException, PageParseError):
+                complete = False
+                continue
+            if subdiv_rows:
+                found.append(str(subdiv))
+                rows.extend(subdiv_rows)
+                misses = 0
+                if self.results and scrapes_results(season):
+                    try:
+                        matches.extend(self._scrape_job(('results', season, gender, level, age, str(subdiv))))
+                    except (requests.RequestException, PageParseError):
+                        pass  # In the ledger for --retry-failed
+            else:
+                misses += 1
+                if stop_early and misses >= DISCOVERY_MISS_LIMIT:
+                    break
+        return found, rows, matches, complete
 
-    def scrape_live_season(self, season: str = CURRENT_SEASON) -> List[TeamStanding]:
-        """Scrape current season via CGI endpoints."""
-        logger.info(f"Scraping LIVE data for {season} via CGI...")
+    def _discover_blocks(self, blocks: List[Tuple[str, str]], season: str,
+                         manifest: SeasonManifest, table: StandingsTable):
+        """Discover live subdivisions for the given blocks, recording them in the manifest."""
+        units = []
+        for gender, level in blocks:
+            age_groups = PREMIER_AGE_GROUPS if level == "Premier" else REC_AGE_GROUPS
+            units.extend((gender, level, age) for age in age_groups)
+        if self.shard is not None:
+            units = [unit for unit in units if self._owns(('cgi', season) + unit)]
+        logger.info(f"  Discovering subdivisions for {len(units)} age groups...")
+        
+        discovered: Dict[Tuple[str, str], List[Tuple[str, str]]] = {block: [] for block in blocks}
+        incomplete = set()
+        results = self.fetcher.map(lambda u: self._discover_age(u, season), units)
+        for unit, (found, rows, matches, complete) in zip(units, results):
+            gender, level, age = unit
+            discovered[(gender, level)].extend((age, subdiv) for subdiv in found)
+            if not complete:
+                incomplete.add((gender, level))
+            self._collect(table, rows)
+            self._collect_matches(matches)
         
-        season_teams = []
+        if self.shard is not None:
+            # Each shard sees only part of a block; a partial manifest would hide the rest
+            logger.info(f"  Shard {self.shard}: {sum(map(len, discovered.values()))} live subdivisions, "
+                        f"manifest not updated")
+            return
+        for (gender, level), combos in discovered.items():
+            if (gender, level) in incomplete:
+                # Probes failed - leave the block stale so the next run re-discovers it
+                logger.warning(f"  {gender} {level}: discovery incomplete, manifest not updated")
+                continue
+            manifest.update(gender, level, combos)
+            logger.info(f"  {gender} {level}: {len(combos)} live subdivisions")
+        manifest.save()
+
+    def _plan_live_blocks(self, blocks: List[Tuple[str, str]], season: str
+                          ) -> Tuple[SeasonManifest, List[Tuple[str, str, str, str]], List[Tuple[str, str]]]:
+        """(manifest, known combos, blocks that need discovery) for a live season."""
+        manifest = self._load_manifest(season)
         
-        # Boys Premier
-        teams = self.scrape_live_division("Boys", "Premier", season)
-        season_teams.extend(teams)
-        self.all_teams.extend(teams)
+        combos = []
+        stale = []
+        for gender, level in blocks:
+            known = manifest.combos(gender, level)
+            if known is None:
+                stale.append((gender, level))
+            else:
+                combos.extend((gender, level, age, subdiv) for age, subdiv in known)
+        return manifest, combos, stale
+
+    def _scrape_live_blocks(self, blocks: List[Tuple[str, str]], season: str, table: StandingsTable):
+        """Scrape gender/level blocks into `table`, using the season manifest where it is fresh."""
+        manifest, combos, stale = self._plan_live_blocks(blocks, season)
         
-        # Girls Premier
-        teams = self.scrape_live_division("Girls", "Premier", season)
-        season_teams.extend(teams)
-        self.all_teams.extend(teams)
+        if combos:
+            logger.info(f"  {len(combos)} CGI requests from manifest "
+                        f"({self.fetcher.max_workers} workers)")
+            self._fetch_live_combos(combos, season, table)
+        if stale:
+            self._discover_blocks(stale, season, manifest, table)
+
+    def _fetch_live_combos(self, combos: List[Tuple[str, str, str, str]],
+                           season: str, table: StandingsTable):
+        """Fetch and parse CGI combos (standings + match results) concurrently, keeping combo order."""
+        self._run_pipeline(self._cgi_jobs(season, combos), table)
+
+    def scrape_live_division(self, gender: str, level: str, season: str) -> StandingsTable:
+        """Scrape all live subdivisions for a gender/level combination via CGI."""
+        logger.info(f"Scraping {gender} {level}...")
         
-        # Boys Recreational
-        teams = self.scrape_live_division("Boys", "Recreational", season)
-        season_teams.extend(teams)
-        self.all_teams.extend(teams)
+        teams = StandingsTable()
+        self._scrape_live_blocks([(gender, level)], season, teams)
+        logger.info(f"  Found {len(teams)} teams in {gender} {level}")
+        return teams
+
+    def scrape_live_season(self, season: str = CURRENT_SEASON) -> TableSlice:
+        """Scrape current season via CGI endpoints (all four gender/level blocks at once)."""
+        logger.info(f"Scraping LIVE data for {season} via CGI...")
         
-        # Girls Recreational
-        teams = self.scrape_live_division("Girls", "Recreational", season)
-        season_teams.extend(teams)
-        self.all_teams.extend(teams)
+        start = len(self.all_teams)
+        self._scrape_live_blocks(LIVE_BLOCKS, season, self.all_teams)
+        season_teams = self.all_teams[start:]
         
         logger.info(f"Live scrape complete: {len(season_teams)} total teams for {season}")
         return season_teams
@@ -464,41 +1112,47 @@ class HeartlandScraper:
     
     def scrape_archive_page(self, season: str, division: str) -> List[TeamStanding]:
         """Scrape a static archive page."""
+        html = self._fetch_archive_html(season, division)
+        if not html:
+            return []
+        
+        teams = self._parse_archive_html(html, season, division)
+        logger.info(f"Found {len(teams)} teams in {season}/{division}")
+        return teams
+    
+    def _fetch_archive_html(self, season: str, division: str, strict: bool = False) -> Optional[str]:
         url = f"{BASE_URL}{ARCHIVES_PATH}/{season}/{division}.html"
         logger.info(f"Scraping archive: {url}")
         
-        html = self._make_request(url)
+        # Closed seasons never change - cache them forever
+        ttl = LIVE_CACHE_TTL if is_current_season(season) else None
+        html = self._make_request(url, ttl=ttl, strict=strict)
         if not html:
             logger.debug(f"No archive data for {season}/{division}")
-            return []
+            return None
         
         if self.debug:
             debug_file = self.output_dir / f"debug_archive_{season}_{division}.html"
             with open(debug_file, 'w', encoding='utf-8') as f:
                 f.write(html)
         
-        teams = self._parse_archive_html(html, season, division)
-        logger.info(f"Found {len(teams)} teams in {season}/{division}")
-        return teams
+        return html
     
-    def scrape_archive_season(self, season: str, divisions: List[str] = None) -> List[TeamStanding]:
+    def scrape_archive_season(self, season: str, divisions: List[str] = None) -> TableSlice:
         """Scrape all divisions for a season from archives."""
         if divisions is None:
             divisions = DIVISIONS
             
-        season_teams = []
-        for division in divisions:
-            teams = self.scrape_archive_page(season, division)
-            season_teams.extend(teams)
-            self.all_teams.extend(teams)
+        start = len(self.all_teams)
+        self._run_pipeline([('archive', season, division) for division in divisions], self.all_teams)
         
-        return season_teams
+        return self.all_teams[start:]
 
     # =========================================================================
     # UNIFIED SCRAPING (Auto-selects archive vs live)
     # =========================================================================
     
-    def scrape_season(self, season: str, force_live: bool = False) -> List[TeamStanding]:
+    def scrape_season(self, season: str, force_live: bool = False) -> TableSlice:
         """
         Scrape a season - automatically chooses archive or live CGI.
         
@@ -514,112 +1168,265 @@ class HeartlandScraper:
             logger.info(f"Using ARCHIVE for {season}")
             teams = self.scrape_archive_season(season)
             
-            # If archive is empty, try CGI as fallback
-            if not teams:
+            # If archive is empty, try CGI as fallback (in a sharded run, only on the season's shard)
+            if not teams and self._owns(('archive', season)):
                 logger.info(f"Archive empty, trying CGI for {season}")
                 return self.scrape_live_season(season)
             
             return teams
 
-    def scrape_years(self, years: int = 3, force_live: bool = False) -> List[TeamStanding]:
+    def scrape_seasons(self, seasons: List[str], force_live: bool = False) -> TableSlice:
+        """
+        Scrape many seasons as one prioritized, concurrent work list.
+        
+        Every archive (season, division) page and every known live CGI combo is
+        a work item. Items run current season first, then archives newest
+        first, through the shared pipeline - the global rate limiter is the
+        only pacing. Live blocks without a fresh manifest are discovered up
+        front; archived seasons that come back empty fall back to CGI
+        afterwards, as in scrape_season.
+        """
+        start = len(self.all_teams)
+        ordered = sorted(dict.fromkeys(seasons), key=season_priority)
+        live = [season for season in ordered if force_live or is_current_season(season)]
+        archived = [season for season in ordered if season not in live]
+        
+        jobs = []
+        for season in live:
+            manifest, combos, stale = self._plan_live_blocks(LIVE_BLOCKS, season)
+            if stale:
+                self._discover_blocks(stale, season, manifest, self.all_teams)
+            jobs.extend(self._cgi_jobs(season, combos))
+        jobs.extend(('archive', season, division) for season in archived for division in DIVISIONS)
+        
+        logger.info(f"Scheduling {len(jobs)} work items across {len(ordered)} seasons "
+                    f"({self.fetcher.max_workers} workers)")
+        scheduled_start = len(self.all_teams)
+        self._run_pipeline(jobs, self.all_teams)
+        
+        # Archive fallback, as in scrape_season
+        season_codes = self.all_teams.codes('season')[scheduled_start:]
+        categories = self.all_teams.categories('season')
+        found = {categories[code] for code in set(season_codes)}
+        for season in archived:
+            if season not in found and self._owns(('archive', season)):
+                logger.info(f"Archive empty, trying CGI for {season}")
+                self.scrape_live_season(season)
+        
+        return self.all_teams[start:]
+
+    def scrape_years(self, years: int = 3, force_live: bool = False) -> StandingsTable:
         """Scrape data for the last N years."""
         seasons = get_seasons_for_years(years)
         logger.info(f"Scraping {years} years: {seasons}")
         
-        for season in seasons:
-            self.scrape_season(season, force_live=force_live)
+        self.scrape_seasons(seasons, force_live=force_live)
         
         logger.info(f"Total teams scraped: {len(self.all_teams)}")
         return self.all_teams
 
+    def retry_failed(self) -> TableSlice:
+        """
+        Re-run only the units in the failure ledger.
+        
+        Units already in the journal are replayed first (standings into
+        all_teams, match results into all_matches), so the outputs written by
+        this pass are complete rather than just the recovered rows.
+        """
+        start = len(self.all_teams)
+        jobs = [job for job in self.ledger.jobs() if self.results or job[0] != 'results']
+        if self.journal is not None:
+            finished = [unit for unit in self.journal.units if unit not in self.ledger.failures
+                        and (self.results or unit[0] != 'results')]
+            for unit in finished:
+                rows = self.journal.rows(self.journal.completed(unit))
+                if unit[0] == 'results':
+                    self._collect_matches(rows)
+                else:
+                    self._collect(self.all_teams, rows)
+            if finished:
+                logger.info(f"Replayed {len(finished)} finished units from {self.journal.path}")
+        
+        if not jobs:
+            logger.info("No failed units to retry")
+        else:
+            logger.info(f"Retrying {len(jobs)} failed units from {self.ledger.path}")
+            self._run_pipeline(jobs, self.all_teams)
+        return self.all_teams[start:]
+
     # =========================================================================
     # OUTPUT METHODS
     # =========================================================================
     
+    def _exporter(self, formats: List[str] = None, compress: bool = False) -> StreamingExporter:
+        return make_exporter(self.output_dir, formats, compress, metrics=self.metrics, matches=self.results,
+                             identity=self.identity)
+    
+    def start_export(self, formats: List[str] = None, compress: bool = False) -> StreamingExporter:
+        """Stream rows to disk as they are scraped; call `finish_export()` at the end."""
+        self.exporter = self._exporter(formats, compress)
+        return self.exporter
+    
+    def finish_export(self) -> Dict[str, str]:
+        exporter, self.exporter = self.exporter, None
+        if exporter is None:
+            return {}
+        with self._stage('export'):
+            paths = exporter.close(partial=bool(self.failed_requests))
+        self._commit_matches(exporter)
+        self._save_identity()
+        if self.match_index is not None:
+            self.match_index.close()
+            self.match_index = None
+        return paths
+    
+    def export(self, formats: List[str] = None, compress: bool = False) -> Dict[str, str]:
+        """Write everything in all_teams to the requested formats in one pass."""
+        exporter = self._exporter(formats, compress)
+        exporter.write_rows(self.all_teams.iter_tuples())
+        exporter.write_match_rows(self._unseen_matches(self.all_matches, exporter))
+        paths = exporter.close(partial=bool(self.failed_requests))
+        self._commit_matches(exporter)
+        self._save_identity()
+        return paths
+    
+    def dump_metrics(self) -> Tuple[str, str]:
+        """Write this run's metrics as metrics.json and metrics.prom (Prometheus text)."""
+        self.metrics.set('heartland_rows_total', len(self.all_teams))
+        json_path, prom_path = self.output_dir / "metrics.json", self.output_dir / "metrics.prom"
+        self.metrics.dump(json_path, prom_path)
+        logger.info(self.metrics.summary())
+        return str(json_path), str(prom_path)
+    
+    def write_shard_part(self, compress: bool = False) -> Dict[str, str]:
+        """
+        Write this shard's rows, sorted for merging, as heartland_shard_<i>of<N>_<date>.ndjson
+        (and its matches as heartland_shard_matches_<i>of<N>_<date>.ndjson).
+        """
+        date_str = datetime.now().strftime("%Y_%m_%d")
+        parts = {'standings': (self.all_teams.iter_tuples(), row_sort_key, STANDINGS_FIELDS)}
+        if self.results:
+            parts['matches'] = (self.all_matches, match_sort_key, MATCH_FIELDS)
+        paths = {}
+        with self._stage('export'):
+            for kind, (rows, key, fields) in parts.items():
+                path = self.output_dir / self.shard.part_name(date_str, compress, kind)
+                write_part(path, self.shard, rows, key=key, kind=kind, fields=fields)
+                paths[f"shard_{kind}"] = str(path)
+        return paths
+    
+    def validate(self) -> Tuple[ValidationReport, Dict[str, str]]:
+        """Check all_teams and write the quality report and quarantine file (needs numpy)."""
+        report = validate_table(self.all_teams)
+        paths = report.write(self.output_dir, self.all_teams)
+        self.metrics.set('heartland_quarantined_rows', len(report.quarantined))
+        (logger.info if report.ok else logger.warning)(report.summary())
+        return report, paths
+    
+    def save_snapshot(self, store_dir: str = None, retention: RetentionPolicy = RetentionPolicy(),
+                      table: StandingsTable = None) -> Optional[str]:
+        """Store `table` (default all_teams) as today's snapshot and apply the retention policy; returns the manifest path."""
+        if self.failed_requests:
+            logger.warning("Snapshot skipped: run had failed requests (a missing page is not a removed team)")
+            return None
+        store = SnapshotStore(Path(store_dir) if store_dir else self.output_dir / SNAPSHOT_DIR)
+        with self._stage('export'):
+            manifest = store.save(self.all_teams if table is None else table)
+            store.prune(retention)
+        return str(store.manifest_dir / f"{manifest['date']}.json")
+    
+    def _save_standings(self, sink: Sink) -> str:
+        """Write all_teams through one sink - standings only, no matches or index updates."""
+        for row in self.all_teams.iter_tuples():
+            sink.write(row)
+        path = sink.close()
+        logger.info(f"Saved {sink.rows} standings: {path}")
+        return path
+    
     def save_csv(self, filename: str = None) -> str:
-        try:
-            import pandas as pd
-            if filename is None:
-                date_str = datetime.now().strftime("%Y_%m_%d")
-                filename = f"heartland_standings_{date_str}.csv"
-            filepath = self.output_dir / filename
-            df = pd.DataFrame([asdict(t) for t in self.all_teams])
-            df.to_csv(filepath, index=False)
-            logger.info(f"Saved CSV: {filepath}")
-            return str(filepath)
-        except ImportError:
-            logger.warning("pandas not installed, skipping CSV")
-            return ""
+        """Standings as CSV at OUTPUT_DIR/filename (default heartland_standings_<date>.csv)."""
+        if filename is None:
+            filename = f"heartland_standings_{datetime.now().strftime('%Y_%m_%d')}.csv"
+        return self._save_standings(CsvSink(self.output_dir / filename))
     
     def save_json(self, filename: str = None) -> str:
+        """Standings as a JSON array at OUTPUT_DIR/filename (default heartland_standings_<date>.json)."""
         if filename is None:
-            date_str = datetime.now().strftime("%Y_%m_%d")
-            filename = f"heartland_standings_{date_str}.json"
-        filepath = self.output_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump([asdict(t) for t in self.all_teams], f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved JSON: {filepath}")
-        return str(filepath)
+            filename = f"heartland_standings_{datetime.now().strftime('%Y_%m_%d')}.json"
+        return self._save_standings(JsonArraySink(self.output_dir / filename, StreamingExporter.standing_dict))
     
     def save_supabase_format(self) -> Tuple[str, str]:
-        date_str = datetime.now().strftime("%Y_%m_%d")
-        
-        # Unique teams PER SEASON
-        teams_seen = {}
-        for team in self.all_teams:
-            season_code = get_season_code(team.season)
-            key = (team.team_name, team.gender, team.age_group, season_code)
-            if key not in teams_seen or team.matches_played > teams_seen[key]['matches_played']:
-                teams_seen[key] = {
-                    'team_name': team.team_name,
-                    'state': 'KS',
-                    'gender': team.gender,
-                    'age_group': team.age_group,
-                    'season_code': season_code,
-                    'source_name': 'heartland_soccer',
-                    'elo_rating': 1500,
-                    'wins': team.wins,
-                    'losses': team.losses,
-                    'draws': team.ties,
-                    'matches_played': team.matches_played
-                }
-        
-        teams_filepath = self.output_dir / f"supabase_teams_{date_str}.json"
-        with open(teams_filepath, 'w', encoding='utf-8') as f:
-            json.dump(list(teams_seen.values()), f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved {len(teams_seen)} unique team-seasons: {teams_filepath}")
-        
-        # All standings
-        standings_data = [{
-            'team_name': t.team_name,
-            'season': t.season,
-            'season_code': get_season_code(t.season),
-            'division': t.division,
-            'subdivision': t.subdivision,
-            'age_group': t.age_group,
-            'gender': t.gender,
-            'wins': t.wins,
-            'losses': t.losses,
-            'ties': t.ties,
-            'goals_for': t.goals_for,
-            'goals_against': t.goals_against,
-            'points': t.points,
-            'source': 'heartland_soccer',
-            'source_url': f"{BASE_URL}{ARCHIVES_PATH}/{t.season}/{t.division}.html"
-        } for t in self.all_teams]
-        
-        standings_filepath = self.output_dir / f"supabase_standings_{date_str}.json"
-        with open(standings_filepath, 'w', encoding='utf-8') as f:
-            json.dump(standings_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved standings: {standings_filepath}")
-        
-        return str(teams_filepath), str(standings_filepath)
+        paths = self.export(['supabase'])
+        return paths.get('supabase_teams', ""), paths.get('supabase_standings', "")
+
+
+def make_exporter(output_dir: Path, formats: List[str] = None, compress: bool = False,
+                  metrics: Optional[MetricsRegistry] = None, matches: bool = False,
+                  identity: Optional[TeamIdentityIndex] = None) -> StreamingExporter:
+    return StreamingExporter(
+        output_dir,
+        datetime.now().strftime("%Y_%m_%d"),
+        season_code=get_season_code,
+        source_url=lambda season, division: f"{BASE_URL}{ARCHIVES_PATH}/{season}/{division}.html",
+        formats=formats,
+        compress=compress,
+        metrics=metrics,
+        matches=matches,
+        identity=identity,
+    )
+
+
+def merge_shards(parts: List[str], output_dir: str, formats: List[str] = None,
+                 compress: bool = False, match_index: Optional[MatchIndex] = None,
+                 identity: Optional[TeamIdentityIndex] = None) -> Dict[str, str]:
+    """
+    k-way merge shard part files into the canonical output files; returns {sink name: path}.
+    
+    With a match index, only new or changed matches are written, and the
+    index is committed once the files are closed (it is left alone when no
+    requested format holds matches). With a team identity index,
+    Supabase outputs carry team ids and the index is saved the same way.
+    """
+    by_kind: Dict[str, List[str]] = {}
+    for part in parts:
+        by_kind.setdefault(read_header(Path(part))['kind'], []).append(part)
+    unknown = set(by_kind) - {'standings', 'matches'}
+    if unknown:
+        raise ValueError(f"Unknown shard part kind(s): {', '.join(sorted(unknown))}")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    exporter = make_exporter(output_dir, formats, compress, matches='matches' in by_kind, identity=identity)
+    if 'standings' in by_kind:
+        merge_parts(by_kind['standings'], exporter.write_row, key=row_sort_key, fields=STANDINGS_FIELDS)
+    if not exporter.match_sinks:
+        match_index = None  # No format holds matches - none are written, so none are seen
+    if 'matches' in by_kind:
+        def write_unseen(row):
+            if match_index.check(match_key(row), row):
+                exporter.write_match_row(row)
+        write = exporter.write_match_row if match_index is None else write_unseen
+        merge_parts(by_kind['matches'], write, key=match_sort_key, fields=MATCH_FIELDS)
+    paths = exporter.close()
+    if match_index is not None:
+        match_index.commit()
+        logger.info(match_index.summary())
+    if identity is not None:
+        identity.save()
+        logger.info(identity.summary())
+    return paths
 
 
 # ============================================================================
 # CLI
 # ============================================================================
 
+def _shard_arg(spec: str) -> ShardSpec:
+    try:
+        return ShardSpec.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Scrape Heartland Soccer standings (Archive + Live CGI)',
@@ -630,61 +1437,218 @@ Examples:
   python heartland_scraper_v4.py --years 3            # Explicit 3 years
   python heartland_scraper_v4.py --live               # Current season only (CGI)
   python heartland_scraper_v4.py --season 2025_fall   # Specific season
+  python heartland_scraper_v4.py --all-history        # Every season, current first
   python heartland_scraper_v4.py --debug              # Save debug HTML
+  python heartland_scraper_v4.py --formats csv ndjson --gzip   # Choose (and compress) outputs
+  python heartland_scraper_v4.py --live --new-matches # Only new or changed match results
+  python heartland_scraper_v4.py --resume             # Continue an interrupted run
+  python heartland_scraper_v4.py --retry-failed       # Re-fetch only last run's failed units
+  python heartland_scraper_v4.py --live --profile     # Per-stage profile in OUTPUT_DIR/profile_<time>/
+  python heartland_scraper_v4.py --all-history --shard 2/4     # This runner's slice of the work
+  python heartland_scraper_v4.py --merge-shards heartland_shard_*of4_*.ndjson  # Merge shard parts
         """
     )
-    parser.add_argument('--years', type=int, default=3, choices=[1, 2, 3, 4],
+    parser.add_argument('--years', type=int, default=3,
                         help='Number of years to scrape (default: 3)')
+    parser.add_argument('--all-history', action='store_true',
+                        help='Scrape every known season (2002-present) as one prioritized work list')
     parser.add_argument('--live', action='store_true',
                         help='Scrape current season via live CGI only')
     parser.add_argument('--season', type=str,
                         help='Specific season to scrape')
+    parser.add_argument('--no-results', action='store_true',
+                        help='Skip match results (subdiv_results.cgi); standings only')
+    parser.add_argument('--new-matches', action='store_true',
+                        help=f'Export only matches that are new or changed since earlier runs (OUTPUT_DIR/{MATCH_INDEX_FILE})')
+    parser.add_argument('--match-index', type=str,
+                        help=f'Match dedup index for --new-matches (default: OUTPUT_DIR/{MATCH_INDEX_FILE})')
+    parser.add_argument('--team-ids', action='store_true',
+                        help=f'Add a stable cross-season heartland_team_id to Supabase outputs (OUTPUT_DIR/{TEAM_IDENTITY_FILE})')
+    parser.add_argument('--team-identity', type=str,
+                        help=f'Team identity index for --team-ids (default: OUTPUT_DIR/{TEAM_IDENTITY_FILE})')
     parser.add_argument('--force-live', action='store_true',
                         help='Force CGI scraping even for archived seasons')
     parser.add_argument('--output-dir', type=str, default='./heartland_data',
                         help='Output directory')
     parser.add_argument('--debug', action='store_true',
                         help='Save raw HTML for debugging')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f'Concurrent fetch workers (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--rate', type=float, default=MAX_REQUESTS_PER_SECOND,
+                        help=f'Max requests per second across all workers; the adaptive rate starts here '
+                             f'(default: {MAX_REQUESTS_PER_SECOND:g})')
+    parser.add_argument('--max-rate', type=float,
+                        help='Let the adaptive rate climb above --rate, up to this many requests per second '
+                             '(default: stay at or below --rate)')
+    parser.add_argument('--fixed-rate', action='store_true',
+                        help=f'Disable adaptive rate limiting (no {RATE_STATE_FILE} is kept)')
+    
+    parser.add_argument('--manifest-ttl', type=float, default=MANIFEST_TTL_HOURS,
+                        help=f'Hours before live subdivisions are re-discovered (default: {MANIFEST_TTL_HOURS})')
+    parser.add_argument('--refresh-manifest', action='store_true',
+                        help='Ignore the season manifest and re-discover live subdivisions')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the on-disk HTTP response cache')
+    parser.add_argument('--cache-dir', type=str,
+                        help=f'Response cache directory (default: OUTPUT_DIR/{CACHE_DIR_NAME})')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Response cache size limit in MB (LRU eviction)')
+    parser.add_argument('--parser', type=str, default='auto', choices=BACKEND_CHOICES,
+                        help='HTML parser backend (default: auto = lxml if installed, else stdlib)')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='Parse processes (default: one per core; 0 = parse in fetch threads)')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f'Raw pages fetched ahead of the parse stage (default: {DEFAULT_QUEUE_SIZE})')
+    
+    parser.add_argument('--resume', action='store_true',
+                        help='Replay work units finished by an interrupted run instead of re-fetching them')
+    parser.add_argument('--journal', type=str,
+                        help=f'Scrape journal path (default: OUTPUT_DIR/{JOURNAL_FILE})')
+    
+    parser.add_argument('--retries', type=int, default=DEFAULT_ATTEMPTS - 1,
+                        help=f'Retries per request for connection errors, 429 and 5xx (default: {DEFAULT_ATTEMPTS - 1})')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help=f'Only re-fetch units in OUTPUT_DIR/{FAILED_REQUESTS_FILE}; the rest is replayed from the journal')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile each stage (cProfile + tracemalloc) into OUTPUT_DIR/profile_<time>/; runs serially')
+    parser.add_argument('--profile-sample', type=float, nargs='?', const=DEFAULT_SAMPLE_INTERVAL,
+                        help=f'With --profile, also sample stacks every N seconds (default: {DEFAULT_SAMPLE_INTERVAL})')
+    parser.add_argument('--transport', type=str,
+                        help='record:DIR, replay:DIR or stand-in:URL (see heartland_transport.py)')
+    
+    parser.add_argument('--shard', type=_shard_arg, metavar='I/N',
+                        help='Run only shard I of N (stable hash split); writes a part file instead of the outputs')
+    parser.add_argument('--merge-shards', nargs='+', metavar='PART',
+                        help='Merge shard part files into the output files and exit (no scraping)')
+    
+    parser.add_argument('--formats', nargs='+', default=DEFAULT_FORMATS, choices=FORMATS,
+                        help=f'Output formats (default: {" ".join(DEFAULT_FORMATS)})')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Gzip-compress every output file')
+    parser.add_argument('--snapshot', action='store_true',
+                        help=f'Also store the standings in the deduplicated snapshot store (OUTPUT_DIR/{SNAPSHOT_DIR})')
+    parser.add_argument('--snapshot-dir', type=str,
+                        help=f'Snapshot store for --snapshot (default: OUTPUT_DIR/{SNAPSHOT_DIR})')
+    parser.add_argument('--validate', action='store_true',
+                        help='Check the standings (points, duplicates, goal balance, header rows); writes a '
+                             'quality report and quarantine file, and --snapshot stores only clean rows (needs numpy)')
     
     args = parser.parse_args()
-    scraper = HeartlandScraper(output_dir=args.output_dir, debug=args.debug)
+    if args.validate and not numpy_available():
+        parser.error("--validate requires: pip install numpy")
+    
+    if args.merge_shards:
+        match_index = None
+        if args.new_matches:
+            Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+            match_index = MatchIndex(Path(args.match_index) if args.match_index
+                                     else Path(args.output_dir) / MATCH_INDEX_FILE)
+        identity = None
+        if args.team_ids:
+            Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+            identity = TeamIdentityIndex(Path(args.team_identity) if args.team_identity
+                                         else Path(args.output_dir) / TEAM_IDENTITY_FILE)
+        output_paths = merge_shards(args.merge_shards, args.output_dir, args.formats,
+                                    compress=args.gzip, match_index=match_index, identity=identity)
+        if match_index is not None:
+            match_index.close()
+        for name, path in output_paths.items():
+            print(f"  {name + ':':<20}{path}")
+        return 0 if output_paths else 1
+    
+    profiler = None
+    if args.profile:
+        # One fetch worker + inline parsing keeps every stage in the profiled thread
+        profile_dir = Path(args.output_dir) / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        profiler = StageProfiler(profile_dir, sample_interval=args.profile_sample)
+        args.workers, args.parse_workers = 1, 0
+    
+    scraper = HeartlandScraper(output_dir=args.output_dir, debug=args.debug,
+                               max_workers=args.workers, rate=args.rate,
+                               manifest_ttl=args.manifest_ttl,
+                               refresh_manifest=args.refresh_manifest,
+                               use_cache=not args.no_cache, cache_dir=args.cache_dir,
+                               cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                               parser=args.parser, parse_workers=args.parse_workers,
+                               queue_size=args.queue_size,
+                               journal_path=args.journal, resume=args.resume or args.retry_failed,
+                               transport=args.transport, adaptive=not args.fixed_rate,
+                               max_rate=args.max_rate, retries=args.retries, profiler=profiler,
+                               shard=args.shard, results=not args.no_results,
+                               new_matches=args.new_matches and args.shard is None,
+                               match_index_path=args.match_index,
+                               team_ids=args.team_ids and args.shard is None,
+                               identity_path=args.team_identity)
+    if profiler is not None:
+        profiler.start()
     
-    if args.live:
+    # Rows are written to every output format as they are scraped; a shard
+    # writes one sorted part file at the end instead
+    if args.shard is None:
+        scraper.start_export(args.formats, compress=args.gzip)
+    
+    if args.retry_failed:
+        # Follow-up pass over last run's failures
+        scraper.retry_failed()
+    elif args.live:
         # Current season only via CGI
         scraper.scrape_live_season(CURRENT_SEASON)
     elif args.season:
         # Specific season
         scraper.scrape_season(args.season, force_live=args.force_live)
+    elif args.all_history:
+        # Full backfill, current season first then newest archives
+        scraper.scrape_seasons(ALL_SEASONS, force_live=args.force_live)
     else:
         # Default: N years of data
         scraper.scrape_years(args.years, force_live=args.force_live)
     
-    # Save outputs
+    scraper.close(complete=True)
+    if profiler is not None:
+        profiler.phase('scrape')
+    output_paths = scraper.finish_export()
+    if args.shard is not None:
+        output_paths = scraper.write_shard_part(compress=args.gzip)
+    else:
+        clean = scraper.all_teams
+        if args.validate and scraper.all_teams:
+            report, quality_paths = scraper.validate()
+            output_paths.update(quality_paths)
+            clean = report.clean_table(scraper.all_teams)
+        if args.snapshot and clean:
+            snapshot = scraper.save_snapshot(args.snapshot_dir, table=clean)
+            if snapshot:
+                output_paths['snapshot'] = snapshot
+    scraper.dump_metrics()
+    if profiler is not None:
+        profiler.phase('export')
+        profiler.finish()
+    
     if scraper.all_teams:
-        csv_path = scraper.save_csv()
-        json_path = scraper.save_json()
-        teams_path, standings_path = scraper.save_supabase_format()
-        
         # Summary by season
         season_counts = {}
-        for team in scraper.all_teams:
-            sc = get_season_code(team.season)
-            season_counts[sc] = season_counts.get(sc, 0) + 1
+        for season, count in scraper.all_teams.value_counts('season').items():
+            sc = get_season_code(season)
+            season_counts[sc] = season_counts.get(sc, 0) + count
         
         print("\n" + "="*60)
         print("SCRAPE COMPLETE!")
         print("="*60)
         print(f"Total team-season records: {len(scraper.all_teams)}")
+        if scraper.results:
+            print(f"Match results: {len(scraper.all_matches)}")
         print("\nBy season:")
         for sc in sorted(season_counts.keys(), reverse=True):
             print(f"  {sc}: {season_counts[sc]} teams")
         print(f"\nOutput files:")
-        if csv_path:
-            print(f"  CSV:                {csv_path}")
-        print(f"  JSON:               {json_path}")
-        print(f"  Supabase Teams:     {teams_path}")
-        print(f"  Supabase Standings: {standings_path}")
+        for name, path in output_paths.items():
+            print(f"  {name + ':':<20}{path}")
+        if scraper.failed_requests:
+            print(f"\nFailed requests: {len(scraper.failed_requests)} "
+                  f"({len(scraper.ledger)} units saved for --retry-failed)")
         print("="*60)
+    elif args.shard is not None:
+        print(f"\nShard {args.shard}: no teams (empty part written to {output_paths['shard_standings']})")
     else:
         print("\nNo teams found.")
         if scraper.failed_requests:
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Heartland Work Sharding
+=======================
+Splits a scrape across N independent runners (e.g. parallel CI jobs) and
+merges their results back into the canonical output files.
+
+  1. ShardSpec: shard i of N (1-based). A work unit belongs to the shard
+     picked by a SHA-1 hash of its key - not Python's hash(), which is salted
+     per process - so every runner agrees on the split without coordination
+     and adding seasons never moves existing units between shards.
+  2. write_part(): one shard's rows, sorted by the merge key, as an NDJSON
+     part file (a header line, then one JSON array per row). Standings and
+     match results are separate kinds of part, merged separately.
+  3. merge_parts(): heapq.merge over the part files. Only one row per part is
+     held at a time, so memory does not grow with the number of rows.
+
+Usage:
+    shard = ShardSpec.parse('2/4')
+    if shard.owns(('archive', '2019_fall')): ...
+    write_part(output_dir / shard.part_name(date_str), shard, rows, key=row_sort_key)
+
+    rows = merge_parts(part_paths, exporter.write_row, key=row_sort_key)
+"""
+
+import gzip
+import hashlib
+import heapq
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, IO, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from heartland_table import STANDINGS_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PART_FORMAT = 1
+
+# ============================================================================
+# SHARD ASSIGNMENT
+# ============================================================================
+
+@dataclass(frozen=True)
+class ShardSpec:
+    index: int   # 1..count
+    count: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "ShardSpec":
+        """'2/4' -> shard 2 of 4."""
+        try:
+            index, count = (int(part) for part in spec.split('/'))
+        except ValueError:
+            raise ValueError(f"Shard must look like I/N, got {spec!r}") from None
+        if not 1 <= index <= count:
+            raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def of(self, key: Tuple) -> int:
+        """Shard number (1-based) that owns `key`."""
+        digest = hashlib.sha1('\x1f'.join(map(str, key)).encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') % self.count + 1
+
+    def owns(self, key: Tuple) -> bool:
+        return self.of(key) == self.index
+
+    def part_name(self, date_str: str, compress: bool = False, kind: str = 'standings') -> str:
+        prefix = "heartland_shard" if kind == 'standings' else f"heartland_shard_{kind}"
+        name = f"{prefix}_{self.index}of{self.count}_{date_str}.ndjson"
+        return f"{name}.gz" if compress else name
+
+# ============================================================================
+# PART FILES
+# ============================================================================
+
+def _open_part(path: Path, mode: str, compress: Optional[bool] = None) -> IO[str]:
+    if compress is None:
+        compress = str(path).endswith('.gz')
+    if compress:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def write_part(path: Path, shard: ShardSpec, rows: Iterable[Tuple], key: Callable[[Tuple], Tuple],
+               kind: str = 'standings', fields: Tuple[str, ...] = STANDINGS_FIELDS) -> int:
+    """Write `rows` sorted by `key` (stable, so page order survives ties); returns the row count."""
+    rows = sorted(rows, key=key)
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    with _open_part(tmp, 'w', compress=path.name.endswith('.gz')) as f:
+        f.write(json.dumps({
+            'part': PART_FORMAT,
+            'shard': str(shard),
+            'kind': kind,
+            'rows': len(rows),
+            'fields': list(fields),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }) + '\n')
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+    os.replace(tmp, path)
+    logger.info(f"Shard {shard}: {len(rows)} {kind} rows written to {path}")
+    return len(rows)
+
+
+def read_header(path: Path) -> dict:
+    with _open_part(path, 'r') as f:
+        header = json.loads(f.readline() or 'null')
+    if not isinstance(header, dict) or header.get('part') != PART_FORMAT:
+        raise ValueError(f"{path} is not a shard part file")
+    header.setdefault('kind', 'standings')
+    return header
+
+
+def _iter_part(path: Path, expected: int) -> Iterator[Tuple]:
+    count = 0
+    with _open_part(path, 'r') as f:
+        f.readline()
+        for line in f:
+            count += 1
+            yield tuple(json.loads(line))
+    if count != expected:
+        raise ValueError(f"{path}: header says {expected} rows, read {count} (truncated part?)")
+
+
+def check_parts(paths: List[Path], fields: Tuple[str, ...] = STANDINGS_FIELDS) -> List[dict]:
+    """Headers for `paths`; raises ValueError on other fields, mixed shard counts or duplicate shards."""
+    headers = [read_header(Path(path)) for path in paths]
+    for path, header in zip(paths, headers):
+        if tuple(header['fields']) != tuple(fields):
+            raise ValueError(f"{path} has fields {header['fields']}, expected {list(fields)}")
+    specs = [ShardSpec.parse(header['shard']) for header in headers]
+    counts = {spec.count for spec in specs}
+    if len(counts) > 1:
+        raise ValueError(f"Parts come from different shard counts: {sorted(counts)}")
+    seen = [spec.index for spec in specs]
+    duplicates = sorted({index for index in seen if seen.count(index) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate parts for shard(s) {duplicates}")
+    if specs:
+        missing = sorted(set(range(1, specs[0].count + 1)) - set(seen))
+        if missing:
+            logger.warning(f"Merging without shard(s) {missing} of {specs[0].count} - output will be incomplete")
+    return headers
+
+
+def merge_parts(paths: List[Path], write: Callable[[Tuple], None], key: Callable[[Tuple], Tuple],
+                fields: Tuple[str, ...] = STANDINGS_FIELDS, headers: Optional[List[dict]] = None) -> int:
+    """k-way merge part files (each sorted by `key`) into `write`; returns the row count."""
+    headers = headers if headers is not None else check_parts(paths, fields)
+    streams = [_iter_part(Path(path), header['rows']) for path, header in zip(paths, headers)]
+    rows = 0
+    for row in heapq.merge(*streams, key=key):
+        write(row)
+        rows += 1
+    logger.info(f"Merged {rows} rows from {len(paths)} shard parts")
+    return rows
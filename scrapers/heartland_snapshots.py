@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Heartland Snapshot Store
+========================
+Daily standings history as compressed, content-addressed column chunks.
+
+A day's standings are cut into runs of consecutive rows with the same season
+and division (normally one run per season/division). Each column of a run is
+one chunk, named by the BLAKE2b hash of its contents and zlib-compressed:
+
+    snapshots/
+        manifests/2026_01_15.json     rows, fields, and the season trees of the day
+        objects/ab/ab12...            chunks: column (I/S), run (R) and season tree (T)
+
+    manifest -> season trees -> runs (row count + one chunk per column) -> column chunks
+
+A chunk is written once and shared by every day (and run) that has the same
+bytes. Closed seasons never change, so after the first day a snapshot costs
+its manifest, one season tree and the columns that actually moved - typically
+the current season's W/L/T, goals and points. A year of dailies is a few MB.
+
+String columns are stored dictionary-encoded, like StandingsTable holds
+them, so load_snapshot() rebuilds a table column by column (no per-row JSON
+or string lookups), in the original row order. prune() applies a daily/weekly/monthly retention
+policy and deletes the chunks no kept day refers to.
+
+Usage:
+    store = SnapshotStore(output_dir / SNAPSHOT_DIR)
+    store.save(scraper.all_teams)                  # today's snapshot
+    table = store.load('2026-01-15')               # or load_snapshot(date, store_dir)
+    store.prune(RetentionPolicy(daily=30, weekly=12, monthly=24))
+
+    python heartland_snapshots.py list heartland_data/snapshots
+    python heartland_snapshots.py import heartland_data/snapshots heartland_data/heartland_standings_*.json
+    python heartland_snapshots.py prune heartland_data/snapshots --daily 30 --weekly 12 --monthly 24
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+import logging
+
+from heartland_table import StandingsTable, STANDINGS_FIELDS, NUMERIC_FIELDS, CATEGORICAL_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_FORMAT = 1
+
+DIGEST_SIZE = 12          # 96-bit chunk names
+COMPRESS_LEVEL = 9
+CHUNK_CACHE_SIZE = 4096   # Decoded chunks kept by a store between loads
+
+# Chunk kinds (first byte of the uncompressed chunk)
+INT_COLUMN, STR_COLUMN, RUN, TREE = b'I', b'S', b'R', b'T'
+
+_DATE = re.compile(r'(\d{4})[-_](\d{2})[-_](\d{2})')
+
+DateLike = Union[str, date]
+
+# ============================================================================
+# RETENTION
+# ============================================================================
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Keep the newest `daily` days, the last day of the newest `weekly` ISO weeks and `monthly` months."""
+    daily: int = 30
+    weekly: int = 12
+    monthly: int = 24
+
+    def keep(self, dates: List[date]) -> Set[date]:
+        dates = sorted(dates, reverse=True)
+        kept = set(dates[:self.daily])
+        for period, count in ((lambda d: d.isocalendar()[:2], self.weekly),
+                              (lambda d: (d.year, d.month), self.monthly)):
+            newest: Dict[Tuple, date] = {}
+            for d in dates:
+                newest.setdefault(period(d), d)
+            kept.update(sorted(newest.values(), reverse=True)[:count])
+        return kept
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def date_key(value: DateLike) -> str:
+    """'2026-01-15', '2026_01_15' or a date -> '2026_01_15' (the output files' date format)."""
+    if isinstance(value, date):
+        return value.strftime("%Y_%m_%d")
+    match = _DATE.search(str(value))
+    if not match:
+        raise ValueError(f"Not a snapshot date: {value!r}")
+    return '_'.join(match.groups())
+
+
+def _as_date(key: str) -> date:
+    return datetime.strptime(key, "%Y_%m_%d").date()
+
+
+def _int_bytes(values) -> bytes:
+    column = array('i', values)
+    if sys.byteorder == 'big':
+        column.byteswap()  # Chunks are little-endian on every machine
+    return column.tobytes()
+
+
+def _bytes_ints(data: bytes) -> array:
+    column = array('i')
+    column.frombytes(data)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+def _encode_strings(values: List[str], codes) -> bytes:
+    """A string column as its distinct values (first-seen order) plus 4-byte codes into them."""
+    local: Dict[int, int] = {}
+    remapped = [local.setdefault(code, len(local)) for code in codes]
+    distinct = sorted(local, key=local.get)
+    header = json.dumps([values[code] for code in distinct], ensure_ascii=False,
+                        separators=(',', ':')).encode('utf-8')
+    return STR_COLUMN + struct.pack('<I', len(header)) + header + _int_bytes(remapped)
+
+
+def _decode(data: bytes):
+    kind = data[:1]
+    if kind == INT_COLUMN:
+        return _bytes_ints(data[1:])
+    if kind == STR_COLUMN:
+        (size,) = struct.unpack_from('<I', data, 1)
+        return json.loads(data[5:5 + size]), _bytes_ints(data[5 + size:])
+    return json.loads(data[1:])
+
+
+def _encode_json(kind: bytes, value) -> bytes:
+    return kind + json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _runs(table: StandingsTable) -> Iterator[Tuple[int, int]]:
+    """(start, stop) of each run of consecutive rows with the same season and division."""
+    seasons, divisions = table.codes('season'), table.codes('division')
+    start = 0
+    for i in range(1, len(table) + 1):
+        if i == len(table) or seasons[i] != seasons[start] or divisions[i] != divisions[start]:
+            yield start, i
+            start = i
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class SnapshotStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifest_dir = self.root / "manifests"
+        self.object_dir = self.root / "objects"
+        self._cache: Dict[str, object] = {}
+        self.written = self.reused = 0
+
+    # -------------------------------------------------------------------------
+    # Objects
+    # -------------------------------------------------------------------------
+
+    def _object_path(self, digest: str) -> Path:
+        return self.object_dir / digest[:2] / digest
+
+    def _put(self, data: bytes) -> str:
+        """Store an uncompressed chunk (if new); returns its name."""
+        digest = hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+        path = self._object_path(digest)
+        if path.exists():
+            self.reused += 1
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(zlib.compress(data, COMPRESS_LEVEL))
+        os.replace(tmp, path)
+        self.written += 1
+        return digest
+
+    def _get(self, digest: str):
+        """Decoded chunk: array('i'), (values, codes), run dict or tree list."""
+        value = self._cache.get(digest)
+        if value is not None:
+            return value
+        value = _decode(zlib.decompress(self._object_path(digest).read_bytes()))
+        if len(self._cache) >= CHUNK_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[digest] = value
+        return value
+
+    # -------------------------------------------------------------------------
+    # Manifests
+    # -------------------------------------------------------------------------
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.manifest_dir / f"{key}.json"
+
+    def dates(self) -> List[date]:
+        """Snapshot dates, oldest first."""
+        if not self.manifest_dir.exists():
+            return []
+        return sorted(_as_date(path.stem) for path in self.manifest_dir.glob("*.json")
+                      if _DATE.fullmatch(path.stem))
+
+    def manifest(self, when: DateLike) -> Dict:
+        key = self._resolve(when)
+        path = self._manifest_path(key)
+        try:
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            raise KeyError(f"No snapshot for {key}") from None
+        if manifest.get('snapshot') != SNAPSHOT_FORMAT or tuple(manifest.get('fields', ())) != STANDINGS_FIELDS:
+            raise ValueError(f"{path} has an unknown snapshot layout")
+        return manifest
+
+    def _resolve(self, when: DateLike) -> str:
+        if when == 'latest':
+            dates = self.dates()
+            if not dates:
+                raise KeyError(f"No snapshots in {self.root}")
+            return date_key(dates[-1])
+        return date_key(when)
+
+    # -------------------------------------------------------------------------
+    # Save / load
+    # -------------------------------------------------------------------------
+
+    def save(self, table: StandingsTable, when: DateLike = None) -> Dict:
+        """Store `table` as the snapshot of `when` (default today), replacing that day's snapshot."""
+        key = date_key(when or date.today())
+        written, reused = self.written, self.reused
+        categories = {name: table.categories(name) for name in CATEGORICAL_FIELDS}
+        trees: List[Tuple[str, List[str]]] = []  # (season, run names), consecutive runs of a season
+        for start, stop in _runs(table):
+            chunks = []
+            for name in STANDINGS_FIELDS:
+                codes = table.codes(name)[start:stop]
+                if name in NUMERIC_FIELDS:
+                    chunks.append(self._put(INT_COLUMN + _int_bytes(codes)))
+                else:
+                    chunks.append(self._put(_encode_strings(categories[name], codes)))
+            run = self._put(_encode_json(RUN, {'rows': stop - start, 'columns': chunks}))
+            season = categories['season'][table.codes('season')[start]]
+            if trees and trees[-1][0] == season:
+                trees[-1][1].append(run)
+            else:
+                trees.append((season, [run]))
+        manifest = {
+            'snapshot': SNAPSHOT_FORMAT,
+            'date': key,
+            'rows': len(table),
+            'fields': list(STANDINGS_FIELDS),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'seasons': [[season, self._put(_encode_json(TREE, runs))] for season, runs in trees],
+        }
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        path = self._manifest_path(key)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(json.dumps(manifest, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp, path)
+        logger.info(f"Snapshot {key}: {len(table)} rows, {self.written - written} new chunks, "
+                    f"{self.reused - reused} shared")
+        return manifest
+
+    def load(self, when: DateLike = 'latest', seasons: Optional[List[str]] = None) -> StandingsTable:
+        """The snapshot of `when` as a StandingsTable (optionally only some seasons), in saved row order."""
+        manifest = self.manifest(when)
+        columns: Dict[str, array] = {name: array('i') for name in STANDINGS_FIELDS}
+        categories: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORICAL_FIELDS}
+        for season, tree in manifest['seasons']:
+            if seasons is not None and season not in seasons:
+                continue
+            for run in self._get(tree):
+                for name, chunk in zip(STANDINGS_FIELDS, self._get(run)['columns']):
+                    if name in NUMERIC_FIELDS:
+                        columns[name].extend(self._get(chunk))
+                        continue
+                    # Chunk-local codes -> codes into this load's distinct values
+                    values, codes = self._get(chunk)
+                    seen = categories[name]
+                    remap = [seen.setdefault(value, len(seen)) for value in values]
+                    if len(remap) == 1:
+                        columns[name].extend(array('i', remap) * len(codes))
+                    else:
+                        columns[name].extend(array('i', map(remap.__getitem__, codes)))
+        table = StandingsTable()
+        table.extend_columns(columns, categories={name: list(seen) for name, seen in categories.items()})
+        if seasons is None and len(table) != manifest['rows']:
+            raise ValueError(f"Snapshot {manifest['date']}: manifest says {manifest['rows']} rows, "
+                             f"loaded {len(table)}")
+        return table
+
+    # -------------------------------------------------------------------------
+    # Retention
+    # -------------------------------------------------------------------------
+
+    def prune(self, policy: RetentionPolicy = RetentionPolicy()) -> List[date]:
+        """Delete snapshots outside `policy`, then unreferenced chunks; returns the removed dates."""
+        dates = self.dates()
+        kept = policy.keep(dates)
+        removed = [d for d in dates if d not in kept]
+        for d in removed:
+            self._manifest_path(date_key(d)).unlink()
+        if removed:
+            logger.info(f"Snapshots: pruned {len(removed)} of {len(dates)} days")
+        self.gc()
+        return removed
+
+    def _reachable(self) -> Set[str]:
+        live: Set[str] = set()
+        for d in self.dates():
+            for _, tree in self.manifest(d)['seasons']:
+                if tree in live:
+                    continue
+                live.add(tree)
+                for run in self._get(tree):
+                    if run not in live:
+                        live.add(run)
+                        live.update(self._get(run)['columns'])
+        return live
+
+    def gc(self) -> int:
+        """Delete chunks (and leftover temp files) no snapshot refers to; returns the count."""
+        if not self.object_dir.exists():
+            return 0
+        live = self._reachable()
+        removed = 0
+        for path in self.object_dir.glob("*/*"):
+            if path.name not in live:
+                path.unlink()
+                self._cache.pop(path.name, None)
+                removed += 1
+        if removed:
+            logger.info(f"Snapshots: removed {removed} unreferenced chunks")
+        return removed
+
+    def stats(self) -> Dict:
+        files = [p for p in self.root.rglob("*") if p.is_file()] if self.root.exists() else []
+        return {
+            'snapshots': len(self.dates()),
+            'objects': sum(1 for p in files if p.parent.parent == self.object_dir),
+            'bytes': sum(p.stat().st_size for p in files),
+        }
+
+
+def load_snapshot(when: DateLike = 'latest', store_dir: Path = Path("heartland_data") / SNAPSHOT_DIR,
+                  seasons: Optional[List[str]] = None) -> StandingsTable:
+    """Standings of one day from the snapshot store."""
+    return SnapshotStore(store_dir).load(when, seasons=seasons)
+
+# ============================================================================
+# IMPORT
+# ============================================================================
+
+def read_standings_file(path: Path) -> StandingsTable:
+    """A heartland_standings_*.json / .ndjson output file (optionally .gz) as a table."""
+    path = Path(path)
+    opener = gzip.open if path.name.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        if '.ndjson' in path.name:
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = json.load(f)
+    table = StandingsTable()
+    try:
+        table.extend_columns({name: [record[name] for record in records] for name in STANDINGS_FIELDS})
+    except KeyError as e:
+        raise ValueError(f"{path} is missing standings field {e}") from None
+    return table
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Heartland standings snapshot store')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('list', help='List snapshots and store size')
+    p.add_argument('store')
+    p = sub.add_parser('import', help='Store dated heartland_standings_* output files as snapshots')
+    p.add_argument('store')
+    p.add_argument('files', nargs='+')
+    p = sub.add_parser('prune', help='Apply a retention policy and delete unreferenced chunks')
+    p.add_argument('store')
+    defaults = RetentionPolicy()
+    p.add_argument('--daily', type=int, default=defaults.daily, help=f'Newest days kept (default: {defaults.daily})')
+    p.add_argument('--weekly', type=int, default=defaults.weekly, help=f'Weeks kept (default: {defaults.weekly})')
+    p.add_argument('--monthly', type=int, default=defaults.monthly, help=f'Months kept (default: {defaults.monthly})')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    store = SnapshotStore(Path(args.store))
+    if args.command == 'import':
+        for name in sorted(args.files):
+            store.save(read_standings_file(Path(name)), date_key(Path(name).name))
+    elif args.command == 'prune':
+        store.prune(RetentionPolicy(args.daily, args.weekly, args.monthly))
+    for d in store.dates() if args.command == 'list' else []:
+        print(f"  {d.isoformat()}  {store.manifest(d)['rows']:>7} rows")
+    stats = store.stats()
+    print(f"{stats['snapshots']} snapshots, {stats['objects']} chunks, {stats['bytes'] / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Heartland Standings Table
+=========================
+Compact columnar storage for scraped standings rows.
+
+A list of TeamStanding dataclasses costs a few hundred bytes per row: an
+instance dict plus repeated `season` / `division` / `age_group` / `gender` /
+`subdivision` strings. StandingsTable keeps:
+
+  - string columns dictionary-encoded (one shared copy of each distinct value,
+    a 4-byte code per row in an `array('i')`)
+  - numeric columns as `array('i')`
+
+Rows are read through lightweight `StandingRow` views that expose the same
+attributes as TeamStanding (including `matches_played`), and whole-column
+accessors (`table.column('wins')`, `table.matches_played`) avoid building
+row objects at all.
+
+Usage:
+    table = StandingsTable()
+    table.extend(teams)                 # TeamStanding objects or row views
+    table.append_row(row_tuple)         # tuple in STANDINGS_FIELDS order
+    for team in table: team.team_name
+    table.matches_played                # array('i')
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+# Must match the TeamStanding dataclass field order
+STANDINGS_FIELDS = (
+    'team_number', 'team_name', 'wins', 'losses', 'ties', 'goals_for',
+    'goals_against', 'red_cards', 'points', 'season', 'division', 'age_group',
+    'subdivision', 'gender',
+)
+NUMERIC_FIELDS = frozenset(['wins', 'losses', 'ties', 'goals_for', 'goals_against', 'red_cards', 'points'])
+CATEGORICAL_FIELDS = tuple(f for f in STANDINGS_FIELDS if f not in NUMERIC_FIELDS)
+
+# Match results (subdiv_results.cgi) - plain tuples, scores are None until played
+MATCH_FIELDS = (
+    'match_date', 'game_number', 'match_time', 'home_number', 'home_score',
+    'away_number', 'away_score', 'season', 'division', 'age_group',
+    'subdivision', 'gender',
+)
+
+# ============================================================================
+# DICTIONARY ENCODING
+# ============================================================================
+
+class StringDictionary:
+    """Distinct values of one string column; codes are list positions."""
+    __slots__ = ('values', 'index')
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+# ============================================================================
+# ROW VIEW
+# ============================================================================
+
+class StandingRow:
+    """Read-only view of one table row with TeamStanding's attributes."""
+    __slots__ = ('_table', '_i')
+
+    def __init__(self, table: "StandingsTable", i: int):
+        self._table = table
+        self._i = i
+
+    @property
+    def matches_played(self) -> int:
+        return self.wins + self.losses + self.ties
+
+    def astuple(self) -> Tuple:
+        return self._table.row_tuple(self._i)
+
+    def to_dict(self) -> Dict:
+        return dict(zip(STANDINGS_FIELDS, self.astuple()))
+
+    def __eq__(self, other) -> bool:
+        try:
+            return self.astuple() == tuple(getattr(other, f) for f in STANDINGS_FIELDS)
+        except AttributeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        body = ', '.join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"StandingRow({body})"
+
+
+def _numeric_getter(name: str):
+    def get(self):
+        return self._table._columns[name][self._i]
+    return property(get)
+
+
+def _categorical_getter(name: str):
+    def get(self):
+        table = self._table
+        return table._dicts[name].values[table._columns[name][self._i]]
+    return property(get)
+
+
+for _name in STANDINGS_FIELDS:
+    setattr(StandingRow, _name,
+            _numeric_getter(_name) if _name in NUMERIC_FIELDS else _categorical_getter(_name))
+
+# ============================================================================
+# TABLE
+# ============================================================================
+
+class StandingsTable:
+    """Append-only columnar table of standings rows."""
+    __slots__ = ('_columns', '_column_list', '_dicts', '_len')
+
+    def __init__(self, rows: Iterable = None):
+        self._columns: Dict[str, array] = {name: array('i') for name in STANDINGS_FIELDS}
+        self._column_list = [self._columns[name] for name in STANDINGS_FIELDS]
+        self._dicts: Dict[str, StringDictionary] = {name: StringDictionary() for name in CATEGORICAL_FIELDS}
+        self._len = 0
+        if rows is not None:
+            self.extend(rows)
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def append_row(self, row: Tuple):
+        """Append a tuple in STANDINGS_FIELDS order (the pipeline's batch format)."""
+        if len(row) != len(STANDINGS_FIELDS):
+            raise ValueError(f"Expected {len(STANDINGS_FIELDS)} fields, got {len(row)}")
+        dicts = self._dicts
+        encoded = [value if name in NUMERIC_FIELDS else dicts[name].encode(value)
+                   for name, value in zip(STANDINGS_FIELDS, row)]
+        for column, value in zip(self._column_list, encoded):
+            column.append(value)
+        self._len += 1
+
+    def append(self, team):
+        """Append any object with TeamStanding attributes."""
+        self.append_row(tuple(getattr(team, name) for name in STANDINGS_FIELDS))
+
+    def extend(self, teams: Iterable):
+        for team in teams:
+            if isinstance(team, tuple):
+                self.append_row(team)
+            else:
+                self.append(team)
+
+    def extend_rows(self, rows: Iterable[Tuple]):
+        for row in rows:
+            self.append_row(row)
+
+    def extend_columns(self, columns: Dict[str, Sequence], categories: Dict[str, List[str]] = None):
+        """
+        Append whole columns (field -> equal-length values), skipping per-row tuples.
+
+        With `categories`, string columns hold codes into categories[field]
+        instead of the strings themselves.
+        """
+        lengths = {len(columns[name]) for name in STANDINGS_FIELDS}
+        if len(lengths) != 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        for name in STANDINGS_FIELDS:
+            column = self._columns[name]
+            if name in NUMERIC_FIELDS:
+                column.extend(columns[name])
+            elif categories is None:
+                column.extend(map(self._dicts[name].encode, columns[name]))
+            else:
+                remap = [self._dicts[name].encode(value) for value in categories[name]]
+                if remap == list(range(len(remap))):
+                    column.extend(columns[name])  # Same dictionary order (e.g. a new table)
+                else:
+                    column.extend(map(remap.__getitem__, columns[name]))
+        self._len += lengths.pop()
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[StandingRow]:
+        for i in range(self._len):
+            yield StandingRow(self, i)
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return TableSlice(self, *key.indices(self._len)[:2])
+        if key < 0:
+            key += self._len
+        if not 0 <= key < self._len:
+            raise IndexError("StandingsTable index out of range")
+        return StandingRow(self, key)
+
+    def row_tuple(self, i: int) -> Tuple:
+        columns, dicts = self._columns, self._dicts
+        return tuple(
+            columns[name][i] if name in NUMERIC_FIELDS else dicts[name].values[columns[name][i]]
+            for name in STANDINGS_FIELDS
+        )
+
+    def iter_tuples(self) -> Iterator[Tuple]:
+        for i in range(self._len):
+            yield self.row_tuple(i)
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        for row in self.iter_tuples():
+            yield dict(zip(STANDINGS_FIELDS, row))
+
+    # -------------------------------------------------------------------------
+    # Column accessors
+    # -------------------------------------------------------------------------
+
+    def column(self, name: str) -> Union[array, List[str]]:
+        """Numeric column as array('i'); string columns decoded to a list."""
+        if name in NUMERIC_FIELDS:
+            return self._columns[name]
+        values = self._dicts[name].values
+        return [values[code] for code in self._columns[name]]
+
+    def codes(self, name: str) -> array:
+        """Dictionary codes of a string column (index into `categories(name)`)."""
+        return self._columns[name]
+
+    def categories(self, name: str) -> List[str]:
+        return self._dicts[name].values
+
+    @property
+    def matches_played(self) -> array:
+        c = self._columns
+        return array('i', map(lambda w, l, t: w + l + t, c['wins'], c['losses'], c['ties']))
+
+    def value_counts(self, name: str) -> Dict[str, int]:
+        """Rows per distinct value of a string column."""
+        counts = [0] * len(self._dicts[name])
+        for code in self._columns[name]:
+            counts[code] += 1
+        return {value: n for value, n in zip(self._dicts[name].values, counts) if n}
+
+    def nbytes(self) -> int:
+        """Approximate memory held by column buffers and dictionary strings."""
+        total = sum(col.itemsize * len(col) for col in self._columns.values())
+        for d in self._dicts.values():
+            total += sum(len(v.encode('utf-8')) + 49 for v in d.values)
+        return total
+
+
+class TableSlice:
+    """Contiguous range of a StandingsTable, without copying."""
+    __slots__ = ('table', 'start', 'stop')
+
+    def __init__(self, table: StandingsTable, start: int, stop: int):
+        self.table = table
+        self.start = start
+        self.stop = max(start, stop)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __iter__(self) -> Iterator[StandingRow]:
+        for i in range(self.start, self.stop):
+            yield StandingRow(self.table, i)
+
+    def __getitem__(self, i: int) -> StandingRow:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("TableSlice index out of range")
+        return StandingRow(self.table, self.start + i)
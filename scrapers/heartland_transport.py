@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Heartland Record/Replay Transport
+=================================
+Offline HTTP for load-testing the scrapers without touching the real sites.
+
+Three transports plug into a `requests.Session` as adapters:
+
+    record:DIR        pass requests through and save every response to a cassette
+    replay:DIR        answer from the cassette in-process (unknown requests fail)
+    stand-in:URL      send every request to a local stand-in server (below)
+
+The stand-in server replays a cassette over real HTTP, so runs exercise
+sockets, connection pools and concurrency exactly like production. Its
+latency, error rate and rate limit (429 + Retry-After) are configurable and
+the random stream is seeded, so runs are reproducible.
+
+A cassette is a directory:
+
+    cassette.ndjson     one line per response: method, url, params, request body
+                        hash, status, headers, latency, body hash
+    bodies/<sha>        response bodies, stored once per distinct content
+
+Requests are matched on method + URL (query parameters sorted) + request
+body. A request recorded several times replays its responses in order, and
+the last one repeats.
+
+Usage:
+    python heartland_scraper_v4.py --live --transport record:cassettes/live
+    python heartland_transport.py serve cassettes/live --port 8765 --error-rate 0.02 --rate-limit 20
+    python heartland_scraper_v4.py --live --no-cache --transport stand-in:http://127.0.0.1:8765
+
+    HEARTLAND_TRANSPORT=replay:cassettes/discovery python ../scripts/_archive/discover_tournaments.py
+"""
+
+import argparse
+import hashlib
+import http.server
+import json
+import math
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import logging
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TRANSPORT_ENV = "HEARTLAND_TRANSPORT"
+TRANSPORT_MODES = ['record', 'replay', 'stand-in']
+CASSETTE_FILE = "cassette.ndjson"
+KEPT_HEADERS = ['Content-Type', 'ETag', 'Last-Modified', 'Retry-After', 'Cache-Control']
+
+DEFAULT_PORT = 8765
+
+# ============================================================================
+# CASSETTE
+# ============================================================================
+
+def canonical_url(url: str) -> str:
+    """URL with query parameters sorted, so params dict order never matters."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def request_key(method: str, url: str, body: Optional[bytes]) -> str:
+    key = f"{method.upper()} {canonical_url(url)}"
+    return f"{key} {_sha(body)[:16]}" if body else key
+
+
+class Cassette:
+    """Recorded responses, keyed by request_key()."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._log = None
+        index = self.path / CASSETTE_FILE
+        if index.exists():
+            with open(index, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries.setdefault(entry['key'], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.entries.values())
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, latency: float):
+        body = request.body.encode('utf-8') if isinstance(request.body, str) else request.body
+        content = response.content
+        digest = _sha(content)
+        entry = {
+            'key': request_key(request.method, request.url, body),
+            'method': request.method,
+            'url': canonical_url(request.url),
+            'params': dict(parse_qsl(urlsplit(request.url).query, keep_blank_values=True)),
+            'request_sha': _sha(body) if body else None,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            'encoding': response.encoding,
+            'latency': round(latency, 4),
+            'body': digest,
+        }
+        with self._lock:
+            blob = self.path / "bodies" / digest
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                blob.write_bytes(content)
+            if self._log is None:
+                self._log = open(self.path / CASSETTE_FILE, 'a', encoding='utf-8')
+            self._log.write(json.dumps(entry) + '\n')
+            self._log.flush()
+            self.entries.setdefault(entry['key'], []).append(entry)
+
+    def match(self, method: str, url: str, body: Optional[bytes]) -> Optional[Dict]:
+        """Next recorded response for this request (the last one repeats)."""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key = request_key(method, url, body)
+        with self._lock:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+    def body(self, entry: Dict) -> bytes:
+        return (self.path / "bodies" / entry['body']).read_bytes()
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+# ============================================================================
+# ADAPTERS
+# ============================================================================
+
+class RecordingAdapter(HTTPAdapter):
+    """Real HTTP; every response is also written to the cassette."""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+
+def build_response(request: requests.PreparedRequest, entry: Dict, content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.reason = entry.get('reason') or ''
+    response.headers = CaseInsensitiveDict(entry.get('headers') or {})
+    response.encoding = entry.get('encoding')
+    response._content = content
+    response.url = request.url
+    response.request = request
+    return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serve from the cassette in-process; `latency_scale` > 0 sleeps for the recorded latency."""
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 0.0):
+        super().__init__()
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.match(request.method, request.url, request.body)
+        if entry is None:
+            raise requests.ConnectionError(f"Not in cassette: {request.method} {request.url}", request=request)
+        if self.latency_scale > 0:
+            time.sleep(entry['latency'] * self.latency_scale)
+        return build_response(request, entry, self.cassette.body(entry))
+
+    def close(self):
+        pass
+
+
+class StandInAdapter(HTTPAdapter):
+    """Rewrite https://host/path?q to {server}/https/host/path?q and send it there."""
+
+    def __init__(self, server_url: str, **kwargs):
+        self.server_url = server_url.rstrip('/')
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        original = request.url
+        parts = urlsplit(original)
+        request = request.copy()
+        request.url = f"{self.server_url}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+        if parts.query:
+            request.url += f"?{parts.query}"
+        response = super().send(request, **kwargs)
+        response.url = original
+        return response
+
+
+def install(session: requests.Session, spec: str, pool_connections: int = 10,
+            pool_maxsize: int = 10) -> Optional[Cassette]:
+    """
+    Mount the transport described by `spec` ('record:DIR', 'replay:DIR' or
+    'stand-in:URL') on both schemes of `session`. Returns the cassette, if any.
+    """
+    mode, _, target = spec.partition(':')
+    if mode not in TRANSPORT_MODES or not target:
+        raise ValueError(f"Transport must be one of {', '.join(m + ':...' for m in TRANSPORT_MODES)}, got '{spec}'")
+    cassette = None
+    if mode == 'record':
+        Path(target).mkdir(parents=True, exist_ok=True)
+        cassette = Cassette(Path(target))
+        adapter = RecordingAdapter(cassette, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    elif mode == 'replay':
+        cassette = Cassette(Path(target))
+        if not len(cassette):
+            raise ValueError(f"Cassette {target} is empty")
+        adapter = ReplayAdapter(cassette)
+    else:
+        adapter = StandInAdapter(target, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    logger.info(f"HTTP transport: {mode} {target}")
+    return cassette
+
+
+def install_from_env(session: requests.Session, **kwargs) -> Optional[Cassette]:
+    """install() using $HEARTLAND_TRANSPORT; does nothing when it is unset."""
+    spec = os.environ.get(TRANSPORT_ENV)
+    return install(session, spec, **kwargs) if spec else None
+
+# ============================================================================
+# STAND-IN SERVER
+# ============================================================================
+
+class StandInServer:
+    """
+    Threaded HTTP server replaying a cassette.
+
+    latency:      None = recorded latency x `latency_scale`, else fixed seconds
+    error_rate:   fraction of requests answered with `error_status`
+    rate_limit:   requests/second allowed before answering 429 (None = unlimited)
+    """
+
+    def __init__(self, cassette: Cassette, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 latency: Optional[float] = None, latency_scale: float = 1.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 rate_limit: Optional[float] = None, seed: int = 0):
+        self.cassette = cassette
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.stats = {'requests': 0, 'served': 0, 'missing': 0, 'errors': 0, 'throttled': 0}
+        self._random = random.Random(seed)
+        self._tokens = float(rate_limit or 0)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._handle(self)
+
+            do_POST = do_PATCH = do_PUT = do_DELETE = do_GET
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _admit(self) -> Tuple[bool, float, float]:
+        """(throttled, retry_after, roll) under the lock, so the seeded stream stays ordered."""
+        with self._lock:
+            self.stats['requests'] += 1
+            roll = self._random.random()
+            if self.rate_limit is None:
+                return False, 0.0, roll
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._last) * self.rate_limit)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return False, 0.0, roll
+            self.stats['throttled'] += 1
+            return True, (1 - self._tokens) / self.rate_limit, roll
+
+    def _handle(self, handler: http.server.BaseHTTPRequestHandler):
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else None
+
+        # Path is /{scheme}/{host}/{path...}
+        scheme, _, rest = handler.path.lstrip('/').partition('/')
+        url = f"{scheme}://{rest}"
+
+        throttled, retry_after, roll = self._admit()
+        if throttled:
+            self._reply(handler, 429, b'Too Many Requests',
+                        {'Retry-After': str(max(1, math.ceil(retry_after)))})
+            return
+        if roll < self.error_rate:
+            with self._lock:
+                self.stats['errors'] += 1
+            self._reply(handler, self.error_status, b'Injected error', {})
+            return
+
+        entry = self.cassette.match(handler.command, url, body)
+        if entry is None:
+            with self._lock:
+                self.stats['missing'] += 1
+            self._reply(handler, 404, f"Not in cassette: {url}".encode('utf-8'), {})
+            return
+
+        delay = self.latency if self.latency is not None else entry['latency'] * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.stats['served'] += 1
+        self._reply(handler, entry['status'], self.cassette.body(entry), entry.get('headers') or {})
+
+    @staticmethod
+    def _reply(handler, status: int, content: bytes, headers: Dict[str, str]):
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start(self) -> str:
+        """Serve on a background thread; returns the base URL for 'stand-in:' transports."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True,
+                                        name='heartland-stand-in')
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def summary(self) -> str:
+        return ("Stand-in: " + ", ".join(f"{k} {v}" for k, v in self.stats.items()))
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Replay a recorded cassette over local HTTP')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help='Run the stand-in server')
+    serve.add_argument('cassette', help='Cassette directory (recorded with --transport record:DIR)')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--latency', type=float, default=None,
+                       help='Fixed response latency in seconds (default: recorded latency)')
+    serve.add_argument('--latency-scale', type=float, default=1.0,
+                       help='Multiplier on recorded latency (default: 1.0)')
+    serve.add_argument('--error-rate', type=float, default=0.0,
+                       help='Fraction of requests answered with --error-status')
+    serve.add_argument('--error-status', type=int, default=503)
+    serve.add_argument('--rate-limit', type=float, default=None,
+                       help='Requests/second before answering 429 with Retry-After')
+    serve.add_argument('--seed', type=int, default=0)
+
+    info = sub.add_parser('info', help='Summarize a cassette')
+    info.add_argument('cassette')
+
+    args = parser.parse_args()
+    cassette = Cassette(Path(args.cassette))
+
+    if args.command == 'info':
+        hosts: Dict[str, int] = {}
+        for entries in cassette.entries.values():
+            for entry in entries:
+                host = urlsplit(entry['url']).netloc
+                hosts[host] = hosts.get(host, 0) + 1
+        print(f"{len(cassette)} responses, {len(cassette.entries)} distinct requests")
+        for host, n in sorted(hosts.items()):
+            print(f"  {host}: {n}")
+        return 0
+
+    server = StandInServer(cassette, host=args.host, port=args.port, latency=args.latency,
+                           latency_scale=args.latency_scale, error_rate=args.error_rate,
+                           error_status=args.error_status, rate_limit=args.rate_limit, seed=args.seed)
+    logger.info(f"Replaying {len(cassette)} responses on {server.url} "
+                f"(use --transport stand-in:{server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        logger.info(server.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Heartland Standings Validator
+=============================
+Data-quality checks over a whole StandingsTable at once, with NumPy.
+
+The table's columns are already int32 arrays (string fields as dictionary
+codes), so they are viewed as NumPy arrays without copying. Row checks are
+vectorized comparisons; subdivision checks are grouped sums (np.bincount)
+over a (season, subdivision) group id. A full history validates in a few
+milliseconds.
+
+Row checks - errors, the row is quarantined:
+  - points:      points != 3 * wins + ties
+  - negative:    a negative count (the CGI parser keeps a '-' sign)
+  - header:      a header or label row that parsed as all zeros
+  - duplicate:   a team number seen earlier in the same season and subdivision
+
+Subdivision checks - warnings, nothing is quarantined (a withdrawn team or
+a game against another subdivision leaves real standings unbalanced):
+  - goals:       total goals_for != total goals_against
+  - results:     total wins != total losses, or an odd number of ties
+  - idle:        an all-zero row in a subdivision where the others have played
+
+NumPy is optional for the scraper; only validation needs it.
+
+Usage:
+    report = validate_table(scraper.all_teams)
+    report.write(output_dir, scraper.all_teams)    # quality report + quarantine file
+    clean = report.clean_table(scraper.all_teams)
+
+    python heartland_validate.py heartland_data/heartland_standings_2026_01_15.json --output-dir out
+"""
+
+import argparse
+import json
+import re
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency (see requirements.txt)
+    np = None
+
+from heartland_table import StandingsTable, STANDINGS_FIELDS, NUMERIC_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+POINTS_PER_WIN = 3
+POINTS_PER_TIE = 1
+
+ROW_CHECKS = ('points', 'negative', 'header', 'duplicate')
+GROUP_CHECKS = ('goals', 'results', 'idle')
+
+# A name made only of these words is a table header or label, not a team
+HEADER_WORDS = frozenset([
+    'team', 'teams', 'name', 'club', 'no', 'w', 'l', 't', 'gf', 'ga', 'rc', 'pts', 'pt',
+    'win', 'wins', 'loss', 'losses', 'lose', 'tie', 'ties', 'points', 'goals', 'for',
+    'against', 'red', 'cards', 'standings', 'subdivision', 'division', 'total', 'totals',
+])
+WORD_SPLIT = re.compile(r'[^a-z]+')
+
+REPORT_FILE = "heartland_quality_{date}.json"
+QUARANTINE_FILE = "heartland_quarantine_{date}.ndjson"
+
+_NUMERIC = [name for name in STANDINGS_FIELDS if name in NUMERIC_FIELDS]
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+@dataclass
+class Anomaly:
+    check: str
+    severity: str               # 'error' (row quarantined) or 'warning'
+    season: str
+    subdivision: str
+    row: Optional[int] = None   # Table row for row checks
+    detail: Dict = field(default_factory=dict)
+
+
+@dataclass
+class ValidationReport:
+    rows: int
+    groups: int
+    seconds: float
+    anomalies: List[Anomaly]
+    quarantined: List[int]      # Table rows with at least one error, ascending
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(ROW_CHECKS + GROUP_CHECKS, 0)
+        for anomaly in self.anomalies:
+            counts[anomaly.check] += 1
+        return counts
+
+    @property
+    def ok(self) -> bool:
+        return not self.quarantined
+
+    def to_dict(self) -> Dict:
+        return {
+            'rows': self.rows,
+            'groups': self.groups,
+            'seconds': round(self.seconds, 4),
+            'quarantined': len(self.quarantined),
+            'counts': self.counts,
+            'anomalies': [asdict(anomaly) for anomaly in self.anomalies],
+        }
+
+    def summary(self) -> str:
+        found = ', '.join(f"{n} {check}" for check, n in self.counts.items() if n) or 'no anomalies'
+        return (f"Validation: {self.rows:,} rows in {self.groups:,} subdivisions, {found}; "
+                f"{len(self.quarantined)} rows quarantined ({self.seconds * 1000:.1f} ms)")
+
+    def clean_table(self, table: StandingsTable) -> StandingsTable:
+        """`table` without the quarantined rows (the same table when there are none)."""
+        if not self.quarantined:
+            return table
+        keep = np.ones(len(table), dtype=bool)
+        keep[self.quarantined] = False
+        clean = StandingsTable()
+        clean.extend_columns({name: _column(table, name)[keep].tolist() for name in STANDINGS_FIELDS},
+                             categories={name: table.categories(name)
+                                         for name in STANDINGS_FIELDS if name not in NUMERIC_FIELDS})
+        return clean
+
+    def write(self, output_dir: Path, table: StandingsTable, date_str: str = None) -> Dict[str, str]:
+        """Write the report (JSON) and the quarantined rows (NDJSON, with their checks)."""
+        date_str = date_str or datetime.now().strftime("%Y_%m_%d")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        report_path = output_dir / REPORT_FILE.format(date=date_str)
+        quarantine_path = output_dir / QUARANTINE_FILE.format(date=date_str)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        checks: Dict[int, List[str]] = {}
+        for anomaly in self.anomalies:
+            if anomaly.severity == 'error':
+                checks.setdefault(anomaly.row, []).append(anomaly.check)
+        with open(quarantine_path, 'w', encoding='utf-8') as f:
+            for i in self.quarantined:
+                record = dict(zip(STANDINGS_FIELDS, table.row_tuple(i)))
+                record['checks'] = checks[i]
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return {'quality_report': str(report_path), 'quarantine': str(quarantine_path)}
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+def _column(table: StandingsTable, name: str):
+    """Numeric values or dictionary codes of a column as int32, without copying."""
+    codes = table.codes(name)
+    return np.frombuffer(codes, dtype=np.int32) if len(codes) else np.zeros(0, dtype=np.int32)
+
+
+def _is_header(name: str) -> bool:
+    words = [word for word in WORD_SPLIT.split(name.lower()) if word]
+    return not words or all(word in HEADER_WORDS for word in words)
+
+
+def validate_table(table: StandingsTable) -> ValidationReport:
+    """Run every check over `table`; rows are referred to by their table index."""
+    if np is None:
+        raise ImportError("Standings validation requires: pip install numpy")
+    started = time.perf_counter()
+    n = len(table)
+    c = {name: _column(table, name) for name in STANDINGS_FIELDS}
+    seasons, subdivisions = table.categories('season'), table.categories('subdivision')
+    names, numbers = table.categories('team_name'), table.categories('team_number')
+
+    # (season, subdivision) group of every row
+    pair = c['season'].astype(np.int64) * max(len(subdivisions), 1) + c['subdivision']
+    pairs, group = np.unique(pair, return_inverse=True)
+    group = group.reshape(-1)
+    n_groups = len(pairs)
+    group_season = (pairs // max(len(subdivisions), 1)).astype(np.int64)
+    group_subdivision = (pairs % max(len(subdivisions), 1)).astype(np.int64)
+
+    numeric = np.vstack([c[name] for name in _NUMERIC]) if n else np.zeros((len(_NUMERIC), 0), np.int32)
+    zero = ~numeric.any(axis=0)
+    played = c['wins'] + c['losses'] + c['ties']
+
+    errors: Dict[str, np.ndarray] = {}
+    errors['points'] = c['points'] != POINTS_PER_WIN * c['wins'] + POINTS_PER_TIE * c['ties']
+    errors['negative'] = (numeric < 0).any(axis=0)
+
+    # Header rows: only all-zero rows' names are looked at, once per distinct name
+    header = np.zeros(n, dtype=bool)
+    if zero.any():
+        zero_codes = np.unique(c['team_name'][zero])
+        flagged = zero_codes[[_is_header(names[code]) for code in zero_codes]]
+        header = zero & np.isin(c['team_name'], flagged)
+    errors['header'] = header
+
+    # Duplicates: sort by (group, team number); a row equal to its predecessor is a repeat
+    duplicate = np.zeros(n, dtype=bool)
+    first_of = np.arange(n)
+    blank = numbers.index('') if '' in numbers else -1
+    numbered = np.flatnonzero(c['team_number'] != blank)
+    if len(numbered):
+        key = group[numbered].astype(np.int64) * len(numbers) + c['team_number'][numbered]
+        order = np.argsort(key, kind='stable')
+        sorted_key = key[order]
+        repeat = np.concatenate(([False], sorted_key[1:] == sorted_key[:-1]))
+        run_start = np.maximum.accumulate(np.where(repeat, 0, np.arange(len(order))))
+        duplicate[numbered[order[repeat]]] = True
+        first_of[numbered[order]] = numbered[order[run_start]]
+    errors['duplicate'] = duplicate
+
+    # Grouped reductions per (season, subdivision)
+    def total(values) -> np.ndarray:
+        return np.bincount(group, weights=values, minlength=n_groups).astype(np.int64)
+
+    goals_for, goals_against = total(c['goals_for']), total(c['goals_against'])
+    wins, losses, ties = total(c['wins']), total(c['losses']), total(c['ties'])
+    group_played = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(group_played, group, played)
+    warnings = {
+        'goals': goals_for != goals_against,
+        'results': (wins != losses) | (ties % 2 == 1),
+    }
+    idle = zero & ~header & (group_played[group] > 0)
+
+    anomalies: List[Anomaly] = []
+    for check in ROW_CHECKS:
+        for i in np.flatnonzero(errors[check]).tolist():
+            detail = {'team_number': numbers[c['team_number'][i]], 'team_name': names[c['team_name'][i]]}
+            if check == 'points':
+                detail.update(points=int(c['points'][i]), expected=int(
+                    POINTS_PER_WIN * c['wins'][i] + POINTS_PER_TIE * c['ties'][i]))
+            elif check == 'duplicate':
+                detail['first_row'] = int(first_of[i])
+            anomalies.append(Anomaly(check, 'error', seasons[c['season'][i]],
+                                     subdivisions[c['subdivision'][i]], i, detail))
+    for check, flags in warnings.items():
+        for g in np.flatnonzero(flags).tolist():
+            if check == 'goals':
+                detail = {'goals_for': int(goals_for[g]), 'goals_against': int(goals_against[g])}
+            else:
+                detail = {'wins': int(wins[g]), 'losses': int(losses[g]), 'ties': int(ties[g])}
+            anomalies.append(Anomaly(check, 'warning', seasons[group_season[g]],
+                                     subdivisions[group_subdivision[g]], detail=detail))
+    for i in np.flatnonzero(idle).tolist():
+        anomalies.append(Anomaly('idle', 'warning', seasons[c['season'][i]], subdivisions[c['subdivision'][i]], i,
+                                 {'team_number': numbers[c['team_number'][i]], 'team_name': names[c['team_name'][i]]}))
+
+    quarantined = np.flatnonzero(np.logical_or.reduce(list(errors.values()))).tolist() if n else []
+    return ValidationReport(n, n_groups, time.perf_counter() - started, anomalies, quarantined)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate Heartland standings and quarantine bad rows')
+    parser.add_argument('standings', help='heartland_standings_*.json / .ndjson output file')
+    parser.add_argument('--output-dir', type=str, default='.',
+                        help='Where the quality report and quarantine file go (default: .)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from heartland_snapshots import read_standings_file
+    table = read_standings_file(Path(args.standings))
+    report = validate_table(table)
+    logger.info(report.summary())
+    for name, path in report.write(Path(args.output_dir), table).items():
+        print(f"  {name + ':':<20}{path}")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    exit(main())
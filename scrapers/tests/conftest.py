@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scrapers are flat modules run from scrapers/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,24 @@
+import heartland_bench as bench
+
+
+def test_all_backends_return_reference_rows():
+    assert bench.check_rows(bench.build_cases()) == []
+
+
+def test_check_rows_flags_wrong_rows():
+    cases = bench.build_cases()
+    name = next(name for name in cases if name.startswith('cgi/') and name != bench.reference_case(name))
+    parse = cases[name]['parse']
+    cases[name]['parse'] = lambda html: parse(html)[1:]
+    problems = bench.check_rows(cases)
+    assert problems and all(problem.startswith(name) for problem in problems)
+
+
+def test_speed_gate_is_relative_to_reference():
+    results = {'cgi/bs4': {'rows': 10, 'best_seconds': 0.4, 'peak_kb': 1.0},
+               'cgi/stdlib': {'rows': 10, 'best_seconds': 0.1, 'peak_kb': 1.0}}
+    bench.add_speedups(results)
+    baseline = {'cgi/stdlib': {'rows': 10, 'speedup': 4.0, 'peak_kb': 1.0}}
+    assert bench.compare(results, baseline, 0.25) == []
+    results['cgi/stdlib']['speedup'] = 2.0
+    assert bench.compare(results, baseline, 0.25)
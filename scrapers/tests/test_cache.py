@@ -0,0 +1,101 @@
+import threading
+
+from heartland_cache import ResponseCache
+
+URL = 'https://www.heartlandsoccer.net/reports/cgi-jrb/subdiv_standings.cgi'
+
+
+def test_restore_unchanged_body_keeps_blob(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store(URL, None, 'hello')
+    cache.store(URL, None, 'hello')
+    assert cache.get(URL) == 'hello'
+    assert list(cache._refs.values()) == [1]
+
+
+def test_store_changed_body_releases_old_blob(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store(URL, None, 'old')
+    old_blob = cache.entries[next(iter(cache.entries))].blob
+    cache.store(URL, None, 'new')
+    assert cache.get(URL) == 'new'
+    assert not cache._blob_path(old_blob).exists()
+
+
+def test_shared_blob_survives_other_key(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store(URL, {'subdivision': '1'}, 'no match')
+    cache.store(URL, {'subdivision': '2'}, 'no match')
+    cache.store(URL, {'subdivision': '1'}, 'changed')
+    assert cache.get(URL, {'subdivision': '2'}) == 'no match'
+    assert cache.get(URL, {'subdivision': '1'}) == 'changed'
+    assert cache.total_bytes == sum(cache._blob_sizes.values())
+    assert ResponseCache(tmp_path).total_bytes == 0  # Index not saved yet
+    cache.save()
+    assert ResponseCache(tmp_path).total_bytes == cache.total_bytes
+
+
+def test_concurrent_stores_under_eviction(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=400)
+
+    def worker(n):
+        for i in range(50):
+            cache.store(URL, {'page': str(i % 5)}, f'body {i % 3}')
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for key, entry in cache.entries.items():
+        assert cache.read(entry) is not None
+    assert sum(cache._refs.values()) == len(cache.entries)
+    assert cache.total_bytes == sum(cache._blob_sizes.values()) <= cache.max_bytes
+
+
+def test_negative_entry_expires_and_survives_reload(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store_missing(URL, {'subdivision': '9'}, ttl=60)
+    cache.store_missing(URL, {'subdivision': '8'}, ttl=0)
+    assert cache.missing(URL, {'subdivision': '9'})
+    assert not cache.missing(URL, {'subdivision': '8'})  # Expired: ask the server again
+    assert cache.get(URL, {'subdivision': '9'}) is None
+    cache.save()
+
+    cache = ResponseCache(tmp_path)
+    assert cache.missing(URL, {'subdivision': '9'})
+    cache.store(URL, {'subdivision': '9'}, 'published')
+    assert not cache.missing(URL, {'subdivision': '9'})
+    assert cache.get(URL, {'subdivision': '9'}) == 'published'
+    assert sum(cache._refs.values()) == 1
+
+
+def test_scraper_fetches_a_missing_archive_page_once(tmp_path, monkeypatch):
+    import requests
+    from requests.adapters import BaseAdapter
+
+    import heartland_scraper_v4 as v4
+
+    sent = []
+
+    class NotFound(BaseAdapter):
+        def send(self, request, **kwargs):
+            sent.append(request.url)
+            response = requests.Response()
+            response.status_code, response._content, response.url = 404, b'', request.url
+            response.request = request
+            return response
+
+        def close(self):
+            pass
+
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    for run in range(2):
+        scraper = v4.HeartlandScraper(output_dir=str(tmp_path), parse_workers=0, journal=False,
+                                      adaptive=False, rate=1000)
+        scraper.session.mount('https://', NotFound())
+        try:
+            assert scraper.scrape_archive_page('2003_spring', 'boys_prem') == []
+        finally:
+            scraper.close()
+    assert len(sent) == 1
@@ -0,0 +1,54 @@
+from heartland_changefeed import ChangeTracker, SNAPSHOT_FILE, read_snapshot, row_key
+
+SUBDIV = 'U-9 Boys Premier Subdivision 1'
+
+
+def _row(number, wins, season='2025_fall', subdivision=SUBDIV, name=None):
+    return (number, name or f"Team {number}", wins, 0, 0, wins, 0, 0, 3 * wins, season, 'boys_prem',
+            'U9', subdivision, 'Boys')
+
+
+def _run(path, rows, partial=False):
+    tracker = ChangeTracker(path)
+    changes = [change for change in map(tracker.observe, rows) if change is not None]
+    changes += tracker.finish(partial)
+    tracker.save()
+    return tracker, [(change['op'], change['key'][0]) for change in changes]
+
+
+def test_insert_update_delete_against_previous_snapshot(tmp_path):
+    path = tmp_path / SNAPSHOT_FILE
+    _, first = _run(path, [_row('7910', 1), _row('7911', 2), _row('7912', 3)])
+    assert first == [('insert', '7910'), ('insert', '7911'), ('insert', '7912')]
+
+    tracker, second = _run(path, [_row('7910', 1), _row('7911', 4), _row('7913', 0)])
+    assert second == [('update', '7911'), ('insert', '7913'), ('delete', '7912')]
+    assert tracker.counts == {'insert': 1, 'update': 1, 'delete': 1, 'unchanged': 1, 'duplicate': 0}
+    assert set(read_snapshot(path)) == {row_key(_row(n, 0)) for n in ('7910', '7911', '7913')}
+
+
+def test_partial_run_withholds_deletes_and_keeps_old_rows(tmp_path):
+    path = tmp_path / SNAPSHOT_FILE
+    _run(path, [_row('7910', 1), _row('7911', 2)])
+    _, changes = _run(path, [_row('7910', 2)], partial=True)
+    assert changes == [('update', '7910')]
+    snapshot = read_snapshot(path)
+    assert snapshot[row_key(_row('7910', 0))] == _row('7910', 2)
+    assert row_key(_row('7911', 0)) in snapshot
+
+
+def test_deletes_are_limited_to_scraped_seasons(tmp_path):
+    path = tmp_path / SNAPSHOT_FILE
+    _run(path, [_row('7910', 1), _row('7911', 1), _row('7910', 5, season='2024_fall')])
+    _, changes = _run(path, [_row('7910', 1)])
+    assert changes == [('delete', '7911')]
+    assert row_key(_row('7910', 0, season='2024_fall')) in read_snapshot(path)
+
+
+def test_duplicate_key_in_one_run_keeps_first_row(tmp_path):
+    path = tmp_path / SNAPSHOT_FILE
+    _run(path, [_row('7910', 1)])
+    tracker, changes = _run(path, [_row('7910', 1), _row('7910', 4, name='Team 7910 B')])
+    assert changes == []
+    assert tracker.counts['duplicate'] == 1
+    assert read_snapshot(path)[row_key(_row('7910', 0))] == _row('7910', 1)
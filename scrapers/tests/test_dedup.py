@@ -0,0 +1,69 @@
+from heartland_dedup import MatchIndex, MATCH_INDEX_FILE
+
+
+def _match(i, score=None):
+    return ('2025-09-06', str(i), '9:00 AM', '7912', score, f"{7000 + i}", None, '2025_fall', 'boys_prem',
+            'U9', 'U-9 Boys Premier Subdivision 1', 'Boys')
+
+
+def _key(i):
+    return f"heartland-premier-7912-{7000 + i}-2025-09-06"
+
+
+def test_reopened_index_keeps_every_match_and_drops_none(tmp_path):
+    path = tmp_path / MATCH_INDEX_FILE
+    committed = 0
+    for batch in range(4):
+        index = MatchIndex(path, slots=8)  # Tiny table, so commits grow it several times
+        fresh = range(committed, committed + 150)
+        assert all(index.check(_key(i), _match(i)) for i in fresh), batch
+        assert not any(index.check(_key(i), _match(i)) for i in range(committed)), batch
+        index.commit()
+        index.close()
+        committed += 150
+
+    index = MatchIndex(path)
+    assert index.entries == committed
+    assert not any(index.check(_key(i), _match(i)) for i in range(committed))
+    assert index.check(_key(3), _match(3, score=2))                  # a score came in
+    assert index.check(_key(committed), _match(committed))          # a new game
+    index.close()
+
+    # Nothing was committed, so the reopened index still reports both as unseen
+    index = MatchIndex(path)
+    assert index.check(_key(3), _match(3, score=2))
+    assert index.check(_key(committed), _match(committed))
+    index.close()
+
+
+def test_formats_without_match_sinks_leave_matches_unseen(tmp_path, monkeypatch):
+    import heartland_scraper_v4 as v4
+
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    path = tmp_path / MATCH_INDEX_FILE
+    matches = [_match(i) for i in range(3)]
+    for formats in (['supabase'], ['changes']):
+        scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, parse_workers=0,
+                                      journal=False, adaptive=False, new_matches=True)
+        scraper.all_matches = list(matches)
+        try:
+            paths = scraper.export(formats)
+        finally:
+            scraper.close()
+            scraper.match_index.close()
+        assert not any(name.startswith('matches_') for name in paths), formats
+
+    index = MatchIndex(path)
+    assert index.entries == 0
+    index.close()
+
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, parse_workers=0,
+                                  journal=False, adaptive=False, new_matches=True)
+    scraper.all_matches = list(matches)
+    try:
+        paths = scraper.export(['ndjson'])
+    finally:
+        scraper.close()
+        scraper.match_index.close()
+    with open(paths['matches_ndjson'], encoding='utf-8') as f:
+        assert sum(1 for _ in f) == len(matches)
@@ -0,0 +1,35 @@
+import csv
+import json
+
+import heartland_scraper_v4 as v4
+from heartland_dedup import MATCH_INDEX_FILE
+
+STANDING = ('7912', 'Bk Academy FC 17B', 5, 1, 2, 34, 13, 0, 17, '2025_fall', 'boys_prem', 'U9',
+            'U-9 Boys Premier Subdivision 1', 'Boys')
+MATCH = ('2025-09-06', '101', '9:00 AM', '7912', 2, '7915', None, '2025_fall', 'boys_prem', 'U9',
+         'U-9 Boys Premier Subdivision 1', 'Boys')
+
+
+def test_save_csv_and_json_write_only_standings_to_the_given_file(tmp_path, monkeypatch):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, parse_workers=0,
+                                  journal=False, adaptive=False, new_matches=True)
+    scraper.all_teams.extend_rows([STANDING])
+    scraper.all_matches.append(MATCH)
+    try:
+        csv_path = scraper.save_csv('standings.csv')
+        json_path = scraper.save_json('standings.json')
+    finally:
+        scraper.close()
+        scraper.match_index.close()
+
+    assert (csv_path, json_path) == (str(tmp_path / 'standings.csv'), str(tmp_path / 'standings.json'))
+    with open(csv_path, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['team_name'] for row in rows] == [STANDING[1]]
+    with open(json_path, encoding='utf-8') as f:
+        assert json.load(f) == [dict(zip(v4.STANDINGS_FIELDS, STANDING))]
+    assert sorted(p.name for p in tmp_path.glob('heartland_*')) == []
+    index = v4.MatchIndex(tmp_path / MATCH_INDEX_FILE)
+    assert index.entries == 0
+    index.close()
@@ -0,0 +1,40 @@
+import time
+
+import requests
+
+from heartland_fetch import AdaptiveLimiter, FetchEngine
+
+URL = 'https://www.heartlandsoccer.net/reports/cgi-jrb/subdiv_standings.cgi'
+
+
+class _Session(requests.Session):
+    def get(self, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'ok'
+        return response
+
+
+def test_adaptive_rate_defaults_to_starting_rate_as_ceiling():
+    limiter = AdaptiveLimiter(initial_rate=2.0)
+    for _ in range(50):
+        limiter.observe(URL, 0.05, 200)
+    assert limiter.host(URL).rate == 2.0
+    limiter.observe(URL, 0.05, 503)
+    assert limiter.host(URL).rate == 1.0
+
+
+def test_adaptive_rate_can_opt_into_higher_ceiling():
+    limiter = AdaptiveLimiter(initial_rate=2.0, max_rate=4.0)
+    for _ in range(50):
+        limiter.observe(URL, 0.05, 200)
+    assert limiter.host(URL).rate == 4.0
+
+
+def test_global_bucket_caps_adaptive_limiter():
+    adaptive = AdaptiveLimiter(initial_rate=1000.0)
+    engine = FetchEngine(_Session(), rate=50.0, burst=4, max_workers=1, adaptive=adaptive)
+    start = time.monotonic()
+    for _ in range(30):
+        engine.get(URL)
+    assert time.monotonic() - start >= (30 - 4) / 50.0 * 0.9
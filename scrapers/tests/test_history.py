@@ -0,0 +1,68 @@
+from itertools import product
+
+from heartland_history import HistoryStore, build_history
+from heartland_table import StandingsTable, STANDINGS_FIELDS
+
+F = {name: i for i, name in enumerate(STANDINGS_FIELDS)}
+
+
+def _rows(season, wins):
+    rows = []
+    for gender, age, division, subdiv in product(('Boys', 'Girls'), ('U12', 'U13'),
+                                                 ('prem', 'rec'), ('1', '2')):
+        prefix = 'boys' if gender == 'Boys' else 'girls'
+        number = f"{'7' if gender == 'Boys' else '8'}{'1' if division == 'prem' else '2'}{age[1:]}{subdiv}"
+        name = f"{gender} {age} {division} {subdiv}"
+        rows.append((number, name, wins, 1, 0, wins + 2, 2, 0, 3 * wins, season, f"{prefix}_{division}", age,
+                     f"{age} {gender} {division} Subdivision {subdiv}", gender))
+    return rows
+
+
+OLD = StandingsTable(_rows('2023_fall', 1) + _rows('2024_spring', 2))
+NEW = StandingsTable(_rows('2023_fall', 5) + _rows('2024_fall', 3))  # 2023_fall re-scraped
+
+
+def _expected(rows, level=None, **filters):
+    seasons = filters.pop('season', None)
+    if seasons is not None:
+        seasons = ['2023_fall', '2024_spring'] if seasons == '2023-24' else [seasons]
+    return sorted(
+        (row for row in rows
+         if (seasons is None or row[F['season']] in seasons)
+         and (level is None or row[F['division']].endswith('_prem' if level == 'premier' else '_rec'))
+         and all(row[F[name]] == value for name, value in filters.items())),
+        key=repr)
+
+
+def test_build_and_query(tmp_path, monkeypatch):
+    path = tmp_path / 'standings_history.bin'
+    build_history(path, [OLD, NEW])
+    # Newest table wins for 2023_fall; 2024_spring only exists in the older one
+    rows = _rows('2023_fall', 5) + _rows('2024_spring', 2) + _rows('2024_fall', 3)
+
+    with HistoryStore(path) as history:
+        assert len(history) == len(rows)
+        used = []
+        scan = history._scan
+        monkeypatch.setattr(history, '_scan', lambda index, fields, wanted: used.append((index, fields))
+                            or scan(index, fields, wanted))
+
+        queries = [
+            ({'season': '2023-24', 'gender': 'Girls', 'age_group': 'U13', 'level': 'premier'},
+             ('season_gender_age', ('season', 'gender', 'age_group'))),
+            ({'season': '2024_fall', 'age_group': 'U12'}, ('season_gender_age', ('season',))),
+            ({'team_number': '82131', 'level': 'recreational'}, ('team_number', ('team_number',))),
+            ({'subdivision': 'U12 Boys prem Subdivision 2'}, ('subdivision', ('subdivision',))),
+            ({'gender': 'Boys', 'level': 'premier'}, None),
+        ]
+        for filters, index in queries:
+            used.clear()
+            got = sorted(history.query(**filters).iter_tuples(), key=repr)
+            assert got == _expected(rows, **dict(filters)), filters
+            assert got
+            assert used == ([index] if index else []), filters
+
+        assert len(history.query(season='2023-24', team_number='9999')) == 0
+        assert [row[F['season']] for row in history.team_history('71121').iter_tuples()] == \
+            ['2023_fall', '2024_spring', '2024_fall']
+        assert {row[F['wins']] for row in history.query(season='2023_fall').iter_tuples()} == {5}
@@ -0,0 +1,41 @@
+import json
+
+from heartland_export import StreamingExporter
+from heartland_identity import TeamIdentityIndex
+from heartland_metrics import MetricsRegistry
+
+ROWS = [
+    ('7912', 'Sporting City 2012G', 5, 1, 2, 34, 13, 0, 17, '2024_fall', 'girls_prem', 'U13',
+     'U-13 Girls Premier Subdivision 1', 'Girls'),
+    ('7915', 'Sporting City 12G', 4, 2, 2, 20, 11, 0, 14, '2025_fall', 'girls_prem', 'U14',
+     'U-14 Girls Premier Subdivision 1', 'Girls'),
+    ('7918', 'KC Surf 2012G', 1, 6, 1, 5, 30, 0, 4, '2025_fall', 'girls_prem', 'U14',
+     'U-14 Girls Premier Subdivision 1', 'Girls'),
+]
+
+
+def _export(tmp_path, metrics, one_by_one):
+    identity = TeamIdentityIndex(tmp_path / 'team_identity.json.gz')
+    exporter = StreamingExporter(tmp_path, '2026_01_15', lambda season: season[:4], lambda season, division: '',
+                                 formats=['supabase'], metrics=metrics, identity=identity)
+    if one_by_one:
+        for row in ROWS:
+            exporter.write_row(row)
+    else:
+        exporter.write_rows(ROWS)
+    paths = exporter.close()
+    return identity, paths
+
+
+def test_each_row_resolved_once(tmp_path):
+    for n, (metrics, one_by_one) in enumerate([(None, False), (MetricsRegistry(), False), (None, True)]):
+        out = tmp_path / str(n)
+        out.mkdir()
+        identity, paths = _export(out, metrics, one_by_one)
+        assert identity.counts == {'number': 0, 'name': 1, 'new': 2}
+        with open(paths['supabase_standings'], encoding='utf-8') as f:
+            standings = json.load(f)
+        with open(paths['supabase_teams'], encoding='utf-8') as f:
+            teams = json.load(f)
+        assert standings[0]['heartland_team_id'] == standings[1]['heartland_team_id']
+        assert {team['heartland_team_id'] for team in teams} == {row['heartland_team_id'] for row in standings}
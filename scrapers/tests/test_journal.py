@@ -0,0 +1,69 @@
+import heartland_scraper_v4 as v4
+from heartland_journal import ScrapeJournal, JOURNAL_FILE
+from heartland_retry import FailureLedger
+
+UNIT = ('archive', '2019_fall', 'boys_prem')
+STANDING = ('7912', 'Bk Academy FC 17B', 5, 1, 2, 34, 13, 0, 17, '2019_fall', 'boys_prem', 'U9',
+            'U-9 Boys Premier Subdivision 1', 'Boys')
+
+
+def test_resume_replays_an_unfinished_journal_only(tmp_path):
+    path = tmp_path / JOURNAL_FILE
+    journal = ScrapeJournal(path)
+    journal.record(UNIT, [STANDING])
+    journal.close()
+
+    journal = ScrapeJournal(path, resume=True)  # Interrupted run: replayed
+    assert journal.rows(journal.completed(UNIT)) == [STANDING]
+    journal.complete()
+    journal.close()
+
+    journal = ScrapeJournal(path, resume=True)  # Finished run: started over
+    assert journal.completed(UNIT) is None
+    journal.close()
+    assert 'completed_at' not in path.read_text(encoding='utf-8')
+
+
+def _scrape(tmp_path, monkeypatch, fail):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, parse_workers=0,
+                                  adaptive=False, resume=True)
+    monkeypatch.setattr(v4, 'parse_page', lambda parser, job, html: [STANDING])
+
+    def fetch(season, division, strict=False):
+        if fail and division == 'girls_rec':
+            raise v4.requests.ConnectionError('reset')
+        return '<table></table>'
+
+    monkeypatch.setattr(scraper, '_fetch_archive_html', fetch)
+    try:
+        scraper.scrape_archive_season('2019_fall')
+    finally:
+        scraper.close(complete=True)
+    return scraper
+
+
+def test_clean_run_completes_the_journal_and_failed_run_does_not(tmp_path, monkeypatch):
+    _scrape(tmp_path, monkeypatch, fail=True)
+    journal = ScrapeJournal(tmp_path / JOURNAL_FILE, resume=True)
+    journal.close()
+    assert len(journal.units) == len(v4.DIVISIONS) - 1  # Left open for --resume / --retry-failed
+
+    _scrape(tmp_path, monkeypatch, fail=False)
+    journal = ScrapeJournal(tmp_path / JOURNAL_FILE, resume=True)
+    journal.close()
+    assert journal.units == {}
+
+
+def test_failures_outside_this_runs_scope_do_not_hold_the_journal_open(tmp_path, monkeypatch):
+    other = ('archive', '2018_fall', 'girls_rec')
+    ledger = FailureLedger(tmp_path / v4.FAILED_REQUESTS_FILE)
+    ledger.add(other, v4.requests.ConnectionError('reset'))
+    ledger.add(UNIT, v4.requests.ConnectionError('reset'))  # In scope, and succeeds this time
+    ledger.save()
+
+    scraper = _scrape(tmp_path, monkeypatch, fail=False)
+    assert scraper.ledger.jobs() == [other]  # Still there for --retry-failed
+    journal = ScrapeJournal(tmp_path / JOURNAL_FILE, resume=True)
+    journal.close()
+    assert journal.units == {}
@@ -0,0 +1,65 @@
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.adapters import BaseAdapter
+
+import heartland_scraper_v4 as v4
+
+DATA = Path(__file__).resolve().parents[1] / 'heartland_data'
+NO_MATCH = DATA / '_reports_cgi-jrb_subdiv_results_cgi.html'
+# (sex, level, age, subdivision) -> (standings page, results page)
+PAGES = {
+    ('Boys', 'Premier', 'U-11', '1'): ('working_test_1.html', 'results_test_1.html'),
+    ('Boys', 'Premier', 'U-14', '1'): ('working_test_3.html', 'results_test_3.html'),
+    ('Girls', 'Premier', 'U-12', '1'): ('working_test_4.html', 'results_test_4.html'),
+    ('Boys', 'Recreational', 'U-11/5th Grade 9v9', '1'): ('working_test_5.html', 'results_test_5.html'),
+}
+
+
+class FixtureAdapter(BaseAdapter):
+    """Serves the heartland_data CGI fixtures; other combos get the "could not match" page."""
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        response = requests.Response()
+        response.url, response.request, response.encoding = request.url, request, 'utf-8'
+        if not parts.path.endswith('.cgi'):
+            response.status_code, response._content = 404, b''
+            return response
+        params = dict(parse_qsl(parts.query))
+        pages = PAGES.get((params['sex'], params['level'], params['age'], params['subdivision']))
+        path = NO_MATCH
+        if pages:
+            path = DATA / pages[1 if parts.path == v4.CGI_RESULTS_PATH else 0]
+        response.status_code, response._content = 200, path.read_bytes()
+        return response
+
+    def close(self):
+        pass
+
+
+def test_scrape_years_fetches_live_results_once(tmp_path, monkeypatch):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, parse_workers=0,
+                                  journal=False, rate=1000, adaptive=False)
+    scraper.session.mount('https://', FixtureAdapter())
+    try:
+        scraper.scrape_years(1)
+    finally:
+        scraper.close()
+
+    matches = scraper.all_matches
+    assert matches
+    keys = Counter(v4.match_key(row) for row in matches)
+    assert [key for key, n in keys.items() if n > 1] == []
+    assert {row[7] for row in matches} == {v4.CURRENT_SEASON}
+    assert all('2025-07-01' <= row[0] < '2026-07-01' for row in matches)
+
+
+def test_match_date_stays_in_the_season_window():
+    assert v4.match_date('Aug 16 (Sat)', '2025_fall') == '2025-08-16'
+    assert v4.match_date('Mar 7 (Sat)', '2025_fall') == '2026-03-07'
+    assert v4.match_date('Apr 11 (Sat)', '2026_spring') == '2026-04-11'
+    assert v4.match_date('Aug 16 (Sat)', '2026_spring') is None
@@ -0,0 +1,112 @@
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.adapters import BaseAdapter
+
+import heartland_scraper_v4 as v4
+
+DATA = Path(__file__).resolve().parents[1] / 'heartland_data'
+NO_MATCH = DATA / '_reports_cgi-jrb_subdiv_results_cgi.html'
+# (sex, level, age, subdivision) -> standings page
+PAGES = {
+    ('Boys', 'Premier', 'U-11', '1'): 'working_test_1.html',
+    ('Girls', 'Premier', 'U-12', '1'): 'working_test_4.html',
+}
+COMBOS = [('U-11', '1')]
+
+
+class CountingAdapter(BaseAdapter):
+    """Serves the standings fixtures (results pages never match) and counts standings requests."""
+
+    def __init__(self):
+        super().__init__()
+        self.standings = Counter()
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        params = dict(parse_qsl(parts.query))
+        key = (params['sex'], params['level'], params['age'], params['subdivision'])
+        path = NO_MATCH
+        if parts.path == v4.CGI_STANDINGS_PATH:
+            self.standings[key] += 1
+            path = DATA / PAGES.get(key, NO_MATCH.name)
+        response = requests.Response()
+        response.url, response.request, response.encoding = request.url, request, 'utf-8'
+        response.status_code, response._content = 200, path.read_bytes()
+        return response
+
+    def close(self):
+        pass
+
+
+def _live_scrape(output_dir, **options):
+    scraper = v4.HeartlandScraper(output_dir=str(output_dir), use_cache=False, parse_workers=0,
+                                  journal=False, rate=1000, adaptive=False, **options)
+    adapter = CountingAdapter()
+    scraper.session.mount('https://', adapter)
+    try:
+        scraper.scrape_live_season()
+    finally:
+        scraper.close()
+    return scraper, adapter
+
+
+def _age(path, hours):
+    data = json.loads(path.read_text(encoding='utf-8'))
+    for block in data['blocks'].values():
+        block['discovered_at'] = (datetime.now() - timedelta(hours=hours)).isoformat(timespec='seconds')
+    path.write_text(json.dumps(data), encoding='utf-8')
+
+
+def test_manifest_round_trips_fresh_combos(tmp_path):
+    path = tmp_path / 'manifest_2025_fall.json'
+    manifest = v4.SeasonManifest(path, '2025_fall', ttl_hours=1)
+    assert manifest.combos('Boys', 'Premier') is None
+    manifest.update('Boys', 'Premier', COMBOS)
+    manifest.save()
+    assert v4.SeasonManifest(path, '2025_fall', ttl_hours=1).combos('Boys', 'Premier') == COMBOS
+    assert v4.SeasonManifest(path, '2025_fall', ttl_hours=1).combos('Girls', 'Premier') is None
+
+
+def test_manifest_of_another_season_or_past_its_ttl_is_ignored(tmp_path):
+    path = tmp_path / 'manifest_2025_fall.json'
+    manifest = v4.SeasonManifest(path, '2025_fall', ttl_hours=1)
+    manifest.update('Boys', 'Premier', COMBOS)
+    manifest.save()
+    assert v4.SeasonManifest(path, '2026_spring').combos('Boys', 'Premier') is None
+    _age(path, 2)
+    assert v4.SeasonManifest(path, '2025_fall', ttl_hours=1).combos('Boys', 'Premier') is None
+    assert v4.SeasonManifest(path, '2025_fall', ttl_hours=3).combos('Boys', 'Premier') == COMBOS
+    path.write_text('{not json', encoding='utf-8')
+    assert v4.SeasonManifest(path, '2025_fall').blocks == {}
+
+
+def test_fresh_manifest_skips_discovery(tmp_path, monkeypatch):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    first, discovery = _live_scrape(tmp_path)
+    manifest = json.loads((tmp_path / f"manifest_{v4.CURRENT_SEASON}.json").read_text(encoding='utf-8'))
+    assert manifest['blocks']['Boys/Premier']['combos'] == [['U-11', '1']]
+    assert manifest['blocks']['Girls/Premier']['combos'] == [['U-12', '1']]
+    assert manifest['blocks']['Boys/Recreational']['combos'] == []
+    assert sum(discovery.standings.values()) > len(PAGES)
+
+    second, reuse = _live_scrape(tmp_path)
+    assert reuse.standings == Counter(PAGES.keys())
+    assert list(second.all_teams.iter_tuples()) == list(first.all_teams.iter_tuples())
+
+
+def test_expired_or_refreshed_manifest_is_rediscovered(tmp_path, monkeypatch):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    _, discovery = _live_scrape(tmp_path)
+    _, refreshed = _live_scrape(tmp_path, refresh_manifest=True)
+    assert refreshed.standings == discovery.standings
+
+    _age(tmp_path / f"manifest_{v4.CURRENT_SEASON}.json", v4.MANIFEST_TTL_HOURS + 1)
+    _, expired = _live_scrape(tmp_path)
+    assert expired.standings == discovery.standings
+    _, reuse = _live_scrape(tmp_path)
+    assert reuse.standings == Counter(PAGES.keys())
@@ -0,0 +1,75 @@
+import heartland_matcher
+from heartland_matcher import TeamMatcher, Match, confidence, normalize
+
+TEAMS = [
+    ('t1', 'Sporting City 2012G', 'Girls', 2012),
+    ('t2', 'Sporting City 2012B', 'Boys', 2012),
+    ('t3', 'Sporting City 2013G', 'F', 2013),
+    ('t4', 'Sporting Blue 2012G', 'female', 2012),
+    ('t5', 'Sporting Citi Elite 2012G', 'g', 2012),
+    ('t6', 'Sportin City Red 2012G', 'F', 2012),
+]
+
+
+def test_teams_are_only_compared_within_their_gender_and_birth_year():
+    matcher = TeamMatcher(TEAMS)
+    assert set(matcher.blocks) == {('F', 2012), ('M', 2012), ('F', 2013)}
+    assert matcher.match('Sporting City 12G', 'Girls', 2012)[0] == Match('t1', 'Sporting City 2012G', 1.0)
+    assert [m.team_id for m in matcher.match('Sporting City', 'Boys', 2012)] == ['t2']
+    assert [m.team_id for m in matcher.match('Sporting City', 'F', 2013)] == ['t3']
+    assert matcher.match('Sporting City', 'Girls', 2014) == []
+
+
+def test_rank_stops_once_no_candidate_can_reach_the_top(monkeypatch):
+    block = TeamMatcher(TEAMS).blocks[('F', 2012)]
+    query = normalize('Sporting City Elite')
+    edits = []
+    levenshtein = heartland_matcher.bounded_levenshtein
+
+    def counting(a, b, bound):
+        edits.append(b)
+        return levenshtein(a, b, bound)
+
+    monkeypatch.setattr(heartland_matcher, 'bounded_levenshtein', counting)
+    full = TeamMatcher._rank(block, query, depth=10)
+    scored = len(edits)
+    del edits[:]
+    [best] = TeamMatcher._rank(block, query, depth=1)
+    assert best == full[0]
+    assert len(edits) < scored
+    assert full == sorted((Match(team_id, name, confidence(query, entry)) for team_id, name, entry in block.entries),
+                          key=lambda m: -m.confidence)
+
+
+def test_add_invalidates_memoized_matches(monkeypatch):
+    matcher = TeamMatcher(TEAMS)
+    ranks = []
+    rank = TeamMatcher._rank
+
+    def counting(block, normalized, depth):
+        ranks.append(normalized[0])
+        return rank(block, normalized, depth)
+
+    monkeypatch.setattr(TeamMatcher, '_rank', staticmethod(counting))
+    before = matcher.match('Sporting Blue Elite', 'Girls', 2012, limit=1)
+    assert matcher.match('Sporting Blue Elite 2012G', 'F', 2012, limit=1) == before
+    assert len(ranks) == 1
+    matcher.add('t7', 'Sporting Blue Elite 12G', 'Girls', 2012)
+    assert matcher.match('Sporting Blue Elite', 'Girls', 2012, limit=1) == [
+        Match('t7', 'Sporting Blue Elite 12G', 1.0)]
+    assert len(ranks) == 2
+
+
+def test_from_file_reads_birth_year_from_age_group_in_the_season(tmp_path):
+    path = tmp_path / 'teams_v2.csv'
+    path.write_text('id,display_name,gender,birth_year,age_group,known_aliases\n'
+                    'a1,Sporting City 12G,Girls,,U13,"{""SC Elite 12G""}"\n'
+                    'a2,KC Surf 11B,Boys,2011,U15,\n'
+                    'a3,No Age Yet,Girls,,,\n', encoding='utf-8')
+    matcher = TeamMatcher.from_file(path, season='2025_fall')
+    assert set(matcher.blocks) == {('F', 2013), ('M', 2011), ('F', None)}
+    assert matcher.size == 4
+    assert matcher.match('SC Elite', 'Girls', 2013)[0] == Match('a1', 'SC Elite 12G', 1.0)
+    assert matcher.match('KC Surf', 'Boys', 2011)[0].team_id == 'a2'
+    spring = TeamMatcher.from_file(path, season='2026_spring')
+    assert ('F', 2013) in spring.blocks
@@ -0,0 +1,53 @@
+import json
+
+from heartland_metrics import MetricsRegistry, ROWS_BUCKETS
+
+
+def test_prometheus_text_format():
+    metrics = MetricsRegistry()
+    for rows in (0, 7, 2000):
+        metrics.observe('heartland_rows_per_page', rows, endpoint='cgi')
+    metrics.inc('heartland_requests_total', endpoint='cgi', status=200)
+    metrics.inc('heartland_requests_total', status='200', endpoint='cgi')
+    metrics.inc('heartland_requests_total', endpoint='archive', status='error')
+    metrics.set('heartland_rows_total', 12)
+    metrics.observe('custom_seconds', 0.5)
+
+    cumulative = {0: 1, 1: 1, 5: 1, 10: 2, 25: 2, 50: 2, 100: 2, 250: 2, 500: 2, 1000: 2}
+    assert metrics.to_prometheus().splitlines() == [
+        '# TYPE custom_seconds histogram',
+        *[f'custom_seconds_bucket{{le="{bound:g}"}} {int(bound >= 0.5)}'
+          for bound in (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)],
+        'custom_seconds_bucket{le="+Inf"} 1',
+        'custom_seconds_sum 0.500000',
+        'custom_seconds_count 1',
+        '# HELP heartland_rows_per_page Rows parsed per page',
+        '# TYPE heartland_rows_per_page histogram',
+        *[f'heartland_rows_per_page_bucket{{endpoint="cgi",le="{bound}"}} {cumulative[bound]}'
+          for bound in ROWS_BUCKETS],
+        'heartland_rows_per_page_bucket{endpoint="cgi",le="+Inf"} 3',
+        'heartland_rows_per_page_sum{endpoint="cgi"} 2007.000000',
+        'heartland_rows_per_page_count{endpoint="cgi"} 3',
+        '# HELP heartland_requests_total HTTP responses by status',
+        '# TYPE heartland_requests_total counter',
+        'heartland_requests_total{endpoint="archive",status="error"} 1',
+        'heartland_requests_total{endpoint="cgi",status="200"} 2',
+        '# HELP heartland_rows_total Rows scraped this run',
+        '# TYPE heartland_rows_total gauge',
+        'heartland_rows_total 12',
+    ]
+    assert metrics.to_prometheus().endswith('\n')
+
+
+def test_dump_writes_json_and_prometheus(tmp_path):
+    metrics = MetricsRegistry()
+    with metrics.timer('heartland_parse_seconds', endpoint='archive'):
+        pass
+    metrics.dump(tmp_path / 'metrics.json', tmp_path / 'metrics.prom')
+    data = json.loads((tmp_path / 'metrics.json').read_text(encoding='utf-8'))
+    [parse] = data['histograms']['heartland_parse_seconds']
+    assert (parse['endpoint'], parse['count']) == ('archive', 1)
+    assert 'heartland_run_seconds' in data['gauges']
+    prom = (tmp_path / 'metrics.prom').read_text(encoding='utf-8')
+    assert 'heartland_parse_seconds_count{endpoint="archive"} 1\n' in prom
+    assert '# TYPE heartland_run_seconds gauge\n' in prom
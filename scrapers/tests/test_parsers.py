@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+
+from heartland_parsers import BACKENDS, get_backend, _lxml_available
+
+REPO = Path(__file__).resolve().parents[2]
+FIXTURES = sorted(
+    list((REPO / 'scrapers' / 'heartland_data').glob('*.html')) +
+    list((REPO / 'scripts' / '_debug' / 'heartland_debug').glob('*.html'))
+)
+BACKEND_NAMES = [name for name in BACKENDS if name != 'lxml' or _lxml_available()]
+
+
+def _events(name, html):
+    backend = get_backend(name)
+    return list(backend.archive_events(html)), list(backend.row_events(html))
+
+
+@pytest.mark.parametrize('path', FIXTURES, ids=lambda path: path.name)
+def test_backends_agree_on_every_fixture(path):
+    html = path.read_text(encoding='utf-8', errors='replace')
+    reference = _events('bs4', html)
+    for name in BACKEND_NAMES:
+        assert _events(name, html) == reference, name
+
+
+def test_lxml_skips_script_and_style_text():
+    if not _lxml_available():
+        pytest.skip('lxml not installed')
+    html = ('<table><tr><td>7912 Team<script>var x = 1;</script><style>td{}</style>'
+            '<!-- ad --></td><td>5</td></tr></table>')
+    assert list(get_backend('lxml').tables(html)) == [[['7912 Team', '5']]]
+    assert _events('lxml', html) == _events('bs4', html) == _events('stdlib', html)
+
+
+def test_cgi_rows_read_dashes_as_zero():
+    from heartland_scraper_v4 import StandingsParser
+    html = ('<table><tr><td>Team</td><td>Win</td><td>Lose</td><td>Tie</td><td>GF</td><td>GA</td>'
+            '<td>RC</td><td>Pts</td></tr>'
+            '<tr><td>7912 Bk Academy FC 17B</td><td>5</td><td>1</td><td>2</td><td>34</td><td>13</td>'
+            '<td>-</td><td>17</td></tr></table>')
+    [team] = StandingsParser('stdlib')._parse_cgi_response(html, '2025_fall', 'Boys', 'Premier', 'U-9', '1')
+    assert (team.team_number, team.team_name) == ('7912', 'Bk Academy FC 17B')
+    assert (team.wins, team.losses, team.ties, team.goals_for, team.goals_against,
+            team.red_cards, team.points) == (5, 1, 2, 34, 13, 0, 17)
+
+
+@pytest.mark.parametrize('name', ['stdlib', 'lxml'])
+def test_row_events_stream_before_the_page_is_parsed(name, monkeypatch):
+    if name == 'lxml' and not _lxml_available():
+        pytest.skip('lxml not installed')
+    import heartland_parsers
+
+    fed = []
+    if name == 'lxml':
+        import lxml.etree
+
+        class CountingParser(lxml.etree.HTMLPullParser):
+            def feed(self, data):
+                fed.append(len(data))
+                return super().feed(data)
+
+        monkeypatch.setattr(lxml.etree, 'HTMLPullParser', CountingParser)
+    else:
+        class CountingRowParser(heartland_parsers.RowEventParser):
+            def feed(self, data):
+                fed.append(len(data))
+                return super().feed(data)
+
+        monkeypatch.setattr(heartland_parsers, 'RowEventParser', CountingRowParser)
+
+    rows = ''.join(f"<tr><td>{7000 + i} Team {i}</td><td>{i}</td></tr>" for i in range(5000))
+    html = f"<h3>U-11 Boys Premier Subdivision 1</h3><table>{rows}</table>"
+    events = get_backend(name).row_events(html)
+    assert next(events) == ('header', 'U-11 Boys Premier Subdivision 1')
+    assert next(events) == ('row', ['7000 Team 0', '0'])
+    assert sum(fed) < len(html) // 2
+    assert sum(1 for _ in events) == 4999
+
+
+def test_row_events_match_bs4_on_nested_tables_and_headers():
+    html = ('<b>Premier</b><table><tr><td>outer<table><tr><td>7912 Inner</td><td>1</td></tr>'
+            '</table></td></tr><tr><td><h4>U-12 Subdivision 2</h4></td><td>x</td></tr></table>'
+            '<p>U-13 <b>Subdivision</b> 3</p><table><tr><td>7915 Team</td><td>4</td></tr></table>')
+    reference = list(get_backend('bs4').row_events(html))
+    for name in BACKEND_NAMES:
+        assert list(get_backend(name).row_events(html)) == reference, name
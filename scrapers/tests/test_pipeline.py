@@ -0,0 +1,115 @@
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import requests
+
+import heartland_scraper_v4 as v4
+from heartland_fetch import FetchEngine
+from heartland_journal import ScrapeJournal, JOURNAL_FILE
+from heartland_pipeline import FetchParsePipeline, PARSE_INFLIGHT_FACTOR
+
+JOBS = list(range(40))
+
+
+def parse_rows(job, html):
+    return [html]
+
+
+def parse_fails(job, html):
+    raise ValueError(f"bad page {job}")
+
+
+def parse_page_fails(parser_name, job, html):
+    raise ValueError(f"bad page {job}")
+
+
+def _pipeline(parse_workers=0, queue_size=2, max_workers=4):
+    fetcher = FetchEngine(requests.Session(), rate=1000, burst=1000, max_workers=max_workers)
+    return FetchParsePipeline(fetcher, parse_workers=parse_workers, queue_size=queue_size)
+
+
+def _close(pipeline):
+    """Close the pipeline and its fetcher; False if that does not finish."""
+    closer = threading.Thread(target=lambda: (pipeline.close(), pipeline.fetcher.close()), daemon=True)
+    closer.start()
+    closer.join(timeout=10)
+    return not closer.is_alive()
+
+
+@pytest.mark.parametrize('parse_workers, max_workers', [(1, 4), (0, 4), (0, 1)])
+def test_failing_parse_fails_the_job_in_every_mode(parse_workers, max_workers):
+    pipeline = _pipeline(parse_workers=parse_workers, max_workers=max_workers)
+    batches, failed = [], []
+    try:
+        pipeline.run(JOBS, lambda job: f"page {job}", parse_fails, lambda job, rows: batches.append(rows),
+                     on_failed=lambda job, error: failed.append(job))
+    finally:
+        assert _close(pipeline)
+    assert batches == [None] * len(JOBS)
+    assert sorted(failed) == JOBS
+
+
+def test_broken_parse_pool_stops_the_run_and_close_finishes(monkeypatch):
+    pipeline = _pipeline(parse_workers=1)
+
+    def submit(*args, **kwargs):
+        raise BrokenProcessPool("a worker died")
+
+    monkeypatch.setattr(pipeline.pool, 'submit', submit)
+    with pytest.raises(BrokenProcessPool):
+        pipeline.run(JOBS, lambda job: f"page {job}", parse_rows, lambda job, rows: None)
+    assert _close(pipeline)
+
+
+def test_failing_callback_stops_the_run_and_close_finishes():
+    pipeline = _pipeline()
+
+    def on_batch(job, rows):
+        raise RuntimeError("sink is full")
+
+    with pytest.raises(RuntimeError):
+        pipeline.run(JOBS, lambda job: f"page {job}", parse_rows, on_batch)
+    assert _close(pipeline)
+
+
+def test_slow_first_page_bounds_how_far_fetching_runs_ahead():
+    pipeline = _pipeline(queue_size=2)
+    lookahead = pipeline.queue_size + max(1, pipeline.parse_workers * PARSE_INFLIGHT_FACTOR)
+    started, ahead = [], []
+
+    def fetch(job):
+        started.append(job)
+        if job == 0:
+            time.sleep(0.5)  # Every page fetching may run ahead of it has started by now
+            ahead.append(len(started))
+        return f"page {job}"
+
+    emitted = []
+    try:
+        pipeline.run(JOBS, fetch, parse_rows, lambda job, rows: emitted.append(job))
+    finally:
+        assert _close(pipeline)
+    assert emitted == JOBS
+    assert ahead == [lookahead]
+
+
+@pytest.mark.parametrize('parse_workers, max_workers', [(1, 4), (0, 4), (0, 1)])
+def test_scraper_parse_errors_are_ledgered_not_journaled(tmp_path, monkeypatch, parse_workers, max_workers):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    monkeypatch.setattr(v4, 'parse_page', parse_page_fails)  # Module-level, so worker processes can run it
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, parse_workers=parse_workers,
+                                  max_workers=max_workers, adaptive=False, rate=1000)
+    monkeypatch.setattr(scraper, '_fetch_job', lambda job: '<table></table>')
+    try:
+        teams = scraper.scrape_archive_season('2019_fall')
+    finally:
+        scraper.close()
+    assert len(teams) == 0
+    assert sorted(scraper.ledger.jobs()) == sorted(('archive', '2019_fall', d) for d in v4.DIVISIONS)
+    assert scraper.failed_requests
+
+    journal = ScrapeJournal(tmp_path / JOURNAL_FILE, resume=True)
+    journal.close()
+    assert journal.units == {}
@@ -0,0 +1,81 @@
+import json
+import pstats
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.adapters import BaseAdapter
+
+import heartland_scraper_v4 as v4
+from heartland_profile import StageProfiler
+
+DATA = Path(__file__).resolve().parents[1] / 'heartland_data'
+NO_MATCH = DATA / '_reports_cgi-jrb_subdiv_results_cgi.html'
+STAGES = {'fetch', 'parse', 'collect', 'export'}
+
+
+class FixtureAdapter(BaseAdapter):
+    """One Boys Premier U-11 subdivision; every other combo gets the "could not match" page."""
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        params = dict(parse_qsl(parts.query))
+        path = NO_MATCH
+        if (params['sex'], params['level'], params['age'], params['subdivision']) == ('Boys', 'Premier', 'U-11', '1'):
+            path = DATA / ('results_test_1.html' if parts.path == v4.CGI_RESULTS_PATH else 'working_test_1.html')
+        response = requests.Response()
+        response.url, response.request, response.encoding = request.url, request, 'utf-8'
+        response.status_code, response._content = 200, path.read_bytes()
+        return response
+
+    def close(self):
+        pass
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_nested_stages_count_toward_the_outer_stage(tmp_path):
+    profiler = StageProfiler(tmp_path / 'profile')
+    profiler.start()
+    parse = profiler.wrap('parse', busy)
+    with profiler.stage('collect'):
+        parse(1000)
+    assert parse(1000) == busy(1000)
+    profiler.phase('scrape')
+    out = profiler.finish()
+
+    assert {name: s['calls'] for name, s in profiler.stats.items()} == {'collect': 1, 'parse': 1}
+    summary = json.loads((out / 'summary.json').read_text(encoding='utf-8'))
+    assert set(summary) == {'collect', 'parse'}
+    collect = pstats.Stats(str(out / 'collect.pstats'))
+    assert any(func[2] == 'busy' for func in collect.stats)
+    assert (out / 'parse.txt').read_text(encoding='utf-8')
+    assert (out / 'alloc_scrape.txt').exists()
+
+
+def test_profiled_scrape_records_every_stage(tmp_path, monkeypatch):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    profiler = StageProfiler(tmp_path / 'profile', sample_interval=0.001)
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, max_workers=1, parse_workers=0,
+                                  journal=False, rate=1000, adaptive=False, profiler=profiler)
+    scraper.session.mount('https://', FixtureAdapter())
+    profiler.start()
+    scraper.start_export(['csv'])
+    scraper.scrape_live_season()
+    scraper.close(complete=True)
+    profiler.phase('scrape')
+    paths = scraper.finish_export()
+    profiler.phase('export')
+    out = profiler.finish()
+
+    assert len(scraper.all_teams) and paths
+    summary = json.loads((out / 'summary.json').read_text(encoding='utf-8'))
+    assert STAGES <= set(summary)
+    assert all(summary[stage]['calls'] > 0 for stage in STAGES)
+    assert summary['samples'] > 0
+    for stage in STAGES:
+        assert pstats.Stats(str(out / f"{stage}.pstats")).total_calls > 0
+    assert (out / 'samples.folded').read_text(encoding='utf-8')
+    assert (out / 'alloc_export.txt').exists()
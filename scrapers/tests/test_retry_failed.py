@@ -0,0 +1,52 @@
+import heartland_scraper_v4 as v4
+from heartland_journal import ScrapeJournal, JOURNAL_FILE
+from heartland_retry import FailureLedger, FAILED_REQUESTS_FILE
+
+STANDINGS_UNIT = ('cgi', '2025_fall', 'Boys', 'Premier', 'U-9', '1')
+RESULTS_UNIT = ('results', '2025_fall', 'Boys', 'Premier', 'U-9', '1')
+FAILED_UNIT = ('results', '2025_fall', 'Boys', 'Premier', 'U-9', '2')
+
+STANDING = ('7912', 'Bk Academy FC 17B', 5, 1, 2, 34, 13, 0, 17, '2025_fall', 'boys_prem', 'U9',
+            'U-9 Boys Premier Subdivision 1', 'Boys')
+MATCH = ('2025-09-06', '101', '9:00 AM', '7912', 2, '7915', None, '2025_fall', 'boys_prem', 'U9',
+         'U-9 Boys Premier Subdivision 1', 'Boys')
+RETRIED = ('2025-09-06', '201', '10:00 AM', '7920', 1, '7921', 1, '2025_fall', 'boys_prem', 'U9',
+           'U-9 Boys Premier Subdivision 2', 'Boys')
+
+
+def _scraper(tmp_path, monkeypatch, results=True):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    journal = ScrapeJournal(tmp_path / JOURNAL_FILE)
+    journal.record(STANDINGS_UNIT, [STANDING])
+    journal.record(RESULTS_UNIT, [MATCH])
+    journal.close()
+    ledger = FailureLedger(tmp_path / FAILED_REQUESTS_FILE)
+    ledger.add(FAILED_UNIT, ConnectionError('reset'))
+    ledger.save()
+
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, parse_workers=0,
+                                  resume=True, results=results)
+    monkeypatch.setattr(scraper, '_fetch_job', lambda job: '<html></html>')
+    monkeypatch.setattr(v4, 'parse_page', lambda parser, job, html: [RETRIED] if job[0] == 'results' else [])
+    return scraper
+
+
+def test_retry_failed_replays_results_units_as_matches(tmp_path, monkeypatch):
+    scraper = _scraper(tmp_path, monkeypatch)
+    try:
+        recovered = scraper.retry_failed()
+    finally:
+        scraper.close()
+    assert list(scraper.all_teams.iter_tuples()) == [STANDING]
+    assert len(recovered) == 1
+    assert scraper.all_matches == [MATCH, RETRIED]
+
+
+def test_retry_failed_skips_results_units_without_results(tmp_path, monkeypatch):
+    scraper = _scraper(tmp_path, monkeypatch, results=False)
+    try:
+        scraper.retry_failed()
+    finally:
+        scraper.close()
+    assert list(scraper.all_teams.iter_tuples()) == [STANDING]
+    assert scraper.all_matches == []
@@ -0,0 +1,70 @@
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import heartland_scraper_v4 as v4
+
+DATA = Path(__file__).resolve().parents[1] / 'heartland_data'
+NO_MATCH = (DATA / '_reports_cgi-jrb_subdiv_results_cgi.html').read_text(encoding='utf-8')
+ARCHIVE = (DATA / 'debug_2024_fall_boys_prem.html').read_text(encoding='utf-8')
+# season -> {(gender, level): [(age, subdivision), ...]} stored as fresh manifests
+MANIFESTS = {
+    '2025_fall': {('Boys', 'Premier'): [('U-11', '1')]},
+    '2026_spring': {('Girls', 'Premier'): [('U-12', '1')]},
+}
+CGI = {
+    ('Boys', 'Premier', 'U-11', '1'): (DATA / 'working_test_1.html').read_text(encoding='utf-8'),
+    ('Girls', 'Premier', 'U-12', '1'): (DATA / 'working_test_4.html').read_text(encoding='utf-8'),
+}
+SEASONS = ['2023_fall', '2025_fall', '2024_fall', '2026_spring', '2023_fall']
+EXPECTED = (
+    [('cgi', '2026_spring', 'Girls', 'Premier', 'U-12', '1'),
+     ('cgi', '2025_fall', 'Boys', 'Premier', 'U-11', '1'),
+     ('results', '2025_fall', 'Boys', 'Premier', 'U-11', '1')] +
+    [('archive', season, division) for season in ('2024_fall', '2023_fall') for division in v4.DIVISIONS]
+)
+
+
+def _write_manifests(output_dir):
+    for season, blocks in MANIFESTS.items():
+        manifest = v4.SeasonManifest(output_dir / f"manifest_{season}.json", season)
+        for gender, level in v4.LIVE_BLOCKS:
+            manifest.update(gender, level, blocks.get((gender, level), []))
+        manifest.save()
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scrape_seasons_runs_each_unit_once_in_priority_order(tmp_path, monkeypatch, workers):
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    _write_manifests(tmp_path)
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path), use_cache=False, max_workers=workers,
+                                  parse_workers=0, journal=False, rate=1000, adaptive=False)
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch_job(job):
+        with lock:
+            fetched.append(job)
+        if job[0] == 'archive':
+            return ARCHIVE
+        return CGI.get(job[2:], NO_MATCH) if job[0] == 'cgi' else NO_MATCH
+
+    monkeypatch.setattr(scraper, '_fetch_job', fetch_job)
+    try:
+        scraper.scrape_seasons(SEASONS)
+    finally:
+        scraper.close()
+
+    assert Counter(fetched) == Counter(EXPECTED)
+    if workers == 1:
+        assert fetched == EXPECTED
+    seasons = list(dict.fromkeys(scraper.all_teams.column('season')))
+    assert seasons == ['2026_spring', '2025_fall', '2024_fall', '2023_fall']
+    assert not scraper.failed_requests
+
+
+def test_season_priority_puts_current_seasons_first_then_newest_archives():
+    assert sorted(['2015_fall', '2024_fall', '2025_fall', '2026_spring', '2024_spring'],
+                  key=v4.season_priority) == ['2026_spring', '2025_fall', '2024_fall', '2024_spring', '2015_fall']
@@ -0,0 +1,65 @@
+from collections import Counter
+
+import pytest
+
+import heartland_scraper_v4 as v4
+from heartland_shard import ShardSpec, write_part, merge_parts
+
+LIVE = [(gender, level, age, str(subdiv)) for gender, level in v4.LIVE_BLOCKS
+        for age in ('U-11', 'U-12') for subdiv in (1, 2)]
+ARCHIVED = ['2024_fall', '2024_spring', '2023_fall']
+JOBS = ([(kind, v4.CURRENT_SEASON) + combo for combo in LIVE for kind in ('cgi', 'results')]
+        + [('archive', season, division) for season in ARCHIVED for division in v4.DIVISIONS])
+
+
+def _rows(job):
+    """Two standings rows per page, labelled by the job that produced them."""
+    if job[0] == 'archive':
+        season, division = job[1], job[2]
+        gender = 'Boys' if division.startswith('boys') else 'Girls'
+        age, subdivision = 'U12', f"U-12 {gender} Subdivision 1"
+    else:
+        season, gender, level, age_label, subdiv = job[1:]
+        division = f"{gender.lower()}_{'prem' if level == 'Premier' else 'rec'}"
+        age, subdivision = age_label.replace('-', ''), f"{age_label} {gender} {level} Subdivision {subdiv}"
+    return [(f"79{i:02d}", f"{job} team {i}", i, 0, 0, i, 0, 0, 3 * i, season, division, age,
+             subdivision, gender) for i in range(2)]
+
+
+def _run(tmp_path, monkeypatch, shard):
+    fetched = []
+    monkeypatch.delenv('HEARTLAND_TRANSPORT', raising=False)
+    monkeypatch.setattr(v4, 'parse_page', lambda parser, job, html: [] if job[0] == 'results' else _rows(job))
+    scraper = v4.HeartlandScraper(output_dir=str(tmp_path / f"shard{shard}"), use_cache=False,
+                                  parse_workers=0, journal=False, results=True, shard=shard)
+    monkeypatch.setattr(scraper, '_fetch_job', lambda job: fetched.append(job) or '<html></html>')
+    try:
+        scraper._run_pipeline(JOBS, scraper.all_teams)
+    finally:
+        scraper.close()
+    return fetched, list(scraper.all_teams.iter_tuples())
+
+
+def test_shards_run_every_job_once(tmp_path, monkeypatch):
+    for count in (2, 3, 5):
+        runs, busy = Counter(), 0
+        for index in range(1, count + 1):
+            fetched, _ = _run(tmp_path, monkeypatch, ShardSpec(index, count))
+            runs.update(fetched)
+            busy += bool(fetched)
+        assert runs == Counter(JOBS), count
+        assert busy > 1, count
+
+
+@pytest.mark.parametrize('count', [1, 2, 4])
+def test_merged_parts_match_unsharded_output(tmp_path, monkeypatch, count):
+    _, unsharded = _run(tmp_path, monkeypatch, None)
+    parts = []
+    for index in range(1, count + 1):
+        shard = ShardSpec(index, count)
+        _, rows = _run(tmp_path, monkeypatch, shard)
+        parts.append(tmp_path / shard.part_name('2026_01_15'))
+        write_part(parts[-1], shard, rows, key=v4.row_sort_key)
+    merged = []
+    assert merge_parts(parts, merged.append, key=v4.row_sort_key) == len(unsharded)
+    assert merged == sorted(unsharded, key=v4.row_sort_key)
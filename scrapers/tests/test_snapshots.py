@@ -0,0 +1,57 @@
+from datetime import date
+
+from heartland_snapshots import SnapshotStore, RetentionPolicy
+from heartland_table import StandingsTable
+
+CLOSED = [(f"79{i:02d}", f"Closed Team {i}", i, 2, 1, 10 + i, 7, 0, 3 * i + 1, '2024_fall', 'boys_prem', 'U10',
+           'U-10 Boys Premier Subdivision 1', 'Boys') for i in range(6)]
+
+
+def _current(wins):
+    return [(f"81{i:02d}", f"Live Team {i}", wins + i, 1, 0, 5 + i, 3, 0, 3 * (wins + i), '2025_fall', 'girls_prem',
+             'U11', 'U-11 Girls Premier Subdivision 2', 'Girls') for i in range(4)]
+
+
+def _day(wins):
+    return StandingsTable(CLOSED + _current(wins))
+
+
+def _objects(store):
+    return {path.name for path in store.object_dir.glob("*/*")}
+
+
+def test_save_load_round_trip_shares_closed_season_chunks(tmp_path):
+    store = SnapshotStore(tmp_path)
+    first, second = _day(1), _day(2)
+    store.save(first, '2026-01-14')
+    after_first = _objects(store)
+    written = store.written
+    store.save(second, '2026-01-15')
+
+    # The closed season's tree, run and column chunks all come from the first day
+    closed_tree = dict(store.manifest('2026-01-14')['seasons'])['2024_fall']
+    assert dict(store.manifest('2026-01-15')['seasons'])['2024_fall'] == closed_tree
+    assert store.written - written < len(after_first)
+    assert after_first <= _objects(store)
+
+    reopened = SnapshotStore(tmp_path)
+    assert list(reopened.load('2026-01-14').iter_tuples()) == list(first.iter_tuples())
+    assert list(reopened.load('2026-01-15').iter_tuples()) == list(second.iter_tuples())
+    assert list(reopened.load().iter_tuples()) == list(second.iter_tuples())
+    assert list(reopened.load('2026-01-15', seasons=['2024_fall']).iter_tuples()) == CLOSED
+
+
+def test_prune_keeps_chunks_still_used_by_kept_days(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.save(_day(1), '2026-01-13')
+    store.save(_day(2), '2026-01-14')
+    store.save(_day(3), '2026-01-15')
+
+    removed = store.prune(RetentionPolicy(daily=1, weekly=0, monthly=0))
+    assert removed == [date(2026, 1, 13), date(2026, 1, 14)]
+    assert store.dates() == [date(2026, 1, 15)]
+    assert store.gc() == 0  # prune already collected everything unreferenced
+
+    reopened = SnapshotStore(tmp_path)
+    assert list(reopened.load('2026-01-15').iter_tuples()) == list(_day(3).iter_tuples())
+    assert _objects(reopened) == reopened._reachable()
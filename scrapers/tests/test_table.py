@@ -0,0 +1,73 @@
+import pytest
+
+from heartland_scraper_v4 import TeamStanding
+from heartland_table import StandingsTable, STANDINGS_FIELDS, NUMERIC_FIELDS
+
+ROWS = [
+    ('7912', 'Sporting City 12G', 5, 1, 2, 34, 13, 0, 17, '2025_fall', 'girls_prem', 'U14',
+     'U-14 Girls Premier Subdivision 1', 'Girls'),
+    ('7918', 'KC Surf 12G', 1, 6, 1, 5, 30, 1, 4, '2025_fall', 'girls_prem', 'U14',
+     'U-14 Girls Premier Subdivision 1', 'Girls'),
+    ('7301', 'Bk Academy FC 17B', 3, 3, 0, 12, 12, 0, 9, '2024_fall', 'boys_prem', 'U-9',
+     'U-9 Boys Premier Subdivision 2', 'Boys'),
+]
+
+
+def _columns(rows):
+    return {name: [row[i] for row in rows] for i, name in enumerate(STANDINGS_FIELDS)}
+
+
+def test_rows_round_trip_through_dictionary_encoding():
+    table = StandingsTable()
+    table.extend_rows(ROWS)
+    table.append(TeamStanding(*ROWS[0]))
+    table.extend([table[2]])
+    assert list(table.iter_tuples()) == ROWS + [ROWS[0], ROWS[2]]
+    assert table.categories('season') == ['2025_fall', '2024_fall']
+    assert list(table.codes('season')) == [0, 0, 1, 0, 1]
+    assert table.column('team_name')[:3] == [row[1] for row in ROWS]
+    assert list(table.matches_played) == [8, 8, 6, 8, 6]
+    assert table.value_counts('gender') == {'Girls': 3, 'Boys': 2}
+    assert table[-1] == TeamStanding(*ROWS[2])
+    assert table[-1].to_dict()['team_number'] == '7301'
+    assert [row.team_number for row in table[1:3]] == ['7918', '7301']
+    with pytest.raises(IndexError):
+        table[5]
+    with pytest.raises(ValueError):
+        table.append_row(ROWS[0][:-1])
+
+
+def test_extend_columns_matches_row_appends():
+    expected = StandingsTable(ROWS + ROWS)
+    table = StandingsTable(ROWS[:1])
+    table.extend_columns(_columns(ROWS[1:]))
+    table.extend_columns(_columns(ROWS))
+    assert list(table.iter_tuples()) == list(expected.iter_tuples())
+    for name in STANDINGS_FIELDS:
+        if name not in NUMERIC_FIELDS:
+            assert table.categories(name) == expected.categories(name)
+
+
+def test_extend_columns_remaps_codes_from_another_dictionary():
+    source = StandingsTable(ROWS)
+    codes = {name: list(source.codes(name)) for name in STANDINGS_FIELDS}
+    categories = {name: source.categories(name) for name in STANDINGS_FIELDS if name not in NUMERIC_FIELDS}
+
+    same_order = StandingsTable()
+    same_order.extend_columns(codes, categories)
+    assert list(same_order.iter_tuples()) == ROWS
+
+    other_order = StandingsTable(ROWS[2:])  # 2024_fall / Boys already hold code 0
+    other_order.extend_columns(codes, categories)
+    assert list(other_order.iter_tuples()) == ROWS[2:] + ROWS
+    assert other_order.categories('season') == ['2024_fall', '2025_fall']
+    assert list(other_order.codes('season')) == [0, 1, 1, 0]
+
+
+def test_extend_columns_rejects_ragged_columns():
+    table = StandingsTable()
+    columns = _columns(ROWS)
+    columns['wins'] = columns['wins'][:2]
+    with pytest.raises(ValueError):
+        table.extend_columns(columns)
+    assert len(table) == 0
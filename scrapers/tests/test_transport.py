@@ -0,0 +1,154 @@
+import http.server
+import socket
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl
+
+import pytest
+import requests
+
+import heartland_scraper_v4 as v4
+from heartland_fetch import FetchEngine, AdaptiveLimiter
+from heartland_retry import RetryPolicy, CircuitBreaker, call_with_retry
+from heartland_transport import Cassette, StandInServer, install, TRANSPORT_ENV
+
+DATA = Path(__file__).resolve().parents[1] / 'heartland_data'
+NO_MATCH = DATA / '_reports_cgi-jrb_subdiv_results_cgi.html'
+# (sex, level, age, subdivision) -> (standings page, results page)
+PAGES = {
+    ('Boys', 'Premier', 'U-11', '1'): ('working_test_1.html', 'results_test_1.html'),
+    ('Girls', 'Premier', 'U-12', '1'): ('working_test_4.html', 'results_test_4.html'),
+}
+
+
+class OriginHandler(http.server.BaseHTTPRequestHandler):
+    """Stands in for heartlandsoccer.net: CGI fixtures, "could not match" for other combos."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = dict(parse_qsl(parts.query))
+        pages = PAGES.get((params.get('sex'), params.get('level'), params.get('age'), params.get('subdivision')))
+        path = NO_MATCH
+        if pages:
+            path = DATA / pages[1 if parts.path == v4.CGI_RESULTS_PATH else 0]
+        content = path.read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def origin(monkeypatch):
+    """A local origin server; BASE_URL points at it while the test runs."""
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), OriginHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(v4, 'BASE_URL', f"http://127.0.0.1:{httpd.server_address[1]}")
+    monkeypatch.delenv(TRANSPORT_ENV, raising=False)
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+def _live_scrape(output_dir, transport=None, tune=None):
+    scraper = v4.HeartlandScraper(output_dir=str(output_dir), use_cache=False, parse_workers=0,
+                                  journal=False, rate=1000, transport=transport)
+    if tune is not None:
+        tune(scraper)
+    try:
+        scraper.scrape_live_season()
+    finally:
+        scraper.close()
+    return scraper
+
+
+@pytest.fixture
+def recorded(origin, tmp_path):
+    """(cassette dir, scraper) for one live season recorded from the origin server."""
+    cassette = tmp_path / 'cassette'
+    scraper = _live_scrape(tmp_path / 'record', transport=f"record:{cassette}")
+    assert scraper.all_teams and scraper.all_matches
+    origin.shutdown()  # From here on, only the cassette can answer
+    return cassette, scraper
+
+
+def test_replay_from_env_matches_the_recorded_run_without_network(recorded, tmp_path, monkeypatch):
+    cassette, live = recorded
+
+    def no_network(sock, address):
+        raise OSError(f"network is off ({address})")
+
+    monkeypatch.setattr(socket.socket, 'connect', no_network)
+    monkeypatch.setenv(TRANSPORT_ENV, f"replay:{cassette}")
+    replayed = _live_scrape(tmp_path / 'replay')
+    assert replayed.cassette is not None
+    assert not replayed.failed_requests
+    assert list(replayed.all_teams.iter_tuples()) == list(live.all_teams.iter_tuples())
+    assert replayed.all_matches == live.all_matches
+
+
+def test_replay_fails_requests_missing_from_the_cassette(recorded):
+    cassette, _ = recorded
+    session = requests.Session()
+    install(session, f"replay:{cassette}")
+    with pytest.raises(requests.ConnectionError):
+        session.get(f"{v4.BASE_URL}/not/recorded.html")
+
+
+def test_stand_in_5xx_injection_goes_through_retries_and_the_limiter(recorded, tmp_path):
+    cassette, live = recorded
+
+    def tune(scraper):
+        scraper.retry_policy = RetryPolicy(attempts=10, base=0.01, seed=0)
+        scraper.breaker = CircuitBreaker(threshold=100)
+
+    with StandInServer(Cassette(cassette), port=0, latency=0, error_rate=0.1, seed=1) as server:
+        scraper = _live_scrape(tmp_path / 'stand-in', transport=f"stand-in:{server.url}", tune=tune)
+    assert server.stats['errors'] > 0
+    assert server.stats['missing'] == 0
+    assert not scraper.failed_requests
+    assert list(scraper.all_teams.iter_tuples()) == list(live.all_teams.iter_tuples())
+    assert scraper.all_matches == live.all_matches
+    statuses = {dict(labels)['status'] for labels in scraper.metrics.counters['heartland_requests_total']}
+    assert '503' in statuses
+    assert scraper.fetcher.adaptive.stats['backoffs'] > 0
+
+
+def test_stand_in_429_retry_after_pauses_the_host_and_is_retried(recorded, tmp_path):
+    cassette, _ = recorded
+    url = next(entries[0]['url'] for entries in Cassette(cassette).entries.values())
+    with StandInServer(Cassette(cassette), port=0, latency=0, rate_limit=2) as server:
+        session = requests.Session()
+        limiter = AdaptiveLimiter(initial_rate=1000)
+        engine = FetchEngine(session, rate=1000, burst=1000, max_workers=1, adaptive=limiter)
+        install(session, f"stand-in:{server.url}")
+        policy = RetryPolicy(attempts=5, base=0.01, seed=0)
+        try:
+            responses = [call_with_retry(lambda: engine.get(url), url, policy) for _ in range(4)]
+        finally:
+            engine.close()
+    assert [response.status_code for response in responses] == [200] * 4
+    assert server.stats['throttled'] > 0
+    assert limiter.stats['retry_after'] > 0 and limiter.stats['backoffs'] > 0
+
+
+def test_stand_in_fixed_latency_delays_each_response(recorded):
+    cassette, _ = recorded
+    url = next(entries[0]['url'] for entries in Cassette(cassette).entries.values())
+    with StandInServer(Cassette(cassette), port=0, latency=0.2) as server:
+        session = requests.Session()
+        install(session, f"stand-in:{server.url}")
+        start = time.perf_counter()
+        response = session.get(url)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    assert elapsed >= 0.2
@@ -0,0 +1,115 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from heartland_table import StandingsTable
+from heartland_validate import Anomaly, validate_table
+
+ROW = ('7912', 'Bk Academy FC 17B', 5, 1, 2, 34, 13, 0, 17, '2025_fall', 'boys_prem', 'U9',
+       'U-9 Boys Premier Subdivision 1', 'Boys')
+S1, S2 = 'U-9 Boys Premier Subdivision 1', 'U-9 Boys Premier Subdivision 2'
+ACADEMY, SURF = ('7912', 'Bk Academy FC 17B'), ('7915', 'KC Surf 17B')
+
+
+def _row(team, wins, losses, ties, goals_for, goals_against, points=None, red_cards=0,
+         season='2025_fall', subdivision=S1):
+    if points is None:
+        points = 3 * wins + ties
+    return (team[0], team[1], wins, losses, ties, goals_for, goals_against, red_cards, points,
+            season, 'boys_prem', 'U9', subdivision, 'Boys')
+
+
+def _win(team=ACADEMY, **options):
+    return _row(team, 1, 0, 0, 2, 1, **options)
+
+
+def _loss(team=SURF, **options):
+    return _row(team, 0, 1, 0, 1, 2, **options)
+
+
+def _idle(team, **options):
+    return _row(team, 0, 0, 0, 0, 0, **options)
+
+
+def _team(team):
+    return {'team_number': team[0], 'team_name': team[1]}
+
+
+# name -> (rows, groups, counts (non-zero only), anomalies, quarantined)
+CASES = {
+    'clean': ([_win(), _loss()], 1, {}, [], []),
+    'empty': ([], 0, {}, [], []),
+    'points': (
+        [_win(), _loss(points=1)], 1, {'points': 1},
+        [Anomaly('points', 'error', '2025_fall', S1, 1, dict(_team(SURF), points=1, expected=0))],
+        [1],
+    ),
+    'negative': (
+        [_win(), _loss(red_cards=-1)], 1, {'negative': 1},
+        [Anomaly('negative', 'error', '2025_fall', S1, 1, _team(SURF))],
+        [1],
+    ),
+    'errors on one row quarantine it once': (
+        [_win(points=2, red_cards=-1), _loss()], 1, {'points': 1, 'negative': 1},
+        [Anomaly('points', 'error', '2025_fall', S1, 0, dict(_team(ACADEMY), points=2, expected=3)),
+         Anomaly('negative', 'error', '2025_fall', S1, 0, _team(ACADEMY))],
+        [0],
+    ),
+    'header and idle': (
+        [_win(), _idle(('', 'Team')), _loss(), _idle(('', 'W L T GF GA Pts')), _idle(('', '')),
+         _idle(('7918', 'Sporting City 17B')), _idle(('7920', 'Blue Valley 17B'), subdivision=S2)],
+        2, {'header': 3, 'idle': 1},
+        [Anomaly('header', 'error', '2025_fall', S1, 1, _team(('', 'Team'))),
+         Anomaly('header', 'error', '2025_fall', S1, 3, _team(('', 'W L T GF GA Pts'))),
+         Anomaly('header', 'error', '2025_fall', S1, 4, _team(('', ''))),
+         Anomaly('idle', 'warning', '2025_fall', S1, 5, _team(('7918', 'Sporting City 17B')))],
+        [1, 3, 4],
+    ),
+    # Interleaved groups: the same numbers in another subdivision or season are not repeats
+    'duplicate': (
+        [_win(subdivision=S2), _loss(), _win(season='2024_fall'), _win(), _loss(subdivision=S2),
+         _win(), _loss(), _loss(season='2024_fall')],
+        3, {'duplicate': 2},
+        [Anomaly('duplicate', 'error', '2025_fall', S1, 5, dict(_team(ACADEMY), first_row=3)),
+         Anomaly('duplicate', 'error', '2025_fall', S1, 6, dict(_team(SURF), first_row=1))],
+        [5, 6],
+    ),
+    'goals and results': (
+        [_win(), _row(SURF, 0, 1, 0, 1, 1),
+         _row(ACADEMY, 1, 0, 0, 1, 0, subdivision=S2), _row(SURF, 0, 0, 1, 0, 1, subdivision=S2)],
+        2, {'goals': 1, 'results': 1},
+        [Anomaly('goals', 'warning', '2025_fall', S1, None, {'goals_for': 3, 'goals_against': 2}),
+         Anomaly('results', 'warning', '2025_fall', S2, None, {'wins': 1, 'losses': 0, 'ties': 1})],
+        [],
+    ),
+    'blank team numbers are never repeats': (
+        [_win(('', 'Bk Academy FC 17B')), _loss(('', 'KC Surf 17B')),
+         _win(('', 'Bk Academy FC 17B')), _loss(('', 'KC Surf 17B'), points=1)],
+        1, {'points': 1},
+        [Anomaly('points', 'error', '2025_fall', S1, 3, dict(_team(('', 'KC Surf 17B')), points=1, expected=0))],
+        [3],
+    ),
+}
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_validate_table(name):
+    rows, groups, counts, anomalies, quarantined = CASES[name]
+    table = StandingsTable(rows)
+    report = validate_table(table)
+    assert (report.rows, report.groups) == (len(rows), groups)
+    assert {check: n for check, n in report.counts.items() if n} == counts
+    assert report.anomalies == anomalies
+    assert report.quarantined == quarantined
+    assert report.ok == (not quarantined)
+    clean = report.clean_table(table)
+    assert list(clean.iter_tuples()) == [row for i, row in enumerate(rows) if i not in quarantined]
+
+
+def test_write_creates_output_dir(tmp_path):
+    table = StandingsTable([ROW, ROW])
+    report = validate_table(table)
+    paths = report.write(tmp_path / 'out' / 'quality', table, date_str='2026_01_15')
+    assert report.quarantined == [1]
+    with open(paths['quarantine'], encoding='utf-8') as f:
+        assert len(f.readlines()) == 1
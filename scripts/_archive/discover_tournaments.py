@@ -10,10 +10,12 @@ Requires: pip install requests beautifulsoup4 python-dotenv
 
 import os
 import re
+import sys
 import time
 import logging
 import json
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, Dict, List, Any
 from dotenv import load_dotenv
 
@@ -61,6 +63,14 @@ HEADERS = {
 REQUEST_DELAY = 2  # seconds between requests
 MAX_RETRIES = 3
 
+# Shared HTTP session for GotSport and Supabase. HEARTLAND_TRANSPORT=record:DIR,
+# replay:DIR or stand-in:URL swaps in the offline transport from scrapers/heartland_transport.py
+http = requests.Session()
+if os.getenv("HEARTLAND_TRANSPORT"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scrapers"))
+    from heartland_transport import install_from_env
+    install_from_env(http)
+
 
 # ---------------------------
 # Supabase REST API Functions
@@ -70,7 +80,7 @@ def supabase_select(table: str, params: Dict = None) -> List[Dict]:
     """SELECT from Supabase table via REST API."""
     url = f"{SUPABASE_URL}/rest/v1/{table}"
     try:
-        response = requests.get(url, headers=SUPABASE_HEADERS, params=params or {})
+        response = http.get(url, headers=SUPABASE_HEADERS, params=params or {})
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -87,7 +97,7 @@ def supabase_upsert(table: str, data: Dict, on_conflict: str = None) -> Optional
         headers["Prefer"] = f"resolution=merge-duplicates,return=representation"
     
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = http.post(url, headers=headers, json=data)
         response.raise_for_status()
         result = response.json()
         return result[0] if isinstance(result, list) and result else result
@@ -100,7 +110,7 @@ def supabase_update(table: str, data: Dict, match_column: str, match_value: str)
     """UPDATE Supabase table via REST API."""
     url = f"{SUPABASE_URL}/rest/v1/{table}?{match_column}=eq.{match_value}"
     try:
-        response = requests.patch(url, headers=SUPABASE_HEADERS, json=data)
+        response = http.patch(url, headers=SUPABASE_HEADERS, json=data)
         response.raise_for_status()
         return True
     except Exception as e:
@@ -117,7 +127,7 @@ def make_request(url: str, retries: int = MAX_RETRIES) -> Optional[requests.Resp
     for attempt in range(retries):
         try:
             time.sleep(REQUEST_DELAY)
-            response = requests.get(url, headers=HEADERS, timeout=30)
+            response = http.get(url, headers=HEADERS, timeout=30)
             response.raise_for_status()
             return response
         except requests.RequestException as e: